@@ -1,29 +1,97 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import TYPE_CHECKING
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.api.router import router
+from backend.api.http_cache import HttpCacheMiddleware
+from backend.api.router import (
+    publish_content_changes,
+    reload_content_snapshot,
+    router,
+    service,
+)
+from backend.infra.config import config
+from backend.infra.di import (
+    create_channel_refresher,
+    create_content_repository,
+    create_db_session_factory,
+    create_tg_collector,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    async with (
+        create_db_session_factory() as db_session_factory,
+        create_tg_collector() as tg_collector,
+    ):
+        content_repository = create_content_repository(db_session_factory)
+        await content_repository.load_tag_index()
+        await content_repository.load_search_index()
+        await content_repository.load_rollups()
+        # Пока в БД нет контента, /api/content отдает моки
+        await service.reload(content_repository.list_items)
+        content_repository.listeners.extend((
+            partial(reload_content_snapshot, content_repository),
+            partial(publish_content_changes, content_repository),
+        ))
+        async with create_channel_refresher(
+            tg_collector, content_repository
+        ) as tg_refresher:
+            app.state.content_repository = content_repository
+            app.state.tg_collector = tg_collector
+            # Выключенное обновление не отдает записи: они бы только старели
+            app.state.tg_refresher = (
+                tg_refresher if config.tg_refresh_enabled else None
+            )
+            yield
+
 
 app = FastAPI(
     title="Web/DA – Smart Content Registry API",
+    lifespan=lifespan,
 )
 
 app.include_router(router)
 
 
+# Последний добавленный middleware — внешний. Сжимает ответы сам
+# HttpCacheMiddleware и только на своих путях: потоковые ответы идут без gzip
+app.add_middleware(
+    HttpCacheMiddleware,
+    routes=config.http_cache_control,
+    version=lambda: service.snapshot.revision,
+    modified_at=lambda: service.snapshot.created_at,
+    gzip_min_size=config.http_gzip_min_size,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
-async def main():
-    await TelegramStatsCollector().start()
+async def main() -> None:
+    """Фоновое обновление каналов без HTTP API"""
+    async with (
+        create_db_session_factory() as db_session_factory,
+        create_tg_collector() as tg_collector,
+        create_channel_refresher(
+            tg_collector, create_content_repository(db_session_factory), start=False
+        ) as tg_refresher,
+    ):
+        await tg_refresher.run()
 
 
 if __name__ == "__main__":
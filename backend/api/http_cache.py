@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.routing import compile_path
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+    from datetime import datetime
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# ETag сжатого ответа получает суффикс: сильный валидатор
+# обязан различать представления с разным Content-Encoding
+_GZIP_SUFFIX = "-gzip"
+
+
+class HttpCacheMiddleware:
+    """Условные GET-запросы для эндпоинтов, читающих из версии данных
+
+    ``routes`` сопоставляет шаблон пути (как в роутере) и значение
+    Cache-Control. ETag строится из ``version()`` и URL запроса, поэтому
+    совпадение ``If-None-Match`` (или ``If-Modified-Since`` не раньше
+    ``modified_at()``) проверяется до вызова эндпоинта и сразу дает 304
+    без сборки ответа. ``version()`` должна различаться и между
+    процессами: иначе после перезапуска старый ETag клиента снова совпадет.
+
+    С ``gzip_min_size`` ответы этих путей сжимаются gzip. Остальные пути
+    (потоковые NDJSON, SSE и CSV) идут без сжатия: буфер zlib задержал бы
+    первые записи.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        routes: Mapping[str, str],
+        version: Callable[[], object],
+        modified_at: Callable[[], datetime],
+        gzip_min_size: int | None = None,
+    ) -> None:
+        self.app = app
+        self.cached_app = app if gzip_min_size is None else GZipMiddleware(
+            app, minimum_size=gzip_min_size, compresslevel=6
+        )
+        self.routes = [
+            (compile_path(path)[0], cache_control) for path, cache_control in routes.items()
+        ]
+        self.version = version
+        self.modified_at = modified_at
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in {"GET", "HEAD"}:
+            await self.app(scope, receive, send)
+            return
+        cache_control = self._cache_control(scope["path"])
+        if cache_control is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = self._etag(scope)
+        last_modified = self.modified_at()
+        validators = {
+            "ETag": etag,
+            "Cache-Control": cache_control,
+            "Last-Modified": format_datetime(last_modified, usegmt=True),
+        }
+        request_headers = Headers(scope=scope)
+        matched = _matching_etag(request_headers.get("if-none-match"), etag)
+        if matched is not None or _not_modified_since(request_headers, last_modified):
+            await send({
+                "type": "http.response.start",
+                "status": HTTPStatus.NOT_MODIFIED,
+                "headers": MutableHeaders({
+                    **validators, "ETag": matched or etag, "Vary": "Accept-Encoding"
+                }).raw,
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == HTTPStatus.OK:
+                headers = MutableHeaders(scope=message)
+                for name, value in validators.items():
+                    headers.setdefault(name, value)
+                if headers.get("content-encoding") == "gzip":
+                    headers["ETag"] = f'{etag[:-1]}{_GZIP_SUFFIX}"'
+            await send(message)
+
+        await self.cached_app(scope, receive, send_with_validators)
+
+    def _cache_control(self, path: str) -> str | None:
+        for pattern, cache_control in self.routes:
+            if pattern.match(path):
+                return cache_control
+        return None
+
+    def _etag(self, scope: Scope) -> str:
+        resource = b"%s?%s" % (scope["path"].encode(), scope["query_string"])
+        digest = hashlib.blake2b(resource, digest_size=8).hexdigest()
+        return f'"{self.version()}-{digest}"'
+
+
+def _matching_etag(if_none_match: str | None, etag: str) -> str | None:
+    """Тег из ``If-None-Match``, совпавший с текущим (с учетом сжатой версии)"""
+    if not if_none_match:
+        return None
+    gzip_etag = f'{etag[:-1]}{_GZIP_SUFFIX}"'
+    for value in if_none_match.split(","):
+        # If-None-Match сравнивается слабо: префикс W/ не учитывается
+        candidate = value.strip().removeprefix("W/")
+        if candidate in {etag, gzip_etag}:
+            return candidate
+        if candidate == "*":
+            return etag
+    return None
+
+
+def _not_modified_since(headers: Headers, last_modified: datetime) -> bool:
+    # If-Modified-Since учитывается только без If-None-Match
+    if "if-none-match" in headers or "if-modified-since" not in headers:
+        return False
+    try:
+        since = parsedate_to_datetime(headers["if-modified-since"])
+    except (TypeError, ValueError):
+        return False
+    return since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+import attrs
+from fastapi.responses import StreamingResponse
+
+from backend.api.response_cache import dump_json
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Callable, Hashable
+    from typing import Any
+
+    from starlette.types import Receive, Scope, Send
+
+
+@attrs.frozen
+class LiveMessage:
+    """Событие для подписчиков; JSON сериализуется один раз на всех"""
+
+    event: str
+    key: Hashable
+    data: Any
+
+    @cached_property
+    def data_json(self) -> bytes:
+        return dump_json(self.data)
+
+    def sse(self) -> bytes:
+        return b"event: %s\ndata: %s\n\n" % (self.event.encode(), self.data_json)
+
+    def ws(self) -> bytes:
+        return b'{"event":"%s","data":%s}' % (self.event.encode(), self.data_json)
+
+
+# Сообщение после переполнения очереди: клиенту нужно перечитать состояние
+RESYNC = LiveMessage("resync", "resync", {})
+
+# Слияние неотправленного сообщения с новым; третий аргумент — размер
+# очереди подписки, при превышении которого merge возвращает RESYNC
+type Merge = Callable[[LiveMessage, LiveMessage, int], LiveMessage]
+
+
+@attrs.define(slots=True)
+class LiveHubStats:
+    published: int = 0
+    delivered: int = 0
+    coalesced: int = 0
+    overflows: int = 0
+    rejected: int = 0
+
+
+class TooManySubscribersError(Exception):
+    pass
+
+
+class LiveSubscription:
+    """Очередь одного подключения
+
+    Ожидающие сообщения хранятся по ключу: новое сообщение с тем же
+    ключом заменяет (или сливается через ``merge``) неотправленное, поэтому
+    медленный клиент получает последнее состояние, а не всю историю. Если
+    ключей больше ``queue_size`` или ``merge`` вернул ``RESYNC``, очередь
+    сбрасывается и клиент получает одно событие ``resync``.
+    """
+
+    def __init__(self, hub: LiveHub, queue_size: int) -> None:
+        self._hub = hub
+        self.queue_size = queue_size
+        self._pending: OrderedDict[Hashable, LiveMessage] = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def push(self, message: LiveMessage, merge: Merge | None = None) -> None:
+        previous = self._pending.get(message.key)
+        if previous is not None:
+            self._hub.stats.coalesced += 1
+            if merge is not None:
+                message = merge(previous, message, self.queue_size)
+        # merge тоже может вернуть RESYNC, если слитое сообщение слишком велико
+        if message is RESYNC or (
+            previous is None and len(self._pending) >= self.queue_size
+        ):
+            self._hub.stats.overflows += 1
+            self._pending.clear()
+            message = RESYNC
+        self._pending[message.key] = message
+        self._ready.set()
+
+    async def next_batch(self, timeout: float | None = None) -> list[LiveMessage]:
+        """Все накопленные сообщения; пустой список — истек ``timeout``"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except TimeoutError:
+            return []
+        self._ready.clear()
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self._hub.stats.delivered += len(batch)
+        return batch
+
+    def close(self) -> None:
+        """Отписка; повторный вызов ничего не делает"""
+        self._hub.discard(self)
+
+
+class LiveHub:
+    """Рассылка изменений данных открытым дашбордам (SSE и WebSocket)
+
+    Сообщение строится и сериализуется один раз при изменении и
+    раскладывается по очередям подключений, поэтому стоимость изменения
+    не зависит от числа клиентов, кроме раскладки ссылок. Сообщения с
+    ``retain=True`` (например, сводка) запоминаются и отдаются новым
+    подписчикам сразу. Подключений не больше ``max_subscribers``.
+    """
+
+    def __init__(self, *, max_subscribers: int, queue_size: int) -> None:
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.stats = LiveHubStats()
+        self._subscriptions: set[LiveSubscription] = set()
+        self._retained: dict[Hashable, LiveMessage] = {}
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscriptions) >= self.max_subscribers
+
+    def publish(
+        self,
+        event: str,
+        key: Hashable,
+        data: Any,
+        *,
+        retain: bool = False,
+        merge: Merge | None = None,
+    ) -> None:
+        message = LiveMessage(event, key, data)
+        if retain:
+            self._retained[key] = message
+        self.stats.published += 1
+        for subscription in self._subscriptions:
+            subscription.push(message, merge)
+
+    def open(self) -> LiveSubscription:
+        """Новая подписка; снимается ``LiveSubscription.close``"""
+        if self.full:
+            self.stats.rejected += 1
+            raise TooManySubscribersError
+        subscription = LiveSubscription(self, self.queue_size)
+        for message in self._retained.values():
+            subscription.push(message)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def discard(self, subscription: LiveSubscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncGenerator[LiveSubscription]:
+        subscription = self.open()
+        try:
+            yield subscription
+        finally:
+            subscription.close()
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            **attrs.asdict(self.stats),
+            "subscribers": len(self._subscriptions),
+            "max_subscribers": self.max_subscribers,
+        }
+
+
+class LiveEventStream(StreamingResponse):
+    """SSE-ответ одной подписки
+
+    Подписка снимается, как только ответ завершился — в том числе при
+    обрыве соединения, — а не когда сборщик мусора финализирует генератор
+    событий, поэтому место под подписчика освобождается сразу.
+    """
+
+    def __init__(
+        self, subscription: LiveSubscription, events: AsyncGenerator[bytes]
+    ) -> None:
+        super().__init__(
+            events,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        self.subscription = subscription
+        self._events = events
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.subscription.close()
+            await self._events.aclose()
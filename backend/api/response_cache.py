@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import attrs
+import orjson
+from fastapi import Response
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable, Mapping
+    from typing import Any
+
+type ResponseBody = tuple[bytes, Mapping[str, str] | None]
+
+
+@attrs.define(slots=True)
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+    bytes_saved: int = 0
+
+
+class ResponseCache:
+    """LRU-кэш готовых JSON-ответов с ограничением по объему
+
+    Ключ — пространство (эндпоинт), версия данных и параметры запроса.
+    Когда версия пространства меняется (пришли новые данные), все его
+    записи удаляются при первом обращении с новой версией. ``bytes_saved``
+    — объем тел, отданных без повторной сериализации.
+    """
+
+    def __init__(self, *, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.stats = ResponseCacheStats()
+        self._entries: OrderedDict[tuple[str, Hashable], ResponseBody] = OrderedDict()
+        self._versions: dict[str, Hashable] = {}
+        self._bytes = 0
+
+    async def respond(
+        self,
+        namespace: str,
+        version: Hashable,
+        params: Hashable,
+        build: Callable[[], Awaitable[ResponseBody]],
+    ) -> Response:
+        if self._versions.get(namespace, version) != version:
+            self.invalidate(namespace)
+        self._versions[namespace] = version
+
+        key = (namespace, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.stats.hits += 1
+            self.stats.bytes_saved += len(entry[0])
+            self._entries.move_to_end(key)
+        else:
+            self.stats.misses += 1
+            entry = await build()
+            # Версия могла смениться, пока строился ответ
+            if self._versions.get(namespace) == version:
+                self._put(key, entry)
+        body, headers = entry
+        return Response(body, media_type="application/json", headers=headers)
+
+    def invalidate(self, namespace: str | None = None) -> None:
+        keys = [
+            key for key in self._entries if namespace is None or key[0] == namespace
+        ]
+        for key in keys:
+            self._bytes -= len(self._entries.pop(key)[0])
+        if namespace is None:
+            self._versions.clear()
+        else:
+            self._versions.pop(namespace, None)
+        self.stats.invalidations += 1
+
+    def snapshot(self) -> dict[str, int | float]:
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            **attrs.asdict(self.stats),
+            "size": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": self.stats.hits / lookups if lookups else 0.0,
+        }
+
+    def _put(self, key: tuple[str, Hashable], entry: ResponseBody) -> None:
+        size = len(entry[0])
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[0])
+        self._entries[key] = entry
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (body, _) = self._entries.popitem(last=False)
+            self._bytes -= len(body)
+            self.stats.evictions += 1
+
+
+def dump_json(value: Any) -> bytes:
+    """Сериализация orjson; UTC-время в том же виде, что у pydantic (``Z``)"""
+    return orjson.dumps(value, option=orjson.OPT_UTC_Z)
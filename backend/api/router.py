@@ -1,26 +1,79 @@
 from __future__ import annotations
 
-import io
+import asyncio
 import json
+from datetime import datetime
+from time import perf_counter
+from typing import TYPE_CHECKING, Annotated, Literal
 
-from fastapi import APIRouter, HTTPException, Response
+import attrs
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    # Аннотации зависимостей FastAPI читает во время выполнения
+    Request,  # ruff: ignore[typing-only-third-party-import]
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
 
 from backend.agent.core.comments_chain import analyze_comments
 from backend.agent.core.content_analysis import analyze_content
 from backend.agent.core.content_forecast import analyze_forcast
 from backend.agent.core.model_answer import LLMService
+from backend.api.live_hub import (
+    RESYNC,
+    LiveEventStream,
+    LiveHub,
+    LiveMessage,
+    TooManySubscribersError,
+)
+from backend.api.response_cache import ResponseCache, dump_json
 from backend.api.schemas import (
     AnalyticsActualityResponse,
     AnalyticsPreviousResponse,
+    ChannelBatchRequest,
+    ChannelBatchResponse,
+    ChannelBatchResult,
     CommentAnalytics,
+    CommentTone,
     ContentForecast,
     TelegramStatistics,
 )
 from backend.application.content_getter import ContentGetter
-from backend.domain.schemas import ContentItem, SummaryStats
+from backend.application.tg_refresher import ChannelRefresher
+from backend.domain.exceptions import NotFoundException
+from backend.domain.models import ContentType, Platform
+from backend.domain.schemas import (
+    AnalyticsFilters,
+    CompareRequest,
+    CompareResponse,
+    ContentItem,
+    ContentPage,
+    Heatmap,
+    RollupSummary,
+    SearchResult,
+    StatsBreakdown,
+    SummaryStats,
+)
+from backend.domain.sentiment import default_engine
+from backend.infra.api_wrappers.tg_limiter import rate_limiter
 from backend.infra.api_wrappers.tg_wrapper import TelegramStatsCollector
 from backend.infra.api_wrappers.youtube_wrapper import YouTubeWrapper
+from backend.infra.cache import TTLCache
 from backend.infra.config import config
+from backend.infra.content_repository import ContentRepository
+from backend.infra.rollup_cube import ROLLUP_METRICS
+from backend.infra.stats_breakdown import BREAKDOWN_METRICS
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, AsyncIterator, Sequence
+    from typing import Any
+
+    from backend.api.response_cache import ResponseBody
 
 router = APIRouter(
     prefix="/api", tags=[]
@@ -30,6 +83,64 @@ youtube = YouTubeWrapper()
 
 service = ContentGetter()
 llm_service = LLMService("alibaba/tongyi-deepresearch-30b-a3b:free")
+channel_stats_cache: TTLCache[tuple[str, int, bool], Sequence[dict]] = TTLCache(
+    ttl=config.channel_stats_cache_ttl_sec,
+    stale_ttl=config.channel_stats_cache_stale_sec,
+    max_entries=config.channel_stats_cache_max_entries,
+)
+response_cache = ResponseCache(max_bytes=config.response_cache_max_bytes)
+live_hub = LiveHub(
+    max_subscribers=config.live_max_subscribers, queue_size=config.live_queue_size
+)
+
+
+async def get_tg_collector(request: Request) -> TelegramStatsCollector:
+    collector: TelegramStatsCollector = request.app.state.tg_collector
+    await collector.ensure_connected()
+    return collector
+
+
+TgCollector = Annotated[TelegramStatsCollector, Depends(get_tg_collector)]
+
+
+# Асинхронная зависимость не уходит в пул потоков
+async def get_tg_refresher(request: Request) -> ChannelRefresher | None:  # ruff: ignore[unused-async]
+    return getattr(request.app.state, "tg_refresher", None)
+
+
+TgRefresher = Annotated[ChannelRefresher | None, Depends(get_tg_refresher)]
+
+
+async def get_content_repository(request: Request) -> ContentRepository:  # ruff: ignore[unused-async]
+    return request.app.state.content_repository
+
+
+ContentRepo = Annotated[ContentRepository, Depends(get_content_repository)]
+
+
+async def get_channel_stats(
+    client: TelegramStatsCollector,
+    channel_username: str,
+    limit: int = 100,
+    *,
+    with_comment_texts: bool = False,
+    refresher: ChannelRefresher | None = None,
+) -> Sequence[dict]:
+    # Каналы из фонового обновления отдаются из памяти без запросов к Telegram
+    if refresher is not None and not with_comment_texts and limit <= refresher.limit:
+        snapshot = refresher.get(channel_username)
+        if snapshot is not None:
+            return snapshot if limit >= len(snapshot) else snapshot[:limit]
+    return await channel_stats_cache.get_or_load(
+        (channel_username, limit, with_comment_texts),
+        lambda: client.collect_channel_stats(
+            channel_username,
+            limit=limit,
+            concurrency=config.tg_collect_concurrency,
+            raise_errors=True,
+            with_comment_texts=with_comment_texts,
+        ),
+    )
 
 
 @router.get("/stats/summary", response_model=SummaryStats)
@@ -37,14 +148,159 @@ async def api_summary():
     return await service.get_summary_stats()
 
 
+@router.get("/stats/rollup", response_model=RollupSummary)
+async def api_stats_rollup(
+    repository: ContentRepo,
+    platform: Platform | None = None,
+    content_type: ContentType | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> dict:
+    return repository.rollups.summary(
+        platform=platform,
+        content_type=content_type,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@router.get("/stats/heatmap", response_model=Heatmap)
+async def api_stats_heatmap(
+    repository: ContentRepo,
+    metric: Annotated[str, Query(description=", ".join(ROLLUP_METRICS))] = (
+        "engagement_rate_percent"
+    ),
+    platform: Platform | None = None,
+    content_type: ContentType | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> dict:
+    return repository.rollups.heatmap(
+        metric,
+        platform=platform,
+        content_type=content_type,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@router.get("/stats/breakdown", response_model=StatsBreakdown)
+async def api_stats_breakdown(
+    repository: ContentRepo,
+    by: Annotated[
+        str, Query(description="Ключи через запятую: platform, content_type, tag, day, week")
+    ] = "platform",
+    metric: Annotated[str, Query(description=", ".join(BREAKDOWN_METRICS))] = "views",
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    top: Annotated[int, Query(ge=0, le=20)] = 3,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> Response:
+    async def build() -> ResponseBody:
+        result = await repository.breakdown(
+            [key.strip() for key in by.split(",") if key.strip()],
+            metric=metric,
+            limit=limit,
+            top=top,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return dump_json(result), None
+
+    return await response_cache.respond(
+        "stats_breakdown",
+        repository.version,
+        (by, metric, limit, top, start_date, end_date),
+        build,
+    )
+
+
 @router.get("/content", response_model=list[ContentItem])
-async def api_content():
-    return await service.get_all_content()
+async def api_content(
+    cursor: str | None = None,
+    limit: Annotated[int | None, Query(ge=1, le=1000)] = None,
+    fields: Annotated[
+        str | None, Query(description="Поля через запятую, например id,title,views")
+    ] = None,
+) -> Response:
+    # Без параметров — весь список, как раньше; курсор следующей страницы
+    # приходит в заголовке, чтобы тело осталось списком. JSON собирается
+    # из снимка, response_model не применяется.
+    snapshot = service.snapshot
+    if cursor is None and limit is None and fields is None:
+        return Response(snapshot.items_json, media_type="application/json")
+
+    async def build() -> ResponseBody:
+        body, next_cursor = await service.get_content_json(
+            cursor=cursor,
+            limit=limit,
+            fields=fields.split(",") if fields is not None else None,
+        )
+        return body, {"X-Next-Cursor": next_cursor} if next_cursor else None
+
+    return await response_cache.respond(
+        "content", snapshot.version, (cursor, limit, fields), build
+    )
+
+
+@router.get("/content/search", response_model=list[SearchResult])
+async def api_content_search(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    repository: ContentRepo,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> Response:
+    async def build() -> ResponseBody:
+        items = await repository.search(q, limit)
+        return dump_json([item.model_dump() for item in items]), None
+
+    return await response_cache.respond(
+        "content_search", repository.version, (q, limit), build
+    )
 
 
 @router.get("/content/{item_id}", response_model=ContentItem)
-async def api_content_item(item_id: int):
-    return await service.get_content_by_id(item_id)
+async def api_content_item(item_id: int) -> ContentItem:
+    item = await service.get_content_by_id(item_id)
+    if item is None:
+        field_name = "Content"
+        raise NotFoundException(field_name)
+    return item
+
+
+@router.post("/content/query", response_model=ContentPage)
+async def api_content_query(
+    filters: AnalyticsFilters, repository: ContentRepo, cursor: str | None = None
+) -> Response:
+    async def build() -> ResponseBody:
+        page = await repository.query(filters, cursor)
+        return dump_json(page.model_dump()), None
+
+    return await response_cache.respond(
+        "content_query", repository.version, (filters.model_dump_json(), cursor), build
+    )
+
+
+@router.post("/compare", response_model=CompareResponse)
+async def api_compare(req: CompareRequest) -> CompareResponse:
+    return await service.compare(req.ids)
+
+
+@router.get("/tags/top")
+async def api_top_tags(
+    repository: ContentRepo,
+    limit: Annotated[int, Query(ge=1, le=500)] = 20,
+    by: Literal["engagement", "posts"] = "engagement",
+) -> list[dict]:
+    return repository.tag_index.top_tags(limit, by)
+
+
+@router.get("/tags/{tag}/co-occurrence")
+async def api_tag_co_occurrence(
+    tag: str,
+    repository: ContentRepo,
+    limit: Annotated[int, Query(ge=1, le=500)] = 20,
+) -> list[dict]:
+    return repository.tag_index.co_occurrence(tag.lower(), limit)
 
 
 # @router.post("/chat", response_model=ChatResponse)
@@ -63,65 +319,299 @@ async def api_analytics_comments():
         return analysis
 
 
+@router.post("/analytics_comments/tone", response_model=CommentTone)
+async def api_analytics_comments_tone() -> CommentTone:
+    """Быстрая словарная оценка тональности комментариев без вызова LLM"""
+    comments = await youtube.get_all_comments_for_all_video()
+    scores = default_engine.score_batch(comments)
+    return CommentTone(
+        total=len(scores),
+        avg_sentiment=sum(scores) / len(scores) if scores else default_engine.base,
+        positive=sum(score > default_engine.base for score in scores),
+        negative=sum(score < default_engine.base for score in scores),
+        neutral=sum(score == default_engine.base for score in scores),
+    )
+
+
 @router.get("/channel-stats/{channel_username:str}")
-async def tg_channel_stats(channel_username: str):
+async def tg_channel_stats(
+    channel_username: str,
+    client: TgCollector,
+    refresher: TgRefresher,
+    *,
+    with_comment_texts: bool = False,
+):
     try:
-        client = TelegramStatsCollector()
-        async with client:
-            if not client.client.is_connected():
-                await client.client.connect()
-            if channel_username == " ":
-                channel_username = config.tg_channel_username
-            if client.collected_data:
-                return client.collected_data
-            await client.collect_channel_stats(channel_username, limit=100)
-            return client.collected_data
+        if channel_username == " ":
+            channel_username = config.tg_channel_username
+        return list(await get_channel_stats(
+            client,
+            channel_username,
+            with_comment_texts=with_comment_texts,
+            refresher=refresher,
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/channel-stats/batch", response_model=ChannelBatchResponse)
+async def tg_channel_stats_batch(
+    query: ChannelBatchRequest, client: TgCollector, refresher: TgRefresher
+) -> ChannelBatchResponse:
+    semaphore = asyncio.Semaphore(config.tg_batch_concurrency)
+    started = perf_counter()
+
+    async def collect(channel_username: str) -> ChannelBatchResult:
+        async with semaphore:
+            channel_started = perf_counter()
+            try:
+                records = await get_channel_stats(
+                    client,
+                    channel_username,
+                    query.limit,
+                    with_comment_texts=query.with_comment_texts,
+                    refresher=refresher,
+                )
+            except Exception as e:
+                return ChannelBatchResult(
+                    channel=channel_username,
+                    ok=False,
+                    elapsed_ms=(perf_counter() - channel_started) * 1000,
+                    error=str(e),
+                )
+            return ChannelBatchResult(
+                channel=channel_username,
+                ok=True,
+                elapsed_ms=(perf_counter() - channel_started) * 1000,
+                records=list(records),
+            )
+
+    results = await asyncio.gather(
+        *(collect(channel) for channel in dict.fromkeys(query.channels))
+    )
+    return ChannelBatchResponse(
+        elapsed_ms=(perf_counter() - started) * 1000,
+        failed=sum(not result.ok for result in results),
+        results=results,
+    )
+
+
+@router.get("/channel-stats-stream/{channel_username:str}")
+async def tg_channel_stats_stream(
+    channel_username: str,
+    client: TgCollector,
+    limit: Annotated[int, Query(ge=1)] = 100,
+    stream_format: Annotated[Literal["ndjson", "sse"], Query(alias="format")] = "ndjson",
+    *,
+    with_comment_texts: bool = False,
+) -> StreamingResponse:
+    if channel_username == " ":
+        channel_username = config.tg_channel_username
+    records = client.iter_channel_stats(
+        channel_username, limit=limit, with_comment_texts=with_comment_texts
+    )
+
+    async def ndjson() -> AsyncIterator[bytes]:
+        # Ошибка после начала ответа — последняя строка вида {"error": "..."}
+        try:
+            async for record in records:
+                yield _dump_record(record) + b"\n"
+        except Exception as e:
+            yield _dump_record({"error": str(e)}) + b"\n"
+
+    async def sse() -> AsyncIterator[bytes]:
+        try:
+            async for record in records:
+                yield b"event: record\ndata: " + _dump_record(record) + b"\n\n"
+        except Exception as e:
+            yield b"event: error\ndata: " + json.dumps(str(e)).encode() + b"\n\n"
+        else:
+            yield b"event: done\ndata: {}\n\n"
+
+    if stream_format == "sse":
+        return StreamingResponse(
+            sse(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+def _dump_record(record: dict) -> bytes:
+    return json.dumps(
+        record,
+        ensure_ascii=False,
+        default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v),
+    ).encode("utf-8")
+
+
 @router.get("/channel-stats-download/{channel_username:str}", response_model=TelegramStatistics)
-async def api_statistic(channel_username: str):
+async def api_statistic(
+    channel_username: str,
+    client: TgCollector,
+    refresher: TgRefresher,
+    *,
+    with_comment_texts: bool = False,
+):
     try:
-        client = TelegramStatsCollector()
-        async with client:
-            if not client.client.is_connected():
-                await client.client.connect()
-            if channel_username == " ":
-                channel_username = config.tg_channel_username
-            if client.collected_data:
-                return client.collected_data
-            await client.collect_channel_stats(channel_username, limit=100)
-            csv_string = client.export_to_csv_string()
-            summary = client.get_stats_summary()
-            csv_file = io.BytesIO(csv_string.encode("utf-8"))
-            filename = f"telegram_stats_{channel_username}.csv"
-            print(summary.keys())
-            return Response(
-                content=csv_file.getvalue(),
-                media_type="text/csv",
-                headers={
-                    "Content-Disposition": f"attachment; filename={filename}",
-                    "X-Stats-Summary": json.dumps(summary, default=str),
-                    "X-Total-Posts": str(summary["total_posts"]),
-                    "X-Total-Comments": str(summary["total_comments"]),
-                }
-            )
+        if channel_username == " ":
+            channel_username = config.tg_channel_username
+        data = await get_channel_stats(
+            client,
+            channel_username,
+            with_comment_texts=with_comment_texts,
+            refresher=refresher,
+        )
+        summary = client.get_stats_summary(data)
+        filename = f"telegram_stats_{channel_username}.csv"
+        return StreamingResponse(
+            (chunk.encode("utf-8") for chunk in client.iter_csv_chunks(data)),
+            media_type="text/csv",
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                "X-Stats-Summary": json.dumps(summary, default=str),
+                "X-Total-Posts": str(summary.get("total_posts", 0)),
+                "X-Total-Comments": str(summary.get("total_comments", 0)),
+            }
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/channel-stats-summary/{channel_username:str}")
+async def api_statistic_summary(
+    channel_username: str,
+    client: TgCollector,
+    refresher: TgRefresher,
+    *,
+    with_comment_texts: bool = False,
+) -> dict:
+    try:
+        if channel_username == " ":
+            channel_username = config.tg_channel_username
+        data = await get_channel_stats(
+            client,
+            channel_username,
+            with_comment_texts=with_comment_texts,
+            refresher=refresher,
+        )
+        return client.get_stats_summary(data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/cache/channel-stats")
+async def channel_stats_cache_stats() -> dict[str, int | float]:
+    return channel_stats_cache.snapshot()
+
+
+@router.get("/cache/responses")
+async def response_cache_stats() -> dict[str, int | float]:
+    return response_cache.snapshot()
+
+
+@router.get("/live")
+async def api_live() -> LiveEventStream:
+    """SSE: события summary (сводка по сохраненному контенту) и posts (дельты метрик)"""
+    # Подписка открывается до ответа, а снимает ее LiveEventStream
+    try:
+        subscription = live_hub.open()
+    except TooManySubscribersError:
+        raise HTTPException(
+            status_code=503, detail="Too many live subscribers"
+        ) from None
+
+    async def events() -> AsyncGenerator[bytes]:
+        yield b"retry: 5000\n\n"
+        while True:
+            batch = await subscription.next_batch(config.live_heartbeat_sec)
+            # Комментарий SSE держит соединение через прокси
+            yield b"".join(message.sse() for message in batch) or b": ping\n\n"
+
+    return LiveEventStream(subscription, events())
+
+
+@router.websocket("/live/ws")
+async def api_live_ws(websocket: WebSocket) -> None:
+    """То же, что /live, сообщениями {"event": ..., "data": ...}"""
+    await websocket.accept()
+    try:
+        async with live_hub.subscribe() as subscription:
+            while True:
+                batch = await subscription.next_batch(config.live_heartbeat_sec)
+                for message in batch or (LiveMessage("ping", "ping", {}),):
+                    await websocket.send_text(message.ws().decode())
+    except TooManySubscribersError:
+        # 1013 — Try Again Later
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        pass
+
+
+@router.get("/live/stats")
+async def api_live_stats() -> dict[str, int]:
+    return live_hub.snapshot()
+
+
+def reload_content_snapshot(
+    repository: ContentRepository, _changes: list[dict[str, Any]]
+) -> None:
+    """Пересборка снимка /api/content после сохранения (в фоне)"""
+    service.schedule_reload(repository.list_items)
+
+
+def publish_content_changes(
+    repository: ContentRepository, changes: list[dict[str, Any]]
+) -> None:
+    """Рассылка после сохранения: сводка и дельты считаются один раз на всех"""
+    live_hub.publish("summary", "summary", repository.rollups.summary(), retain=True)
+    live_hub.publish("posts", "posts", changes, merge=_merge_post_changes)
+
+
+def _merge_post_changes(
+    previous: LiveMessage, message: LiveMessage, limit: int
+) -> LiveMessage:
+    # Клиент еще не получил прошлые изменения: метрики берутся последние,
+    # а дельты складываются
+    changes = {change["id"]: change for change in previous.data}
+    for change in message.data:
+        merged = change
+        earlier = changes.get(change["id"])
+        if earlier is not None:
+            merged = {**change, "delta": {
+                name: earlier["delta"][name] + value
+                for name, value in change["delta"].items()
+            }}
+        changes[change["id"]] = merged
+    if len(changes) > limit:
+        return RESYNC
+    return attrs.evolve(message, data=list(changes.values()))
+
+
+@router.get("/telegram/limiter")
+async def telegram_limiter_stats() -> dict[str, object]:
+    return rate_limiter.metrics()
+
+
+@router.get("/telegram/refresher")
+async def telegram_refresher_stats(
+    refresher: TgRefresher
+) -> dict[str, dict[str, object]]:
+    if refresher is None:
+        raise HTTPException(status_code=404, detail="Refresher is not running")
+    return refresher.metrics()
+
+
 @router.get("/content-ai-recomendations/tg/{post_id:int}", response_model=AnalyticsPreviousResponse)
-async def content_with_ai_recomendations_tg(post_id: int):
+async def content_with_ai_recomendations_tg(
+    post_id: int, client: TgCollector, refresher: TgRefresher
+):
     try:
-        client = TelegramStatsCollector()
-        async with client:
-            if not client.client.is_connected():
-                await client.client.connect()
-            if not client.collected_data:
-                await client.collect_channel_stats(config.tg_channel_username, limit=100)
-            post = client.collected_data[post_id]
-            return await analyze_content(post)
+        data = await get_channel_stats(
+            client, config.tg_channel_username, refresher=refresher
+        )
+        post = data[post_id]
+        return await analyze_content(post)
     except IndexError:
         raise HTTPException(status_code=404, detail={"message": "Post not found"})
     except Exception as e:
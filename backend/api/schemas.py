@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Каналов в одном пакетном запросе: каждый — отдельный сбор из Telegram
+MAX_BATCH_CHANNELS = 50
 
 
 class CommentAnalytics(BaseModel):
@@ -13,6 +16,14 @@ class CommentAnalytics(BaseModel):
     key_moments: str
 
 
+class CommentTone(BaseModel):
+    total: int
+    avg_sentiment: float
+    positive: int
+    negative: int
+    neutral: int
+
+
 class ChannelName(BaseModel):
     channel_name: str | None = None
 
@@ -30,6 +41,26 @@ class TelegramStatistics(BaseModel):
     statistics: list[dict[str, Any]]
 
 
+class ChannelBatchRequest(BaseModel):
+    channels: list[str] = Field(min_length=1, max_length=MAX_BATCH_CHANNELS)
+    limit: int = Field(default=100, ge=1)
+    with_comment_texts: bool = False
+
+
+class ChannelBatchResult(BaseModel):
+    channel: str
+    ok: bool
+    elapsed_ms: float
+    records: list[dict[str, Any]] = []
+    error: str | None = None
+
+
+class ChannelBatchResponse(BaseModel):
+    elapsed_ms: float
+    failed: int
+    results: list[ChannelBatchResult]
+
+
 class AnalyticsPreviousResponse(BaseModel):
     model_config = {"from_attributes": True}
 
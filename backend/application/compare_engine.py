@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from backend.domain.schemas import ContentItem
+
+COMPARE_METRICS = ("views", "likes", "comments", "engagement_rate_percent", "sentiment")
+
+
+class CompareEngine:
+    """Сравнение выбранных постов между собой и со всем реестром
+
+    Метрики реестра хранятся матрицей ``float64`` (пост x метрика), рядом —
+    отсортированные по столбцам копии и отсортированные id. Поиск постов
+    идет через ``searchsorted`` по id, а процентили — через
+    ``searchsorted`` по отсортированным столбцам, поэтому стоимость
+    сравнения зависит от числа выбранных постов, а не от размера реестра.
+    """
+
+    def __init__(self, ids: np.ndarray, columns: Mapping[str, np.ndarray]) -> None:
+        self.metrics = tuple(columns)
+        self.matrix = np.column_stack([
+            np.asarray(column, dtype=np.float64) for column in columns.values()
+        ]).reshape(len(ids), len(self.metrics))
+        # Устойчивая сортировка: при повторе id находится первая строка,
+        # как в ContentSnapshot.by_id
+        self._order = np.argsort(ids, kind="stable")
+        self._sorted_ids = np.asarray(ids, dtype=np.int64)[self._order]
+        self._sorted_columns = np.sort(self.matrix, axis=0)
+        if len(ids):
+            self.mean = self.matrix.mean(axis=0)
+            self.median = np.median(self._sorted_columns, axis=0)
+        else:
+            self.mean = self.median = np.zeros(len(self.metrics))
+
+    @classmethod
+    def from_items(
+        cls, items: Sequence[ContentItem], metrics: Iterable[str] = COMPARE_METRICS
+    ) -> CompareEngine:
+        return cls(
+            np.fromiter((item.id for item in items), dtype=np.int64, count=len(items)),
+            {
+                name: np.fromiter(
+                    (getattr(item, name) for item in items),
+                    dtype=np.float64,
+                    count=len(items),
+                )
+                for name in metrics
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids)
+
+    def rows(self, ids: Sequence[int]) -> tuple[np.ndarray, np.ndarray]:
+        """Номера строк найденных id (в порядке запроса) и маска найденных"""
+        wanted = np.asarray(ids, dtype=np.int64)
+        found = np.zeros(len(wanted), dtype=bool)
+        if not len(self):
+            return np.empty(0, dtype=np.intp), found
+        positions = np.searchsorted(self._sorted_ids, wanted)
+        in_range = positions < len(self)
+        found[in_range] = self._sorted_ids[positions[in_range]] == wanted[in_range]
+        return self._order[positions[found]], found
+
+    def compare(self, ids: Sequence[int]) -> dict:
+        """Значения, отклонения от среднего, отношения к среднему, места и процентили
+
+        Место считается среди сравниваемых постов (1 — наибольшее значение),
+        процентиль — доля реестра со значением не выше, в процентах.
+        Повторы id в запросе отбрасываются.
+        """
+        ids = list(dict.fromkeys(ids))
+        rows, found = self.rows(ids)
+        values = self.matrix[rows]
+        deltas = values - self.mean
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(self.mean != 0, values / self.mean, np.nan)
+        ranks = np.argsort(np.argsort(-values, axis=0, kind="stable"), axis=0) + 1
+        percentiles = np.column_stack([
+            np.searchsorted(self._sorted_columns[:, column], values[:, column], side="right")
+            for column in range(len(self.metrics))
+        ]).reshape(values.shape) * (100.0 / max(len(self), 1))
+
+        found_ids = [item_id for item_id, ok in zip(ids, found, strict=True) if ok]
+        return {
+            "items": [
+                {
+                    "id": item_id,
+                    "metrics": {
+                        name: {
+                            "value": values[row, column],
+                            "delta": deltas[row, column],
+                            "ratio": _finite_or_none(ratios[row, column]),
+                            "rank": int(ranks[row, column]),
+                            "percentile": percentiles[row, column],
+                        }
+                        for column, name in enumerate(self.metrics)
+                    },
+                }
+                for row, item_id in enumerate(found_ids)
+            ],
+            "baseline": {
+                name: {"mean": self.mean[column], "median": self.median[column]}
+                for column, name in enumerate(self.metrics)
+            },
+            "registry_size": len(self),
+            "missing_ids": [
+                item_id for item_id, ok in zip(ids, found, strict=True) if not ok
+            ],
+        }
+
+
+def _finite_or_none(value: float) -> float | None:
+    return float(value) if np.isfinite(value) else None
@@ -1,53 +1,261 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+from datetime import UTC, datetime
 from statistics import mean
+from types import MappingProxyType
+from typing import TYPE_CHECKING
 
+import attrs
+import orjson
+
+from backend.application.compare_engine import CompareEngine
 from backend.application.mocks import TG_MOCK, VK_MOCK, YOUTUBE_MOCK
-from backend.domain.schemas import ContentItem, SummaryStats
+from backend.domain.exceptions import InvalidFilterException
+from backend.domain.models import Platform
+from backend.domain.schemas import CompareResponse, ContentItem, SummaryStats
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+    from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+CONTENT_FIELDS = tuple(ContentItem.model_fields)
+
+
+@attrs.frozen
+class ContentSnapshot:
+    """Неизменяемый снимок контента одной версии данных
+
+    Строится один раз при изменении данных: модели уже провалидированы,
+    поиск по id — обращение к словарю, а список целиком заранее
+    сериализован в JSON. Для страниц и проекций полей хранятся готовые к
+    JSON словари ``rows``, поэтому выборка полей обходится без pydantic.
+    """
+
+    version: int
+    # Содержимое и момент сборки: различает снимки разных процессов и
+    # деплоев, у которых ``version`` начинается с 1
+    revision: str
+    items: tuple[ContentItem, ...]
+    rows: tuple[dict[str, Any], ...]
+    by_id: Mapping[int, ContentItem]
+    by_platform: Mapping[Platform, tuple[ContentItem, ...]]
+    summary: SummaryStats
+    items_json: bytes
+    compare_engine: CompareEngine
+    _ids_by_platform: Mapping[Platform, Mapping[int, ContentItem]]
+    _positions: Mapping[int, int]
+    created_at: datetime = attrs.field(factory=lambda: datetime.now(UTC))
+
+    @classmethod
+    def build(cls, records: Iterable[dict], version: int) -> ContentSnapshot:
+        items = tuple(ContentItem.model_validate(record) for record in records)
+        by_id: dict[int, ContentItem] = {}
+        positions: dict[int, int] = {}
+        platform_items: dict[Platform, list[ContentItem]] = {
+            platform: [] for platform in Platform
+        }
+        ids_by_platform: dict[Platform, dict[int, ContentItem]] = {
+            platform: {} for platform in Platform
+        }
+        for position, item in enumerate(items):
+            # При повторе id, как и при линейном поиске, побеждает первый
+            by_id.setdefault(item.id, item)
+            positions.setdefault(item.id, position)
+            ids_by_platform[item.platform].setdefault(item.id, item)
+            platform_items[item.platform].append(item)
+        rows = tuple(item.model_dump(mode="json") for item in items)
+        items_json = orjson.dumps(rows)
+        created_at = datetime.now(UTC)
+        digest = hashlib.blake2b(items_json, digest_size=6)
+        digest.update(created_at.isoformat().encode())
+        return cls(
+            version=version,
+            revision=f"{version}.{digest.hexdigest()}",
+            items=items,
+            rows=rows,
+            by_id=MappingProxyType(by_id),
+            by_platform=MappingProxyType({
+                platform: tuple(values) for platform, values in platform_items.items()
+            }),
+            summary=_summary(items),
+            items_json=items_json,
+            compare_engine=CompareEngine.from_items(items),
+            ids_by_platform=MappingProxyType({
+                platform: MappingProxyType(ids) for platform, ids in ids_by_platform.items()
+            }),
+            positions=MappingProxyType(positions),
+            created_at=created_at,
+        )
+
+    def get(self, item_id: int, platform: Platform | None = None) -> ContentItem | None:
+        if platform is None:
+            return self.by_id.get(item_id)
+        return self._ids_by_platform[platform].get(item_id)
+
+    def page(self, cursor: str | None, limit: int | None) -> tuple[int, int, str | None]:
+        """Границы страницы ``[start, stop)`` и курсор следующей страницы
+
+        Курсор хранит позицию и id последней строки. Если снимок с тех пор
+        пересобран и на этой позиции другая строка, продолжение ищется
+        по id.
+        """
+        start = 0 if cursor is None else self._resume(cursor)
+        stop = len(self.items) if limit is None else min(start + limit, len(self.items))
+        if stop >= len(self.items) or stop <= start:
+            return start, stop, None
+        return start, stop, _encode_cursor(stop - 1, self.items[stop - 1].id)
+
+    def _resume(self, cursor: str) -> int:
+        position, item_id = _decode_cursor(cursor)
+        if not 0 <= position < len(self.items) or self.items[position].id != item_id:
+            position = self._positions.get(item_id, -1)
+        if position < 0:
+            msg = "Invalid cursor"
+            raise InvalidFilterException(msg)
+        return position + 1
 
 
 class ContentGetter:
+    """Контент для API из текущего ``ContentSnapshot``
+
+    ``update`` собирает новый снимок и подменяет ссылку на него целиком,
+    поэтому конкурентные запросы видят либо старую, либо новую версию, но
+    не смесь. По умолчанию источник данных — моки соцсетей; ``reload``
+    заменяет их сохраненным контентом, если он есть.
+    """
+
+    def __init__(self, records: Iterable[dict] | None = None) -> None:
+        if records is None:
+            records = (*VK_MOCK, *TG_MOCK, *YOUTUBE_MOCK)
+        self._snapshot = ContentSnapshot.build(records, version=1)
+        self._reload_task: asyncio.Task[None] | None = None
+        self._reload_pending = False
+
+    @property
+    def snapshot(self) -> ContentSnapshot:
+        return self._snapshot
+
+    def update(self, records: Iterable[dict]) -> ContentSnapshot:
+        self._snapshot = ContentSnapshot.build(records, self._snapshot.version + 1)
+        return self._snapshot
+
+    async def reload(self, load: Callable[[], Awaitable[Sequence[Any]]]) -> bool:
+        """Новый снимок из ``load``; пустой результат оставляет текущий снимок"""
+        records = await load()
+        if not records:
+            return False
+        self.update(records)
+        return True
+
+    def schedule_reload(self, load: Callable[[], Awaitable[Sequence[Any]]]) -> None:
+        """``reload`` в фоне; вызовы во время сборки дают одну следующую сборку"""
+        self._reload_pending = True
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.create_task(self._reload_while_pending(load))
+
+    async def _reload_while_pending(
+        self, load: Callable[[], Awaitable[Sequence[Any]]]
+    ) -> None:
+        while self._reload_pending:
+            self._reload_pending = False
+            try:
+                await self.reload(load)
+            except Exception:
+                _logger.exception("Не удалось пересобрать снимок контента")
 
     async def get_all_content(self) -> list[ContentItem]:
-        all_content = VK_MOCK + TG_MOCK + YOUTUBE_MOCK
-        return [ContentItem.model_validate(content) for content in all_content]
+        return list(self._snapshot.items)
+
+    async def get_content_json(
+        self,
+        *,
+        cursor: str | None = None,
+        limit: int | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> tuple[bytes, str | None]:
+        """JSON-список контента (страница и/или проекция полей) и курсор дальше"""
+        snapshot = self._snapshot
+        if cursor is None and limit is None and fields is None:
+            return snapshot.items_json, None
+        start, stop, next_cursor = snapshot.page(cursor, limit)
+        rows: Sequence[dict[str, Any]] = snapshot.rows[start:stop]
+        if fields is not None:
+            names = _resolve_fields(fields)
+            rows = [{name: row[name] for name in names} for row in rows]
+        return orjson.dumps(rows), next_cursor
+
+    async def compare(self, ids: Sequence[int]) -> CompareResponse:
+        snapshot = self._snapshot
+        result = snapshot.compare_engine.compare(ids)
+        for row in result["items"]:
+            row["item"] = snapshot.by_id[row.pop("id")]
+        return CompareResponse.model_validate(result)
 
     async def get_vk_mock(self) -> list[ContentItem]:
-        return [ContentItem.model_validate(content) for content in VK_MOCK]
+        return list(self._snapshot.by_platform[Platform.VK])
 
     async def get_one_vk_mock(self, post_id: int) -> ContentItem | None:
-        for content in VK_MOCK:
-            if content["id"] == post_id:
-                return ContentItem.model_validate(content)
+        return self._snapshot.get(post_id, Platform.VK)
 
     async def get_one_yt_mock(self, post_id: int) -> ContentItem | None:
-        for content in YOUTUBE_MOCK:
-            if content["id"] == post_id:
-                return ContentItem.model_validate(content)
+        return self._snapshot.get(post_id, Platform.YOUTUBE)
 
     async def get_youtube_mock(self) -> list[ContentItem]:
-        return [ContentItem.model_validate(content) for content in YOUTUBE_MOCK]
+        return list(self._snapshot.by_platform[Platform.YOUTUBE])
 
     async def get_summary_stats(self) -> SummaryStats:
-        content_items = VK_MOCK + TG_MOCK + YOUTUBE_MOCK
-        total_items = len(content_items)
-        total_views = sum(item["views"] for item in content_items)
-        total_likes = sum(item["likes"] for item in content_items)
-        total_comments = sum(item["comments"] for item in content_items)
-        avg_engagement = mean(item["engagement_rate_percent"] for item in content_items)
-        avg_sentiment = mean(item["sentiment"] for item in content_items)
+        return self._snapshot.summary
+
+    async def get_content_by_id(self, content_id: int) -> ContentItem | None:
+        return self._snapshot.get(content_id)
+
 
+def _summary(items: tuple[ContentItem, ...]) -> SummaryStats:
+    if not items:
         return SummaryStats(
-            total_items=total_items,
-            total_views=total_views,
-            total_likes=total_likes,
-            total_comments=total_comments,
-            avg_engagement=avg_engagement,
-            avg_sentiment=avg_sentiment
+            total_items=0,
+            total_views=0,
+            total_likes=0,
+            total_comments=0,
+            avg_engagement=0.0,
+            avg_sentiment=0.0,
         )
+    return SummaryStats(
+        total_items=len(items),
+        total_views=sum(item.views for item in items),
+        total_likes=sum(item.likes for item in items),
+        total_comments=sum(item.comments for item in items),
+        avg_engagement=mean(item.engagement_rate_percent for item in items),
+        avg_sentiment=mean(item.sentiment for item in items),
+    )
 
-    async def get_content_by_id(self, content_id: int) -> ContentItem | None:
-        all_content = VK_MOCK + TG_MOCK + YOUTUBE_MOCK
-        for content in all_content:
-            if content["id"] == content_id:
-                return ContentItem.model_validate(content)
+
+def _resolve_fields(fields: Sequence[str]) -> tuple[str, ...]:
+    names = tuple(dict.fromkeys(name.strip() for name in fields if name.strip()))
+    unknown = [name for name in names if name not in CONTENT_FIELDS]
+    if unknown or not names:
+        msg = f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+        raise InvalidFilterException(msg)
+    return names
+
+
+def _encode_cursor(position: int, item_id: int) -> str:
+    payload = json.dumps([position, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(position), int(item_id)
+    except (TypeError, ValueError) as e:
+        msg = "Invalid cursor"
+        raise InvalidFilterException(msg) from e
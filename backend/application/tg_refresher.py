@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING
+
+import attrs
+
+from backend.infra.api_wrappers.tg_limiter import Priority, priority
+from backend.infra.api_wrappers.tg_store import TelegramRecordStore
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from backend.infra.api_wrappers.tg_wrapper import TelegramStatsCollector
+    from backend.infra.content_repository import ContentRepository
+
+_logger = logging.getLogger(__name__)
+
+
+@attrs.define(slots=True)
+class RefreshStatus:
+    runs: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    skipped_overlaps: int = 0
+    records: int = 0
+    last_started_at: datetime | None = None
+    last_success_at: datetime | None = None
+    last_duration_sec: float = 0.0
+    last_error: str | None = None
+    next_run_at: float = 0.0
+
+
+class ChannelRefresher:
+    """Периодическое фоновое обновление статистики каналов
+
+    Каналы обновляются инкрементально (``collect_channel_updates``) с
+    фоновым приоритетом лимитера, интервал между запусками случайно
+    сдвигается на ``±jitter``, а после ошибок растет экспоненциально до
+    ``max_backoff``. Один канал не обновляется параллельно сам с собой.
+    Последние записи каждого канала доступны через ``get`` без обращения
+    к Telegram, пока они не старше ``max_age`` (по умолчанию три
+    интервала): если обновление остановлено или падает, ``get`` перестает
+    их отдавать. После перезапуска записи поднимаются из файла состояния
+    вместе со временем сохранения. Если передан ``repository``, записи
+    после каждого обновления сохраняются в БД.
+    """
+
+    def __init__(
+        self,
+        collector: TelegramStatsCollector,
+        channels: Iterable[str],
+        *,
+        limit: int,
+        interval: float,
+        jitter: float,
+        max_backoff: float,
+        max_age: float | None = None,
+        repository: ContentRepository | None = None,
+    ) -> None:
+        self.collector = collector
+        self.repository = repository
+        self.channels = list(dict.fromkeys(channels))
+        self.limit = limit
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.max_age = timedelta(
+            seconds=max_age if max_age is not None else 3 * interval + jitter
+        )
+        self.status = {channel: RefreshStatus() for channel in self.channels}
+        self._snapshots: dict[str, tuple[datetime, Sequence[dict]]] = {}
+        self._locks = {channel: asyncio.Lock() for channel in self.channels}
+        self._task: asyncio.Task[None] | None = None
+
+        for channel in self.channels:
+            records = collector.state_store.get_records(channel)
+            saved_at = collector.state_store.get_saved_at(channel)
+            if records and saved_at is not None:
+                self._snapshots[channel] = (saved_at, TelegramRecordStore(records).view)
+                self.status[channel].records = len(records)
+
+    def get(self, channel_username: str) -> Sequence[dict] | None:
+        """Последние записи канала, если они не старше ``max_age``"""
+        snapshot = self._snapshots.get(channel_username)
+        if snapshot is None or datetime.now(UTC) - snapshot[0] > self.max_age:
+            return None
+        return snapshot[1]
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def run(self) -> None:
+        while True:
+            now = monotonic()
+            due = [
+                channel for channel in self.channels
+                if self.status[channel].next_run_at <= now
+            ]
+            for channel in due:
+                await self.refresh(channel)
+            next_run_at = min(
+                (self.status[channel].next_run_at for channel in self.channels),
+                default=now + self.interval,
+            )
+            await asyncio.sleep(max(0.0, next_run_at - monotonic()))
+
+    async def refresh(self, channel_username: str) -> bool:
+        """Обновление одного канала; ``False``, если обновление уже идет или упало"""
+        status = self.status[channel_username]
+        lock = self._locks[channel_username]
+        if lock.locked():
+            status.skipped_overlaps += 1
+            return False
+
+        async with lock:
+            status.runs += 1
+            status.last_started_at = datetime.now(UTC)
+            started = perf_counter()
+            delay = self.interval
+            try:
+                with priority(Priority.BACKGROUND):
+                    records = await self.collector.collect_channel_updates(
+                        channel_username, limit=self.limit, raise_errors=True
+                    )
+                if self.repository is not None:
+                    await self.repository.upsert_many(records)
+            except Exception as e:
+                status.failures += 1
+                status.consecutive_failures += 1
+                status.last_error = repr(e)
+                delay = min(
+                    self.max_backoff,
+                    self.interval * 2 ** (status.consecutive_failures - 1),
+                )
+                _logger.warning(
+                    "Ошибка фонового обновления канала %s: %s", channel_username, e
+                )
+                return False
+            else:
+                status.last_success_at = datetime.now(UTC)
+                self._snapshots[channel_username] = (status.last_success_at, records)
+                status.records = len(records)
+                status.consecutive_failures = 0
+                status.last_error = None
+                return True
+            finally:
+                status.last_duration_sec = perf_counter() - started
+                status.next_run_at = monotonic() + max(
+                    1.0, delay + random.uniform(-self.jitter, self.jitter)
+                )
+
+    def metrics(self) -> dict[str, dict[str, object]]:
+        now = monotonic()
+        return {
+            channel: {
+                **attrs.asdict(status, filter=lambda a, _: a.name != "next_run_at"),
+                "next_run_in_sec": max(0.0, status.next_run_at - now),
+                "running": self._locks[channel].locked(),
+            }
+            for channel, status in self.status.items()
+        }
@@ -0,0 +1,45 @@
+"""Время сравнения выбранных постов с синтетическим реестром
+
+Запуск: ``python -m backend.benchmarks.compare [размер_реестра] [число_постов]``
+"""
+
+from __future__ import annotations
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from backend.application.compare_engine import CompareEngine
+
+
+def main(count: int = 1_000_000, selected: int = 50) -> None:
+    rng = np.random.default_rng(42)
+    ids = rng.permutation(count).astype(np.int64) + 1
+    views = rng.lognormal(8, 1.5, count).round()
+    likes = (views * rng.beta(2, 40, count)).round()
+    comments = (likes * rng.beta(1, 20, count)).round()
+    columns = {
+        "views": views,
+        "likes": likes,
+        "comments": comments,
+        "engagement_rate_percent": (likes + comments) / np.maximum(views, 1) * 100,
+        "sentiment": rng.uniform(-1, 1, count),
+    }
+
+    started = perf_counter()
+    engine = CompareEngine(ids, columns)
+    print(f"build {count} posts: {(perf_counter() - started) * 1000:.0f}ms")
+
+    wanted = rng.choice(ids, selected, replace=False).tolist()
+    engine.compare(wanted)
+    runs = 100
+    started = perf_counter()
+    for _ in range(runs):
+        result = engine.compare(wanted)
+    elapsed = (perf_counter() - started) * 1000 / runs
+    print(f"compare {len(result['items'])} posts: {elapsed:.2f}ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,144 @@
+"""Планы и время запросов AnalyticsFilters на синтетическом реестре
+
+Запуск: ``python -m backend.benchmarks.content_query [количество_постов]``
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import sys
+import tempfile
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.domain.models import Base, ContentType, Platform
+from backend.domain.schemas import AnalyticsFilters
+from backend.infra.content_query import build_content_query, encode_cursor
+from backend.infra.content_repository import ContentRepository
+from backend.infra.content_search import create_search_table
+from backend.infra.db import create_db_engine
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+_TAGS = ("#news", "#ai", "#sport", "#tech", "#music", "#travel", "#food", "#promo")
+_SCENARIOS = {
+    "latest": AnalyticsFilters(),
+    "telegram 30d": AnalyticsFilters(platforms=["tg"], date_range="30d"),
+    "top likes, min views": AnalyticsFilters(
+        sort_by="likes", min_views=50_000, limit=100
+    ),
+    "engagement asc, videos": AnalyticsFilters(
+        sort_by="engagement_rate", sort_order="asc", content_types=["video"]
+    ),
+    "any of two tags": AnalyticsFilters(tags=["#ai", "#tech"]),
+    "all of two tags": AnalyticsFilters(tags=["#ai", "#tech"], require_all_tags=True),
+    "rare tag": AnalyticsFilters(tags=["#rare"]),
+    "rare and common tag": AnalyticsFilters(
+        tags=["#rare", "#ai"], require_all_tags=True
+    ),
+    "unknown tag": AnalyticsFilters(tags=["#missing"]),
+}
+
+
+def _records(count: int) -> list[dict]:
+    rng = random.Random(42)
+    now = datetime.now(UTC)
+    platforms = list(Platform)
+    content_types = list(ContentType)
+    return [
+        {
+            "title": f"Post {i}",
+            "url": f"https://example.com/{i}",
+            "content_type": rng.choice(content_types),
+            "platform": rng.choice(platforms),
+            "published_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+            "likes": rng.randint(0, 10_000),
+            "shares": rng.randint(0, 1_000),
+            "comments": rng.randint(0, 500),
+            "views": rng.randint(0, 100_000),
+            "engagement_rate_percent": rng.random() * 20,
+            "sentiment": rng.random(),
+            "tags_str": ",".join(
+                rng.sample(_TAGS, rng.randint(0, 3)) + (["#rare"] if i % 1000 == 0 else [])
+            ),
+        }
+        for i in range(count)
+    ]
+
+
+async def _explain(connection: AsyncConnection, filters: AnalyticsFilters) -> list[str]:
+    compiled = build_content_query(filters).compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+    return [row[-1] for row in result]
+
+
+async def main(count: int = 200_000) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.run_sync(create_search_table)
+        repository = ContentRepository(
+            async_sessionmaker(engine, expire_on_commit=False), batch_size=5000
+        )
+
+        started = perf_counter()
+        await repository.upsert_many(_records(count))
+        print(f"ingest {count} posts: {perf_counter() - started:.2f}s\n")
+        await repository.load_tag_index()
+
+        async with engine.connect() as connection:
+            for name, filters in _SCENARIOS.items():
+                await repository.query(filters)
+                started = perf_counter()
+                page = await repository.query(filters)
+                elapsed = (perf_counter() - started) * 1000
+                print(f"{name}: {len(page.items)} rows, {elapsed:.1f}ms")
+                if filters.tags:
+                    # Тот же фильтр без TagIndex — только через content_tag
+                    repository.tag_index_loaded = False
+                    await repository.query(filters)
+                    started = perf_counter()
+                    await repository.query(filters)
+                    elapsed = (perf_counter() - started) * 1000
+                    repository.tag_index_loaded = True
+                    print(f"    without tag index: {elapsed:.1f}ms")
+                for line in await _explain(connection, filters):
+                    print(f"    {line}")
+
+        # Глубокая страница: курсор против эквивалентного OFFSET
+        filters = AnalyticsFilters(limit=100)
+        depth = count * 9 // 10
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as session:
+            last_row = await session.scalar(
+                build_content_query(filters).limit(1).offset(depth - 1)
+            )
+            timings = {}
+            for name, query in (
+                ("cursor", build_content_query(
+                    filters, encode_cursor(last_row, filters.sort_by)
+                )),
+                ("OFFSET", build_content_query(filters).offset(depth)),
+            ):
+                started = perf_counter()
+                await session.execute(query)
+                timings[name] = (perf_counter() - started) * 1000
+        print(
+            f"\nrows {depth + 1}-{depth + 100}: cursor {timings['cursor']:.1f}ms, "
+            f"OFFSET {timings['OFFSET']:.1f}ms"
+        )
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
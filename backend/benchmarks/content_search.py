@@ -0,0 +1,93 @@
+"""Время полнотекстового поиска по синтетическому реестру
+
+Запуск: ``python -m backend.benchmarks.content_search [количество_постов]``
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import sys
+import tempfile
+from datetime import UTC, datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.domain.models import Base
+from backend.infra.content_repository import ContentRepository
+from backend.infra.content_search import MAX_RANKED, create_search_table
+from backend.infra.db import create_db_engine
+
+_STOPWORDS = ("и", "в", "на", "с", "что", "по", "не", "для", "это", "как", "из", "от")
+_WORDS = (
+    "новости", "технологии", "искусственный", "интеллект", "рынок", "компания",
+    "запуск", "обновление", "приложение", "пользователи", "рекорд", "спорт",
+    "матч", "команда", "концерт", "музыка", "альбом", "фильм", "премьера",
+    "путешествие", "город", "погода", "экономика", "курс", "рубль", "акции",
+    "исследование", "ученые", "космос", "ракета", "выборы", "закон", "школа",
+    "студенты", "конкурс", "розыгрыш", "скидки", "магазин", "рецепт", "кухня",
+)
+_QUERIES = (
+    "новость", "новости технологий", "искусственный интеллект", "ракет",
+    "концерт альбома", "курс рубля", "слово123",
+)
+
+
+def _records(count: int) -> list[dict]:
+    rng = random.Random(42)
+    now = datetime.now(UTC)
+    # Частоты слов по закону Ципфа, как в живых текстах: служебные слова
+    # есть почти в каждом посте, тематические — в заметной доле, хвост
+    # словаря — в единицах
+    vocabulary = [*_STOPWORDS, *_WORDS, *(f"слово{i}" for i in range(20_000))]
+    cum_weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    words = rng.choices(vocabulary, cum_weights=cum_weights, k=count * 60)
+    records = []
+    position = 0
+    for i in range(count):
+        length = rng.randint(20, 80)
+        records.append({
+            "title": " ".join(words[position:position + 5]).capitalize(),
+            "text": " ".join(words[position + 5:position + length]),
+            "url": f"https://example.com/{i}",
+            "platform": "telegram",
+            "published_at": now - timedelta(minutes=i),
+        })
+        position = (position + length) % (len(words) - 80)
+    return records
+
+
+async def main(count: int = 500_000) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.run_sync(create_search_table)
+        repository = ContentRepository(
+            async_sessionmaker(engine, expire_on_commit=False), batch_size=5000
+        )
+
+        records = _records(count)
+        started = perf_counter()
+        await repository.upsert_many(records)
+        print(f"ingest {count} posts: {perf_counter() - started:.2f}s\n")
+
+        # 0 — ранжирование всех совпадений, без границы по новизне
+        for max_ranked in (MAX_RANKED, 0):
+            repository.search_max_ranked = max_ranked
+            print(f"max_ranked={max_ranked}:")
+            for query in _QUERIES:
+                await repository.search(query)
+                started = perf_counter()
+                items = await repository.search(query)
+                elapsed = (perf_counter() - started) * 1000
+                print(f"    {query!r}: {len(items)} rows, {elapsed:.1f}ms")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000))
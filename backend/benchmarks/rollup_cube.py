@@ -0,0 +1,69 @@
+"""Время обновления и чтения агрегатов RollupCube на синтетическом реестре
+
+Запуск: ``python -m backend.benchmarks.rollup_cube [количество_постов] [дней_истории]``
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from datetime import UTC, datetime, timedelta
+from time import perf_counter
+
+from backend.domain.models import ContentType, Platform
+from backend.infra.rollup_cube import RollupCube
+
+
+def _timed(label: str, function: object, runs: int = 5) -> None:
+    started = perf_counter()
+    for _ in range(runs):
+        function()
+    print(f"{label}: {(perf_counter() - started) * 1000 / runs:.1f}ms")
+
+
+def main(count: int = 1_000_000, days: int = 730) -> None:
+    rng = random.Random(42)
+    now = datetime.now(UTC)
+    posts = [
+        (
+            post_id,
+            rng.choice(tuple(Platform)),
+            rng.choice(tuple(ContentType)),
+            now - timedelta(seconds=rng.randrange(days * 86400)),
+            {
+                "views": rng.lognormvariate(8, 1.5),
+                "likes": rng.randrange(500),
+                "comments": rng.randrange(50),
+                "engagement_rate_percent": rng.uniform(0, 15),
+                "sentiment": rng.uniform(-1, 1),
+            },
+        )
+        for post_id in range(count)
+    ]
+
+    cube = RollupCube()
+    started = perf_counter()
+    for post in posts:
+        cube.update(*post)
+    print(f"build {count} posts, {len(cube)} cells: {perf_counter() - started:.2f}s")
+
+    # Обновление метрик: снятие старого вклада и добавление нового
+    updates = rng.sample(posts, 10_000)
+    started = perf_counter()
+    for post_id, platform, content_type, published_at, values in updates:
+        cube.update(
+            post_id, platform, content_type, published_at,
+            {**values, "views": values["views"] * 1.1},
+        )
+    elapsed = (perf_counter() - started) * 1e6 / len(updates)
+    print(f"update: {elapsed:.1f}us per post")
+
+    week_ago = now - timedelta(days=7)
+    _timed("summary", cube.summary)
+    _timed("summary, last week", lambda: cube.summary(start_date=week_ago))
+    _timed("heatmap", cube.heatmap)
+    _timed("heatmap, vk", lambda: cube.heatmap(platform=Platform.VK))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
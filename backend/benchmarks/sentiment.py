@@ -0,0 +1,75 @@
+"""Сравнение LexiconSentimentEngine с прежним analyze_sentiment
+
+Запуск: ``python -m backend.benchmarks.sentiment [количество_текстов]``
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from time import perf_counter
+
+from backend.domain.sentiment import LexiconSentimentEngine
+
+_NEUTRAL_WORDS = (
+    "пост", "канал", "видео", "новости", "сегодня", "обзор", "релиз", "команда",
+    "проект", "неделя", "ссылка", "подписчики", "выпуск", "город", "данные",
+    "суперкомпьютер", "работа", "время", "вопрос", "ответ", "события", "итоги",
+)
+_LEXICON_WORDS = (
+    "отлично", "прекрасно", "супер", "спасибо", "хорошо", "плохо", "ужасно",
+    "кошмар", "разочарован", "отличный", "хорошая", "Спасибо", "ужасный",
+    "кошмарный", "разочарование",
+)
+# Оценки считаются совпавшими, если различаются меньше чем на _TOLERANCE
+_TOLERANCE = 1e-9
+
+
+def legacy_score(text: str) -> float:
+    """Прежняя реализация TelegramStatsCollector.analyze_sentiment"""
+    positive_words = ["отлично", "прекрасно", "супер", "спасибо", "хорошо"]
+    negative_words = ["плохо", "ужасно", "кошмар", "разочарован"]
+
+    score = 0.5
+
+    for word in positive_words:
+        if word in text.lower():
+            score += 0.1
+
+    for word in negative_words:
+        if word in text.lower():
+            score -= 0.1
+
+    return max(0.0, min(1.0, score))
+
+
+def main(count: int = 100_000) -> None:
+    rng = random.Random(42)
+    # Примерно каждое двадцатое слово — из словаря тональности
+    words = _NEUTRAL_WORDS * 3 + _LEXICON_WORDS[:4]
+    texts = [
+        " ".join(rng.choices(words, k=rng.randint(20, 120))) for _ in range(count)
+    ]
+    for i in range(0, count, 10):
+        texts[i] += " " + " ".join(rng.choices(_LEXICON_WORDS, k=3))
+    engine = LexiconSentimentEngine()
+
+    started = perf_counter()
+    legacy = [legacy_score(text) for text in texts]
+    legacy_elapsed = perf_counter() - started
+
+    started = perf_counter()
+    scores = engine.score_batch(texts)
+    engine_elapsed = perf_counter() - started
+
+    differ = sum(
+        abs(a - b) > _TOLERANCE for a, b in zip(legacy, scores, strict=True)
+    )
+    print(f"texts:  {count}")
+    print(f"legacy: {legacy_elapsed:.3f}s")
+    print(f"engine: {engine_elapsed:.3f}s ({legacy_elapsed / engine_elapsed:.1f}x)")
+    print(f"scores differ for {differ} texts")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
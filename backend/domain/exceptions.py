@@ -4,8 +4,16 @@ from fastapi.exceptions import HTTPException
 
 
 class NotFoundException(HTTPException):
-    def __init__(self, field_name: str):
+    def __init__(self, field_name: str) -> None:
         super().__init__(
             status_code=404,
             detail=f"{field_name} not found"
         )
+
+
+class InvalidFilterException(HTTPException):
+    def __init__(self, detail: str) -> None:
+        super().__init__(
+            status_code=400,
+            detail=detail
+        )
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
-import ast
 import enum
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, Enum, Float, Integer, String, func
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -21,16 +32,32 @@ class Platform(enum.StrEnum):
 
 
 class Base(DeclarativeBase):
+    # В SQLite автоинкремент работает только у INTEGER PRIMARY KEY
     id: Mapped[int] = mapped_column(
-        BigInteger, primary_key=True, autoincrement=True
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
     )
 
 
 class Content(Base):
     __tablename__ = "content"
+    # Индексы под сортировки AnalyticsFilters: id в конце каждого индекса
+    # делает порядок однозначным для keyset-пагинации
+    __table_args__ = (
+        Index("ix_content_published_at_id", "published_at", "id"),
+        Index("ix_content_platform_published_at_id", "platform", "published_at", "id"),
+        Index("ix_content_likes_id", "likes", "id"),
+        Index("ix_content_shares_id", "shares", "id"),
+        Index("ix_content_comments_id", "comments", "id"),
+        Index("ix_content_views_id", "views", "id"),
+        Index("ix_content_engagement_id", "engagement_rate_percent", "id"),
+        Index("ix_content_sentiment_id", "sentiment", "id"),
+    )
 
-    title: Mapped[str] = mapped_column(String, unique=True)
-    url: Mapped[str] = mapped_column(String)
+    title: Mapped[str] = mapped_column(String)
+    text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    url: Mapped[str] = mapped_column(String, unique=True)
     content_type: Mapped[ContentType] = mapped_column(Enum(ContentType))
     platform: Mapped[Platform] = mapped_column(Enum(Platform))
     published_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
@@ -52,6 +79,32 @@ class Content(Base):
 
     @property
     def tags(self) -> list[str]:
-        if self.tags_str:
-            return ast.literal_eval(self.tags_str)
+        return split_tags(self.tags_str)
+
+
+class ContentTag(Base):
+    """Нормализованные теги постов: строка на пару (пост, тег)"""
+
+    __tablename__ = "content_tag"
+    __table_args__ = (
+        UniqueConstraint("content_id", "tag"),
+        Index("ix_content_tag_tag_content_id", "tag", "content_id"),
+    )
+
+    content_id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        ForeignKey("content.id", ondelete="CASCADE"),
+    )
+    tag: Mapped[str] = mapped_column(String)
+
+
+def split_tags(tags_str: str | None) -> list[str]:
+    """Теги из ``tags_str``: коллекторы пишут их через запятую"""
+    if not tags_str:
         return []
+    return [tag for tag in (part.strip() for part in tags_str.split(",")) if tag]
+
+
+def normalize_tags(tags_str: str | None) -> list[str]:
+    """Уникальные теги в нижнем регистре для ``ContentTag`` и индекса тегов"""
+    return list(dict.fromkeys(tag.lower() for tag in split_tags(tags_str)))
@@ -8,8 +8,9 @@ from backend.domain.models import Platform
 
 
 class ContentItem(BaseModel):
+    # Экземпляры разделяются между запросами через ContentSnapshot
     model_config = {
-        "from_attributes": True, "arbitrary_types_allowed": True
+        "from_attributes": True, "arbitrary_types_allowed": True, "frozen": True
     }
 
     id: int
@@ -25,6 +26,16 @@ class ContentItem(BaseModel):
     tags: list[str]
 
 
+class SearchResult(ContentItem):
+    # Текст поста есть только в выдаче поиска: списки и снимок без него
+    text: str = ""
+
+
+class ContentPage(BaseModel):
+    items: list[ContentItem]
+    next_cursor: str | None = None
+
+
 class SummaryStats(BaseModel):
     model_config = {
         "from_attributes": True, "arbitrary_types_allowed": True
@@ -37,6 +48,36 @@ class SummaryStats(BaseModel):
     avg_sentiment: float
 
 
+class RollupSummary(SummaryStats):
+    # Приближенные квантили по метрикам: {"views": {"p50": ..., "p90": ...}}
+    quantiles: dict[str, dict[str, float]]
+
+
+class Heatmap(BaseModel):
+    metric: str
+    # Строки — дни недели с понедельника, столбцы — часы (UTC)
+    posts: list[list[int]]
+    mean: list[list[float]]
+
+
+class BreakdownGroup(BaseModel):
+    keys: dict[str, str]
+    count: int
+    sum: float
+    mean: float
+    median: float
+    p90: float
+    # id постов с наибольшим значением метрики в группе
+    top_ids: list[int]
+
+
+class StatsBreakdown(BaseModel):
+    by: list[str]
+    metric: str
+    total_groups: int
+    groups: list[BreakdownGroup]
+
+
 class AnalyticsFilters(BaseModel):
 
     start_date: datetime | None = None
@@ -63,6 +104,33 @@ class CompareRequest(BaseModel):
     ids: list[int]
 
 
+class CompareMetric(BaseModel):
+    value: float
+    # Разница и отношение к среднему по всему реестру
+    delta: float
+    ratio: float | None
+    # Место среди сравниваемых постов (1 — лучший) и процентиль в реестре
+    rank: int
+    percentile: float
+
+
+class ComparedItem(BaseModel):
+    item: ContentItem
+    metrics: dict[str, CompareMetric]
+
+
+class CompareBaseline(BaseModel):
+    mean: float
+    median: float
+
+
+class CompareResponse(BaseModel):
+    items: list[ComparedItem]
+    baseline: dict[str, CompareBaseline]
+    registry_size: int
+    missing_ids: list[int]
+
+
 class ChatRequest(BaseModel):
     query: str
 
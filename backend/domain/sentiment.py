@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+POSITIVE_WORDS = ("отлично", "прекрасно", "супер", "спасибо", "хорошо")
+NEGATIVE_WORDS = ("плохо", "ужасно", "кошмар", "разочарован")
+
+
+class SentimentEngine(Protocol):
+    def score(self, text: str) -> float: ...
+
+    def score_batch(self, texts: Iterable[str]) -> list[float]: ...
+
+
+class LexiconSentimentEngine:
+    """Словарная оценка тональности в диапазоне [0, 1]
+
+    Оценка совпадает с прежней ``analyze_sentiment``: слово словаря ищется
+    подстрокой, поэтому учитываются и его формы («кошмарный»,
+    «разочарование»), и каждое слово дает ``base ± step`` один раз.
+
+    Словарь собирается в одно регулярное выражение в форме префиксного
+    дерева, и текст проходится им один раз вместо поиска каждого слова
+    отдельно: цена прохода почти не растет с размером словаря.
+    Слова, вложенные в найденное, засчитываются вместе с ним. Совпадения
+    ``findall`` не пересекаются, поэтому слова, начало которых может
+    совпасть с концом найденного («хорошотлично»), дополнительно ищутся
+    подстрокой.
+    """
+
+    def __init__(
+        self,
+        positive: Iterable[str] = POSITIVE_WORDS,
+        negative: Iterable[str] = NEGATIVE_WORDS,
+        base: float = 0.5,
+        step: float = 0.1,
+    ) -> None:
+        self.base = base
+        self.step = step
+        weights: dict[str, int] = {}
+        for words, weight in ((positive, 1), (negative, -1)):
+            for word in words:
+                if word:
+                    weights[word.lower()] = weight
+        self._weights = weights
+        # Найденное слово означает, что в тексте есть и все его подстроки
+        self._contained = {
+            word: frozenset(other for other in weights if other in word)
+            for word in weights
+        }
+        # Слова, которые могут начинаться внутри найденного и выходить за
+        # его конец: такое совпадение findall пропускает
+        self._overlapping = {
+            word: frozenset(
+                other
+                for other in weights
+                if any(
+                    word.endswith(other[:size])
+                    for size in range(1, min(len(word), len(other)))
+                )
+            )
+            for word in weights
+        }
+        self._pattern = re.compile(_alternation(weights)) if weights else None
+
+    def score(self, text: str) -> float:
+        if not text or self._pattern is None:
+            return self.base
+        return self._score(text.lower())
+
+    def score_batch(self, texts: Iterable[str]) -> list[float]:
+        if self._pattern is None:
+            return [self.base for _ in texts]
+        score = self._score
+        return [score(text.lower()) for text in texts]
+
+    def _score(self, text: str) -> float:
+        found: set[str] = set()
+        overlapping: set[str] = set()
+        for word in set(self._pattern.findall(text)):
+            found |= self._contained[word]
+            overlapping |= self._overlapping[word]
+        found.update(word for word in overlapping - found if word in text)
+        total = sum(self._weights[word] for word in found)
+        return max(0.0, min(1.0, self.base + self.step * total))
+
+
+def _alternation(words: Iterable[str]) -> str:
+    """Слова одним выражением с общими префиксами
+
+    ``супер|спасибо`` -> ``с(?:упер|пасибо)``; на каждой позиции совпадает
+    самое длинное слово.
+    """
+    branches: dict[str, list[str]] = {}
+    complete = False
+    for word in words:
+        if word:
+            branches.setdefault(word[0], []).append(word[1:])
+        else:
+            complete = True
+    pattern = "|".join(
+        re.escape(char) + _alternation(rest) for char, rest in branches.items()
+    )
+    if complete:
+        # Квантификатор жадный: сначала пробуется продолжение слова
+        return f"(?:{pattern})?" if pattern else ""
+    return pattern if len(branches) == 1 else f"(?:{pattern})"
+
+
+default_engine = LexiconSentimentEngine()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+# Окончания алгоритма Snowball для русского языка. Группы *_PRECEDED
+# отбрасываются только после «а» или «я», которые остаются в основе.
+_VOWELS = frozenset("аеиоуыэюя")
+_PERFECTIVE_GERUND_PRECEDED = ("вшись", "вши", "в")
+_PERFECTIVE_GERUND = ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв")
+_ADJECTIVE = (
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей", "ий",
+    "ый", "ой", "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою",
+    "ею",
+)
+_PARTICIPLE_PRECEDED = ("ем", "нн", "вш", "ющ", "щ")
+_PARTICIPLE = ("ивш", "ывш", "ующ")
+_REFLEXIVE = ("ся", "сь")
+_VERB_PRECEDED = (
+    "ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но", "ет", "ют",
+    "ны", "ть", "й", "л", "н",
+)
+_VERB = (
+    "ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено",
+    "ует", "уют", "ены", "ить", "ыть", "ишь", "ей", "уй", "ил", "ыл", "им", "ым",
+    "ен", "ят", "ит", "ыт", "ую", "ю",
+)
+_NOUN = (
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие", "ье", "еи",
+    "ии", "ей", "ой", "ий", "ям", "ем", "ам", "ом", "ах", "ях", "ию", "ью", "ия",
+    "ья", "а", "е", "и", "й", "о", "у", "ы", "ь", "ю", "я",
+)
+_SUPERLATIVE = ("ейше", "ейш")
+_DERIVATIONAL = ("ость", "ост")
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Основа русского слова по алгоритму Snowball (Porter для русского)"""
+    word = word.lower().replace("ё", "е")
+    rv = _rv_start(word)
+    if rv is None:
+        return word
+    r2 = _r2_start(word)
+
+    # Шаг 1
+    stripped = _strip(word, rv, _PERFECTIVE_GERUND_PRECEDED, _PERFECTIVE_GERUND)
+    if stripped is None:
+        word = _strip(word, rv, (), _REFLEXIVE) or word
+        stripped = _strip_adjectival(word, rv)
+        if stripped is None:
+            stripped = _strip(word, rv, _VERB_PRECEDED, _VERB)
+        if stripped is None:
+            stripped = _strip(word, rv, (), _NOUN)
+    if stripped is not None:
+        word = stripped
+
+    # Шаг 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    word = _strip(word, r2, (), _DERIVATIONAL) or word
+
+    # Шаг 4
+    if word.endswith("нн"):
+        return word[:-1]
+    superlative = _strip(word, rv, (), _SUPERLATIVE)
+    if superlative is not None:
+        return superlative[:-1] if superlative.endswith("нн") else superlative
+    if word.endswith("ь") and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
+
+
+def _rv_start(word: str) -> int | None:
+    for i, char in enumerate(word):
+        if char in _VOWELS:
+            return i + 1
+    return None
+
+
+def _r2_start(word: str) -> int:
+    def region(start: int) -> int:
+        for i in range(start + 1, len(word)):
+            if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+                return i + 1
+        return len(word)
+
+    return region(region(0))
+
+
+def _strip(
+    word: str, start: int, preceded: tuple[str, ...], plain: tuple[str, ...]
+) -> str | None:
+    """Отбрасывание самого длинного окончания, целиком лежащего в регионе"""
+    best: tuple[int, str] | None = None
+    for ending in preceded:
+        cut = len(word) - len(ending)
+        if (
+            word.endswith(ending)
+            and cut - 1 >= start
+            and word[cut - 1] in "ая"
+            and (best is None or len(ending) > best[0])
+        ):
+            best = (len(ending), word[:cut])
+    for ending in plain:
+        cut = len(word) - len(ending)
+        if (
+            word.endswith(ending)
+            and cut >= start
+            and (best is None or len(ending) > best[0])
+        ):
+            best = (len(ending), word[:cut])
+    return None if best is None else best[1]
+
+
+def _strip_adjectival(word: str, rv: int) -> str | None:
+    stripped = _strip(word, rv, (), _ADJECTIVE)
+    if stripped is None:
+        return None
+    return _strip(stripped, rv, _PARTICIPLE_PRECEDED, _PARTICIPLE) or stripped
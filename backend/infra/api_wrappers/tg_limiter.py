@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import heapq
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from telethon.errors import FloodWaitError
+
+from backend.infra.config import config
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Generator
+
+
+class Priority(enum.IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+request_priority: ContextVar[Priority] = ContextVar(
+    "tg_request_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def priority(value: Priority) -> Generator[None]:
+    """Выполнение запросов к Telegram внутри блока с заданным приоритетом"""
+    token = request_priority.set(value)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class TelegramRateLimiter:
+    """Общий для процесса token bucket для всех RPC к Telegram
+
+    Запросы ждут токен в очереди по приоритету (интерактивные раньше
+    фоновых). ``FloodWaitError`` останавливает выдачу токенов на
+    ``seconds`` и вдвое снижает скорость, после чего она плавно
+    восстанавливается до базовой на успешных запросах.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_flood_wait: float,
+        min_rate: float = 0.1,
+    ) -> None:
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.max_flood_wait = max_flood_wait
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._flood_until = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future[None], int]] = []
+        self._seq = itertools.count()
+        self._dispatcher: asyncio.Task[None] | None = None
+        self._queued = dict.fromkeys(Priority, 0)
+        self._granted = dict.fromkeys(Priority, 0)
+        self._wait_total = dict.fromkeys(Priority, 0.0)
+        self._wait_max = dict.fromkeys(Priority, 0.0)
+        self._flood_waits = 0
+        self._last_flood_wait = 0
+
+    async def acquire(self, cost: int = 1, priority: Priority | None = None) -> None:
+        priority = request_priority.get() if priority is None else priority
+        cost = max(1, min(cost, self.burst))
+        started = monotonic()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future, cost))
+        self._queued[priority] += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await future
+        finally:
+            self._queued[priority] -= 1
+            if not future.done():
+                future.cancel()
+        waited = monotonic() - started
+        self._granted[priority] += 1
+        self._wait_total[priority] += waited
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+
+    async def call[T](
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: object,
+        cost: int = 1,
+        **kwargs: object,
+    ) -> T:
+        """Вызов RPC через лимитер с повтором после допустимого FloodWait"""
+        while True:
+            await self.acquire(cost)
+            try:
+                result = await func(*args, **kwargs)
+            except FloodWaitError as e:
+                self.on_flood_wait(e.seconds)
+                if e.seconds > self.max_flood_wait:
+                    raise
+                continue
+            self.on_success()
+            return result
+
+    def on_flood_wait(self, seconds: int) -> None:
+        self._flood_waits += 1
+        self._last_flood_wait = seconds
+        self._flood_until = max(self._flood_until, monotonic() + seconds)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0.0
+
+    def on_success(self) -> None:
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "rate": self.rate,
+            "base_rate": self.base_rate,
+            "burst": self.burst,
+            "tokens": self._refill(),
+            "flood_wait_remaining": max(0.0, self._flood_until - monotonic()),
+            "flood_waits": self._flood_waits,
+            "last_flood_wait": self._last_flood_wait,
+            "priorities": {
+                p.name.lower(): {
+                    "queue_depth": self._queued[p],
+                    "granted": self._granted[p],
+                    "avg_wait_sec": (
+                        self._wait_total[p] / self._granted[p]
+                        if self._granted[p] else 0.0
+                    ),
+                    "max_wait_sec": self._wait_max[p],
+                }
+                for p in Priority
+            },
+        }
+
+    def _refill(self) -> float:
+        now = monotonic()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        return self._tokens
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            _, _, future, cost = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            tokens = self._refill()
+            delay = max(
+                self._flood_until - monotonic(),
+                (cost - tokens) / self.rate if tokens < cost else 0.0,
+            )
+            if delay > 0:
+                # После сна заново берется вершина кучи: за это время мог
+                # прийти запрос с более высоким приоритетом
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(self._waiters)
+            self._tokens -= cost
+            future.set_result(None)
+
+
+rate_limiter = TelegramRateLimiter(
+    rate=config.tg_rate_per_sec,
+    burst=config.tg_rate_burst,
+    max_flood_wait=config.tg_max_flood_wait_sec,
+)
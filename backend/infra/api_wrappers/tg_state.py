@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from backend.domain.models import ContentType, Platform
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class TelegramStateStore:
+    """Файловое хранилище состояния инкрементального сбора по каналам
+
+    Для каждого канала хранится максимальный ``message.id`` (high-water mark),
+    последние собранные записи и время их сохранения, чтобы следующий сбор
+    запрашивал у Telegram только новые сообщения.
+
+    Состояние держится в памяти, а файл перезаписывается в отдельном потоке
+    через временный файл и ``replace``: цикл событий не ждет диск, а сбой
+    посреди записи не портит прежний файл.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._state: dict[str, dict[str, Any]] | None = None
+        self._write_lock = asyncio.Lock()
+
+    def _load_all(self) -> dict[str, dict[str, Any]]:
+        if self._state is None:
+            try:
+                self._state = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._state = {}
+        return self._state
+
+    def get_max_id(self, channel_username: str) -> int:
+        return self._load_all().get(channel_username, {}).get("max_id", 0)
+
+    def get_records(self, channel_username: str) -> list[dict]:
+        records = self._load_all().get(channel_username, {}).get("records", [])
+        return [_decode_record(record) for record in records]
+
+    def get_saved_at(self, channel_username: str) -> datetime | None:
+        saved_at = self._load_all().get(channel_username, {}).get("saved_at")
+        return datetime.fromisoformat(saved_at) if saved_at else None
+
+    async def save(self, channel_username: str, records: list[dict]) -> None:
+        state = self._load_all()
+        previous_max = state.get(channel_username, {}).get("max_id", 0)
+        state[channel_username] = {
+            "max_id": max(
+                (record["tg_id"] for record in records), default=previous_max
+            ),
+            "records": records,
+            "saved_at": datetime.now(UTC).isoformat(),
+        }
+        await self._flush()
+
+    async def reset(self, channel_username: str) -> None:
+        if self._load_all().pop(channel_username, None) is not None:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        # Записи каналов заменяются целиком, поэтому потоку хватает копии
+        # верхнего уровня; снимок берется под замком, и файл всегда получает
+        # последнее состояние
+        async with self._write_lock:
+            await asyncio.to_thread(self._write, dict(self._load_all()))
+
+    def _write(self, state: dict[str, dict[str, Any]]) -> None:
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps(state, ensure_ascii=False, default=_encode_value),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.path)
+
+
+def _encode_value(value: object) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _decode_record(record: dict) -> dict:
+    decoded = dict(record)
+    if isinstance(decoded.get("published_at"), str):
+        decoded["published_at"] = datetime.fromisoformat(decoded["published_at"])
+    if "content_type" in decoded:
+        decoded["content_type"] = ContentType(decoded["content_type"])
+    if "platform" in decoded:
+        decoded["platform"] = Platform(decoded["platform"])
+    return decoded
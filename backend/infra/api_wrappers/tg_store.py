@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, overload
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import Any
+
+INT_COLUMNS = (
+    "id", "tg_id", "likes", "shares", "comments", "views", "links", "mentions",
+    "saves", "unique_views",
+)
+# Счетчики неотрицательны и почти всегда меньше 2^32: хранятся в uint32,
+# а колонка расширяется до int64 на первом значении, которое не влезает
+COUNTER_COLUMNS = frozenset(INT_COLUMNS) - {"id", "tg_id"}
+FLOAT_COLUMNS = (
+    "avg_watch_time_sec",
+    "completion_rate_percent",
+    "sentiment",
+    "click_through_rate_percent",
+    "engagement_rate_percent",
+)
+CATEGORY_COLUMNS = ("content_type", "platform")
+STRING_COLUMNS = ("title", "text", "url", "tags_str")
+# Порядок ключей как у словарей из TelegramStatsCollector.extract_message_data
+FIELD_ORDER = (
+    "id", "tg_id", "title", "text", "url", "content_type", "platform", "published_at",
+    "likes", "shares", "comments", "views", "tags_str", "links", "mentions",
+    "saves", "unique_views",
+    "avg_watch_time_sec", "completion_rate_percent", "sentiment",
+    "click_through_rate_percent", "engagement_rate_percent",
+)
+_KNOWN_COLUMNS = frozenset(FIELD_ORDER)
+_NUMPY_TYPES = {"I": np.uint32, "q": np.int64, "d": np.float64}
+
+
+class TelegramRecordStore:
+    """Колоночное хранилище записей, собранных из Telegram
+
+    Числовые метрики лежат в типизированных ``array`` (счетчики — в
+    uint32), категориальные поля хранятся кодами, повторяющиеся строки
+    интернируются. Редкие ключи (например, тексты комментариев) хранятся
+    разреженно по номеру строки. Сводка считается NumPy прямо по буферам
+    колонок, без копирования. Для старого кода доступен ``view`` —
+    последовательность словарей, собираемых по требованию. ``collected_at`` —
+    время сбора записей.
+    """
+
+    def __init__(
+        self, records: Iterable[dict] = (), collected_at: datetime | None = None
+    ) -> None:
+        self.collected_at = collected_at
+        self._reset()
+        self.extend(records)
+
+    def _reset(self) -> None:
+        self._ints = {
+            name: array("I" if name in COUNTER_COLUMNS else "q") for name in INT_COLUMNS
+        }
+        self._floats = {name: array("d") for name in FLOAT_COLUMNS}
+        self._codes = {name: array("B") for name in CATEGORY_COLUMNS}
+        self._categories: dict[str, list[Any]] = {name: [] for name in CATEGORY_COLUMNS}
+        self._strings: dict[str, list[str]] = {name: [] for name in STRING_COLUMNS}
+        self._published_at = array("d")
+        self._extras: dict[int, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._published_at)
+
+    @property
+    def view(self) -> RecordsView:
+        return RecordsView(self)
+
+    def append(self, record: dict) -> None:
+        for name, column in self._ints.items():
+            value = int(record.get(name) or 0)
+            try:
+                column.append(value)
+            except OverflowError:
+                wide = self._ints[name] = array("q", column)
+                wide.append(value)
+        for name, column in self._floats.items():
+            column.append(float(record.get(name) or 0.0))
+        for name, column in self._codes.items():
+            column.append(self._category_code(name, record.get(name)))
+        for name, column in self._strings.items():
+            column.append(record.get(name) or "")
+        # Хештеги часто повторяются между постами, заголовки и ссылки — нет
+        self._strings["tags_str"][-1] = sys.intern(self._strings["tags_str"][-1])
+        published_at = record.get("published_at")
+        self._published_at.append(
+            published_at.timestamp() if isinstance(published_at, datetime) else math.nan
+        )
+        extras = {k: v for k, v in record.items() if k not in _KNOWN_COLUMNS}
+        if extras:
+            self._extras[len(self) - 1] = extras
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.append(record)
+
+    def clear(self) -> None:
+        self.collected_at = None
+        self._reset()
+
+    def row(self, index: int) -> dict:
+        record: dict[str, Any] = {}
+        for name in FIELD_ORDER:
+            if name in self._ints:
+                record[name] = self._ints[name][index]
+            elif name in self._floats:
+                record[name] = self._floats[name][index]
+            elif name in self._strings:
+                record[name] = self._strings[name][index]
+            elif name in self._codes:
+                record[name] = self._categories[name][self._codes[name][index]]
+            else:
+                timestamp = self._published_at[index]
+                record[name] = (
+                    None if math.isnan(timestamp)
+                    else datetime.fromtimestamp(timestamp, UTC)
+                )
+        record.update(self._extras.get(index, ()))
+        return record
+
+    def column(self, name: str) -> array:
+        return self._ints[name] if name in self._ints else self._floats[name]
+
+    def summary(self) -> dict[str, int]:
+        comments = self._numpy("comments")
+        return {
+            "total_posts": len(self),
+            "total_comments": int(comments.sum(dtype=np.int64)),
+            "total_views": int(self._numpy("views").sum(dtype=np.int64)),
+            "total_likes": int(self._numpy("likes").sum(dtype=np.int64)),
+            "posts_with_comments": int(np.count_nonzero(comments)),
+        }
+
+    def _numpy(self, name: str) -> np.ndarray:
+        column = self.column(name)
+        return np.frombuffer(column, dtype=_NUMPY_TYPES[column.typecode])
+
+    def comment_texts(self) -> Iterator[list[str]]:
+        for extras in self._extras.values():
+            if texts := extras.get("comment_texts"):
+                yield texts
+
+    def _category_code(self, name: str, value: Any) -> int:
+        values = self._categories[name]
+        try:
+            return values.index(value)
+        except ValueError:
+            values.append(value)
+            return len(values) - 1
+
+
+class RecordsView(Sequence[dict]):
+    """Последовательность словарей поверх ``TelegramRecordStore``"""
+
+    __slots__ = ("store",)
+
+    def __init__(self, store: TelegramRecordStore) -> None:
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @overload
+    def __getitem__(self, index: int) -> dict: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[dict]: ...
+
+    def __getitem__(self, index: int | slice) -> dict | list[dict]:
+        if isinstance(index, slice):
+            return [self.store.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = "record index out of range"
+            raise IndexError(msg)
+        return self.store.row(index)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self.store.row(i)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+import attrs
+from telethon.tl.types import (
+    MessageEntityHashtag,
+    MessageEntityMention,
+    MessageEntityMentionName,
+    MessageEntityTextUrl,
+    MessageEntityUrl,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+    MessageMediaPoll,
+)
+
+from backend.domain.models import ContentType
+
+if TYPE_CHECKING:
+    from telethon.tl.types import Message
+
+TITLE_MAX_LENGTH = 50
+
+# Запасной разбор для сообщений без entities. Каждый шаблон начинается с
+# литерала, поэтому re ищет его быстрым поиском подстроки, а не перебором
+# альтернатив в каждой позиции.
+_TAG_RE = re.compile(r"#\w+")
+_MENTION_RE = re.compile(r"@\w+")
+_LINK_RE = re.compile(r"https?://\S+")
+# Типы сущностей разбираются поиском в словаре вместо цепочки isinstance
+_ENTITY_KINDS = {
+    MessageEntityHashtag: "tag",
+    MessageEntityUrl: "link",
+    MessageEntityTextUrl: "link",
+    MessageEntityMention: "mention",
+    MessageEntityMentionName: "mention",
+}
+
+
+@attrs.frozen(slots=True)
+class TextFeatures:
+    title: str
+    tags: tuple[str, ...]
+    content_type: ContentType
+    links: int
+    mentions: int
+
+    @property
+    def tags_str(self) -> str:
+        return ",".join(self.tags)
+
+
+def extract_title(message: Message) -> str:
+    """Первая строка сообщения, обрезанная до ``TITLE_MAX_LENGTH`` символов"""
+    text = message.message
+    if not text:
+        return f"Message {message.id}"
+    end = text.find("\n")
+    first_line = text if end == -1 else text[:end]
+    if len(first_line) > TITLE_MAX_LENGTH:
+        return first_line[:TITLE_MAX_LENGTH] + "..."
+    return first_line
+
+
+def determine_content_type(message: Message) -> ContentType:
+    """Тип контента по медиа, для текстовых сообщений — по словам об опросе"""
+    media = message.media
+    if isinstance(media, MessageMediaDocument):
+        mime_type = media.document.mime_type or ""
+        return ContentType.VIDEO if mime_type.startswith("video/") else ContentType.POST
+    if isinstance(media, (MessageMediaPhoto, MessageMediaPoll)):
+        return ContentType.POST
+    text = (message.message or "").lower()
+    if "опрос" in text or "poll" in text or "quiz" in text:
+        return ContentType.POST
+    return ContentType.ARTICLE
+
+
+def extract_text_features(message: Message) -> TextFeatures:
+    """Заголовок, хештеги, тип контента, ссылки и упоминания сообщения
+
+    Если Telegram прислал ``message.entities``, хештеги берутся по их
+    смещениям (в UTF-16), а ссылки и упоминания считаются по типам сущностей
+    без разбора текста. Иначе используются регулярные выражения.
+    """
+    text = message.message or ""
+    entities = message.entities
+    tags: list[str] = []
+    links = mentions = 0
+
+    if entities is not None:
+        encoded: bytes | None = None
+        for entity in entities:
+            kind = _ENTITY_KINDS.get(type(entity))
+            if kind == "tag":
+                if encoded is None:
+                    encoded = text.encode("utf-16-le")
+                    # Без символов вне BMP смещения UTF-16 совпадают с индексами str
+                    if len(encoded) == 2 * len(text):
+                        encoded = b""
+                if encoded:
+                    start = 2 * entity.offset
+                    tags.append(
+                        encoded[start:start + 2 * entity.length].decode("utf-16-le")
+                    )
+                else:
+                    tags.append(text[entity.offset:entity.offset + entity.length])
+            elif kind == "link":
+                links += 1
+            elif kind == "mention":
+                mentions += 1
+    elif text:
+        if "#" in text:
+            tags = _TAG_RE.findall(text)
+        if "@" in text:
+            mentions = len(_MENTION_RE.findall(text))
+        if "://" in text:
+            links = len(_LINK_RE.findall(text))
+
+    return TextFeatures(
+        title=extract_title(message),
+        tags=tuple(tags),
+        content_type=determine_content_type(message),
+        links=links,
+        mentions=mentions,
+    )
+
+
+def extract_tags(text: str) -> str:
+    """Хештеги из текста через запятую (без сущностей Telegram)"""
+    if not text:
+        return ""
+    return ",".join(_TAG_RE.findall(text))
@@ -2,26 +2,78 @@ from __future__ import annotations
 
 import asyncio
 import csv
-import re
-from datetime import datetime
+import logging
+import math
+from datetime import UTC, datetime
 from io import StringIO
+from operator import itemgetter
+from typing import TYPE_CHECKING
 
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
 from telethon.sessions import StringSession
-from telethon.tl.functions.messages import GetDiscussionMessageRequest
-from telethon.tl.types import Message, MessageMediaDocument, MessageMediaPhoto
 
-from backend.domain.models import ContentType, Platform
+from backend.domain.models import Platform
+from backend.domain.sentiment import default_engine
+from backend.infra.api_wrappers import tg_text
+from backend.infra.api_wrappers.tg_limiter import rate_limiter
+from backend.infra.api_wrappers.tg_state import TelegramStateStore
+from backend.infra.api_wrappers.tg_store import RecordsView, TelegramRecordStore
 from backend.infra.config import config
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+    from typing import Any
+
+    from telethon.tl.types import Message
+
+    from backend.domain.models import ContentType
+    from backend.domain.sentiment import SentimentEngine
+    from backend.infra.api_wrappers.tg_limiter import TelegramRateLimiter
+
+_logger = logging.getLogger(__name__)
+
+CSV_HEADERS = [
+    "Title", "URL", "Content Type", "Platform", "Published At",
+    "Likes", "Shares", "Comments Count", "Views", "Tags",
+    "Comments Retrieved", "Comment Texts"
+]
+
 
 class TelegramStatsCollector:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        state_store: TelegramStateStore | None = None,
+        limiter: TelegramRateLimiter | None = None,
+        sentiment_engine: SentimentEngine | None = None,
+    ) -> None:
+        # FloodWait не ждем внутри Telethon: паузы и темп задает общий лимитер
         self.client = TelegramClient(
-            StringSession(config.tg_session_string), config.tg_api_id, config.tg_api_hash
+            StringSession(config.tg_session_string),
+            config.tg_api_id,
+            config.tg_api_hash,
+            flood_sleep_threshold=0,
         )
-        self.collected_data = []
-        self.collection_timestamp: datetime | None = None
+        self.state_store = state_store or TelegramStateStore(config.tg_state_path)
+        self.limiter = limiter or rate_limiter
+        self.sentiment_engine = sentiment_engine or default_engine
+        # Экземпляр общий для всех запросов, поэтому методы сбора его не
+        # меняют и возвращают свои записи; store — только для collected_data
+        self.store = TelegramRecordStore()
+
+    @property
+    def collected_data(self) -> RecordsView:
+        """Записи, переданные через сеттер, для методов экспорта без ``data``"""
+        return self.store.view
+
+    @collected_data.setter
+    def collected_data(self, records: Iterable[dict]) -> None:
+        collected_at = records.store.collected_at if isinstance(records, RecordsView) else None
+        self.store = TelegramRecordStore(records, collected_at)
+
+    @property
+    def collection_timestamp(self) -> datetime | None:
+        return self.store.collected_at
 
     async def __aenter__(self):
         await self.client.connect()
@@ -31,80 +83,71 @@ class TelegramStatsCollector:
         if self.client:
             await self.client.disconnect()
 
-    async def collect_channel_stats(self, channel_username: str, limit: int = 1000):
-        """Сбор статистики со всего канала"""
-        try:
-            channel = await self.client.get_entity(channel_username)
-            messages = await self.client.get_messages(channel, limit=limit)
-            print(channel, channel_username)
-            for index, message in enumerate(messages):
-                if not message.message:
-                    continue
+    async def ensure_connected(self) -> None:
+        """Подключение клиента, если соединение не установлено или потеряно"""
+        if not self.client.is_connected():
+            await self.client.connect()
 
-                content_data = await self.extract_message_data(index, message, channel)
-                await self.save_content_stats(content_data)
+    async def is_healthy(self) -> bool:
+        """Проверка соединения легким запросом к Telegram"""
+        try:
+            await self.ensure_connected()
+            return await self.limiter.call(self.client.get_me, input_peer=True) is not None
+        except Exception as e:
+            _logger.warning("Проверка соединения с Telegram не пройдена: %s", e)
+            return False
 
+    async def reconnect(self) -> None:
+        """Принудительное переподключение клиента"""
+        try:
+            await self.client.disconnect()
         except Exception as e:
-            print(f"Ошибка сбора статистики: {e}")
+            _logger.warning("Ошибка отключения от Telegram: %s", e)
+        await self.client.connect()
+        _logger.info("Клиент Telegram переподключен")
 
-    async def extract_message_data(self, index: int, message: Message, channel) -> dict:
+    async def extract_message_data(
+        self, index: int, message: Message, channel, sentiment: float | None = None
+    ) -> dict:
         """Извлечение данных из сообщения"""
-        content_type = self.determine_content_type(message)
+        features = tg_text.extract_text_features(message)
+        comments = self.count_comments(message)
 
         base_metrics = {
             "id": index,
             "tg_id": message.id,
-            "title": self.extract_title(message),
+            "title": features.title,
+            "text": message.message or "",
             "url": f"https://t.me/{channel.username}/{message.id}",
-            "content_type": content_type,
+            "content_type": features.content_type,
             "platform": Platform.TELEGRAM,
             "published_at": message.date,
             "likes": (getattr(message, "reactions", None) and self.count_reactions(message.reactions)) or 0,
             "shares": message.forwards or 0 if message.forwards else 0,
-            "comments": await self.get_comments_count(message, channel),
+            "comments": comments,
             "views": message.views or 0 if hasattr(message, "views") else 0,
-            "tags_str": self.extract_tags(message.message),
+            "tags_str": features.tags_str,
+            "links": features.links,
+            "mentions": features.mentions,
         }
 
-        advanced_metrics = await self.calculate_advanced_metrics(message, channel)
+        advanced_metrics = await self.calculate_advanced_metrics(
+            message, channel, comments, sentiment
+        )
 
         return {**base_metrics, **advanced_metrics}
 
     def determine_content_type(self, message: Message) -> ContentType:
         """Определение типа контента"""
-        media = message.media
-
-        if isinstance(media, MessageMediaPhoto):
-            return ContentType.POST
-        if isinstance(media, MessageMediaDocument):
-            doc = media.document
-            if doc.mime_type.startswith("video/"):
-                return ContentType.VIDEO
-            if doc.mime_type.startswith("audio/"):
-                return ContentType.POST
-            return ContentType.POST
-        # Анализ текста для определения типа
-        text = message.message.lower()
-        if any(word in text for word in ["опрос", "опросы", "poll"]) or any(word in text for word in ["опрос", "quiz"]):
-            return ContentType.POST
-        return ContentType.ARTICLE
+        return tg_text.determine_content_type(message)
 
     def extract_title(self, message: Message) -> str:
         """Извлечение заголовка из сообщения"""
-        text = message.message
-        if not text:
-            return f"Message {message.id}"
-
-        # Берем первую строку или первые 50 символов
-        first_line = text.split("\n")[0]
-        return first_line[:50] + "..." if len(first_line) > 50 else first_line
+        return tg_text.extract_title(message)
 
     def extract_tags(self, text: str) -> str:
         """Извлечение хештегов из текста"""
-        if not text:
-            return ""
-        hashtags = re.findall(r"#\w+", text)
-        return ",".join(hashtags)
+        return tg_text.extract_tags(text)
 
     def count_reactions(self, reactions) -> int:
         """Подсчет общего количества реакций"""
@@ -112,107 +155,98 @@ class TelegramStatsCollector:
             return 0
         return sum(getattr(reaction, "count", 0) for reaction in reactions.results)
 
+    def count_comments(self, message: Message) -> int:
+        """Количество комментариев из ``message.replies`` без запросов к API"""
+        replies = getattr(message, "replies", None)
+        return getattr(replies, "replies", 0) or 0
+
+    async def get_comments_count(self, message: Message, channel) -> int:
+        """Получение общего количества комментариев"""
+        return self.count_comments(message)
+
     async def get_comments_texts(self, message: Message, channel, limit: int = 10) -> list[str]:
         """Получение списка текстов первых N комментариев"""
+        if not self.count_comments(message):
+            return []
         try:
-            discussion = await self.client.get_discussion_message(channel, message.id)
-
-            if not discussion or not hasattr(discussion, "replies"):
-                return []
-
-            replies = discussion.replies
             comment_texts = []
-
-            async for comment in self.client.iter_messages(
-                replies.chat_id,
-                limit=limit,
-                reply_to=replies.reply_to_msg_id
+            async for comment in self._iter_messages(
+                channel, reply_to=message.id, limit=limit
             ):
                 if comment.message and comment.message.strip():
                     comment_texts.append(comment.message.strip())
-
             return comment_texts
 
         except Exception as e:
-            print(f"Ошибка получения текстов комментариев: {e}")
+            _logger.warning("Ошибка получения текстов комментариев: %s", e)
             return []
 
-    async def get_comments_count(self, message: Message, channel) -> int:
-        """Получение общего количества комментариев"""
-        try:
-            discussion = await self.get_comments_data(channel, message.id)
-
-            if not discussion or not hasattr(discussion, "replies"):
-                return 0
-
-            replies = discussion.replies
-
-            if hasattr(replies, "replies_count"):
-                return replies.replies_count
-            if hasattr(replies, "max_id"):
-                return replies.max_id
-            return 0
-
-        except Exception as e:
-            print(f"Ошибка получения количества комментариев: {e}")
-            return 0
-
-    async def get_comments_data(self, message: Message, channel):
+    async def get_comments_data(self, message: Message, channel, limit: int = 10) -> dict:
         """Получение полных данных о комментариях: список текстов + количество"""
-        try:
-            # Параллельно получаем тексты и количество
-            comment_texts_task = self.get_comments_texts(message, channel, limit=10)
-            comments_count_task = self.get_comments_count(message, channel)
-
-            comment_texts, comments_count = await asyncio.gather(
-                comment_texts_task,
-                comments_count_task,
-                return_exceptions=True
-            )
-
-            # Обрабатываем возможные исключения
-            if isinstance(comment_texts, Exception):
-                print(f"Ошибка в get_comments_texts: {comment_texts}")
-                comment_texts = []
-            if isinstance(comments_count, Exception):
-                print(f"Ошибка в get_comments_count: {comments_count}")
-                comments_count = 0
-
-            return {
-                "comments_count": comments_count,
-                "comment_texts": comment_texts,  # Список строк с текстами комментариев
-                "has_comments": comments_count > 0,
-                "texts_retrieved": len(comment_texts)
-            }
-
-        except Exception as e:
-            print(f"Общая ошибка получения данных комментариев: {e}")
-            return {
-                "comments_count": 0,
-                "comment_texts": [],
-                "has_comments": False,
-                "texts_retrieved": 0
-            }
+        comments_count = self.count_comments(message)
+        comment_texts = await self.get_comments_texts(message, channel, limit=limit)
+        return {
+            "comments_count": comments_count,
+            "comment_texts": comment_texts,  # Список строк с текстами комментариев
+            "has_comments": comments_count > 0,
+            "texts_retrieved": len(comment_texts)
+        }
 
-    async def calculate_advanced_metrics(self, message: Message, channel) -> dict:
+    async def attach_comment_texts(
+        self,
+        records: list[dict],
+        messages: list[Message],
+        channel,
+        limit: int = 10,
+        concurrency: int | None = None,
+    ) -> None:
+        """Догрузка текстов комментариев для записей, у которых они есть
+
+        Запросы идут только по постам с ненулевым ``message.replies`` и не
+        более ``concurrency`` одновременно.
+        """
+        semaphore = asyncio.Semaphore(concurrency or config.tg_comments_concurrency)
+
+        async def attach(record: dict, message: Message) -> None:
+            async with semaphore:
+                record.update(await self.get_comments_data(message, channel, limit))
+
+        await asyncio.gather(*(
+            attach(record, message)
+            for record, message in zip(records, messages, strict=True)
+            if record["comments"]
+        ))
+
+    async def calculate_advanced_metrics(
+        self,
+        message: Message,
+        channel,
+        comments: int | None = None,
+        sentiment: float | None = None,
+    ) -> dict:
         """Вычисление расширенных метрик(не реализуются в ТГ)"""
-        engagement = await self.calculate_engagement_rate(message, channel)
+        engagement = await self.calculate_engagement_rate(message, channel, comments)
         return {
             "saves": 0,
             "unique_views": message.views or 0,
             "avg_watch_time_sec": 0,
             "completion_rate_percent": 0,
-            "sentiment": await self.analyze_sentiment(message),
+            "sentiment": (
+                await self.analyze_sentiment(message) if sentiment is None else sentiment
+            ),
             "click_through_rate_percent": 0,
             "engagement_rate_percent": engagement,
         }
 
-    async def calculate_engagement_rate(self, message: Message, channel) -> float:
+    async def calculate_engagement_rate(
+        self, message: Message, channel, comments: int | None = None
+    ) -> float:
         try:
             views = message.views or 1
             reactions = self.count_reactions(getattr(message, "reactions", None))
             shares = message.forwards or 0
-            comments = await self.get_comments_count(message, channel)
+            if comments is None:
+                comments = self.count_comments(message)
 
             engagement = (reactions + shares + comments) / views * 100
             return min(engagement, 100)
@@ -220,113 +254,334 @@ class TelegramStatsCollector:
             return 0.0
 
     async def analyze_sentiment(self, message: Message) -> float:
-        """Упрощенный анализ тональности (заглушка)"""
-        text = message.message or ""
-
-        positive_words = ["отлично", "прекрасно", "супер", "спасибо", "хорошо"]
-        negative_words = ["плохо", "ужасно", "кошмар", "разочарован"]
-
-        score = 0.5
-
-        for word in positive_words:
-            if word in text.lower():
-                score += 0.1
+        """Словарный анализ тональности сообщения"""
+        return self.sentiment_engine.score(message.message or "")
+
+    async def collect_channel_stats(
+        self,
+        channel_username: str,
+        limit: int = 1000,
+        concurrency: int | None = None,
+        *,
+        raise_errors: bool = False,
+        with_comment_texts: bool = False,
+    ) -> Sequence[dict]:
+        """Сбор статистики канала в отдельное хранилище записей
+
+        При ``concurrency`` > 1 сообщения обрабатываются параллельно, но не
+        более ``concurrency`` одновременно; порядок записей совпадает с
+        порядком сообщений в канале. С ``raise_errors`` ошибка сбора
+        пробрасывается вызывающему вместо пустого результата. Тексты
+        комментариев догружаются только при ``with_comment_texts``.
+        """
+        records: Sequence[dict] = []
+        try:
+            collected_at = datetime.now(UTC)
+            channel = await self.limiter.call(self.client.get_entity, channel_username)
+            messages = await self._get_messages(channel, limit=limit)
+            _logger.info(
+                "Найдено %d сообщений в канале %s", len(messages), channel_username
+            )
 
-        for word in negative_words:
-            if word in text.lower():
-                score -= 0.1
+            indexed = [
+                (i, message) for i, message in enumerate(messages, 1) if message.message
+            ]
+            records = TelegramRecordStore(
+                await self._extract_records(
+                    indexed, channel, concurrency, with_comment_texts=with_comment_texts
+                ),
+                collected_at,
+            ).view
+            _logger.info("Сбор данных завершен. Сохранено %d записей", len(records))
 
-        return max(0.0, min(1.0, score))
+        except Exception as e:
+            _logger.warning("Ошибка сбора статистики: %s", e)
+            if raise_errors:
+                raise
+
+        return records
+
+    async def collect_channel_updates(
+        self,
+        channel_username: str,
+        limit: int = 1000,
+        window: int | None = None,
+        concurrency: int | None = None,
+        *,
+        with_comment_texts: bool = False,
+        raise_errors: bool = False,
+    ) -> Sequence[dict]:
+        """Инкрементальный сбор статистики
+
+        Запрашиваются только сообщения новее сохраненного high-water mark
+        (``min_id``), а счетчики перечитываются лишь у ``window`` последних
+        постов; удаленные среди них посты убираются из состояния и
+        результата. При отсутствии сохраненного состояния выполняется полный сбор.
+        С ``raise_errors`` ошибка пробрасывается вместо возврата прежних записей.
+        """
+        window = config.tg_refresh_window if window is None else window
+        previous = self.state_store.get_records(channel_username)
+        if not previous:
+            records = await self.collect_channel_stats(
+                channel_username,
+                limit,
+                concurrency,
+                raise_errors=raise_errors,
+                with_comment_texts=with_comment_texts,
+            )
+            if records:
+                await self.state_store.save(channel_username, list(records))
+            return records
 
-    async def collect_channel_stats(self, channel_username: str, limit: int = 1000):
-        """Сбор статистики и сохранение в памяти"""
+        records = previous
         try:
-            self.collection_timestamp = datetime.now()
-            channel = await self.client.get_entity(channel_username)
-            messages = await self.client.get_messages(channel, limit=limit)
-            print(channel, channel_username)  # TODO
-            print(f"Найдено {len(messages)} сообщений в канале {channel_username}")
-
-            for i, message in enumerate(messages, 1):
-                if not message.message:
-                    continue
-
-                print(f"Обрабатывается сообщение {i}/{len(messages)}: {message.id}")
+            collected_at = datetime.now(UTC)
+            channel = await self.limiter.call(self.client.get_entity, channel_username)
+            max_id = self.state_store.get_max_id(channel_username)
+            new_messages = await self._get_messages(
+                channel, limit=limit, min_id=max_id
+            )
+            window_ids = [record["tg_id"] for record in previous[:window]]
+            refreshed = (
+                await self._get_messages(channel, ids=window_ids)
+                if window_ids else []
+            )
+            _logger.info(
+                "Канал %s: %d новых сообщений, обновление счетчиков у %d",
+                channel_username,
+                len(new_messages),
+                len(window_ids),
+            )
 
-                content_data = await self.extract_message_data(i, message, channel)
-                self.collected_data.append(content_data)
+            # Удаленные сообщения приходят как None: они, как и сообщения,
+            # у которых не осталось текста, убираются из записей
+            removed = {
+                tg_id for tg_id, message in zip(window_ids, refreshed, strict=True)
+                if message is None or not message.message
+            }
+            changed = [
+                message for message in [*new_messages, *refreshed]
+                if message is not None and message.message
+            ]
+            updated = {
+                record["tg_id"]: record
+                for record in await self._extract_records(
+                    list(enumerate(changed, 1)),
+                    channel,
+                    concurrency,
+                    with_comment_texts=with_comment_texts,
+                )
+            }
+            merged = {
+                record["tg_id"]: record for record in previous
+                if record["tg_id"] not in removed
+            }
+            merged.update(updated)
 
-            print(f"Сбор данных завершен. Сохранено {len(self.collected_data)} записей")
+            merged_records = sorted(
+                merged.values(), key=itemgetter("tg_id"), reverse=True
+            )[:limit]
+            for i, record in enumerate(merged_records, 1):
+                record["id"] = i
+            await self.state_store.save(channel_username, merged_records)
+            records = TelegramRecordStore(merged_records, collected_at).view
 
         except Exception as e:
-            print(f"Ошибка сбора статистики: {e}")
+            _logger.warning("Ошибка инкрементального сбора статистики: %s", e)
+            if raise_errors:
+                raise
+
+        return records
+
+    async def iter_channel_stats(
+        self,
+        channel_username: str,
+        limit: int = 1000,
+        *,
+        with_comment_texts: bool = False,
+    ) -> AsyncIterator[dict]:
+        """Потоковый сбор статистики: записи отдаются по мере обработки
+
+        Сообщения читаются через ``iter_messages`` постранично и в памяти
+        не накапливаются, в ``collected_data`` ничего не сохраняется.
+        """
+        channel = await self.limiter.call(self.client.get_entity, channel_username)
+        i = 0
+        async for message in self._iter_messages(channel, limit=limit):
+            i += 1
+            if not message.message:
+                continue
+            record = await self.extract_message_data(i, message, channel)
+            if with_comment_texts and record["comments"]:
+                record.update(await self.get_comments_data(
+                    message, channel, limit=config.tg_comments_limit
+                ))
+            yield record
+
+    async def _get_messages(self, entity: Any, **kwargs: Any) -> Any:
+        # Telethon выбирает историю страницами по 100 сообщений
+        count = len(kwargs["ids"]) if "ids" in kwargs else kwargs.get("limit") or 100
+        return await self.limiter.call(
+            self.client.get_messages, entity, cost=math.ceil(count / 100), **kwargs
+        )
+
+    async def _iter_messages(
+        self, entity: Any, limit: int | None = None, **kwargs: Any
+    ) -> AsyncIterator[Message]:
+        """``iter_messages`` с токеном лимитера на каждую страницу
+
+        После допустимого FloodWait выборка продолжается с последнего
+        полученного сообщения.
+        """
+        received = 0
+        offset_id = kwargs.pop("offset_id", 0)
+        while limit is None or received < limit:
+            await self.limiter.acquire()
+            try:
+                async for message in self.client.iter_messages(
+                    entity,
+                    limit=None if limit is None else limit - received,
+                    offset_id=offset_id,
+                    wait_time=0,
+                    **kwargs,
+                ):
+                    received += 1
+                    offset_id = message.id
+                    if received % 100 == 0:
+                        await self.limiter.acquire()
+                    yield message
+            except FloodWaitError as e:
+                self.limiter.on_flood_wait(e.seconds)
+                if e.seconds > self.limiter.max_flood_wait:
+                    raise
+                continue
+            self.limiter.on_success()
+            return
+
+    async def _extract_records(
+        self,
+        indexed: list[tuple[int, Message]],
+        channel,
+        concurrency: int | None,
+        *,
+        with_comment_texts: bool = False,
+    ) -> list[dict]:
+        sentiments = self.sentiment_engine.score_batch(
+            message.message or "" for _, message in indexed
+        )
+        if concurrency and concurrency > 1:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def extract(index: int, message: Message, sentiment: float) -> dict:
+                async with semaphore:
+                    return await self.extract_message_data(
+                        index, message, channel, sentiment
+                    )
+
+            records = list(await asyncio.gather(*(
+                extract(i, message, sentiment)
+                for (i, message), sentiment in zip(indexed, sentiments, strict=True)
+            )))
+        else:
+            records = []
+            for (i, message), sentiment in zip(indexed, sentiments, strict=True):
+                _logger.debug(
+                    "Обрабатывается сообщение %d/%d: %s", i, len(indexed), message.id
+                )
+                records.append(
+                    await self.extract_message_data(i, message, channel, sentiment)
+                )
+
+        if with_comment_texts:
+            await self.attach_comment_texts(
+                records,
+                [message for _, message in indexed],
+                channel,
+                limit=config.tg_comments_limit,
+            )
+        return records
 
-    def get_stats_summary(self) -> dict:
+    def get_stats_summary(self, data: Sequence[dict] | None = None) -> dict:
         """Получение сводки по собранным данным"""
-        if not self.collected_data:
+        data = self.collected_data if data is None else data
+        if not data:
             return {}
 
-        total_posts = len(self.collected_data)
-        total_comments = sum(item.get("comments_count", 0) for item in self.collected_data)
-        total_views = sum(item.get("views", 0) for item in self.collected_data)
-        total_likes = sum(item.get("likes", 0) for item in self.collected_data)
+        collected_at = None
+        if isinstance(data, RecordsView):
+            totals = data.store.summary()
+            collected_at = data.store.collected_at
+        else:
+            totals = {
+                "total_posts": len(data),
+                "total_comments": sum(item.get("comments", 0) for item in data),
+                "total_views": sum(item.get("views", 0) for item in data),
+                "total_likes": sum(item.get("likes", 0) for item in data),
+                "posts_with_comments": sum(1 for item in data if item.get("comments", 0) > 0),
+            }
 
         return {
-            "total_posts": total_posts,
-            "total_comments": total_comments,
-            "total_views": total_views,
-            "total_likes": total_likes,
-            "avg_engagement": total_likes / total_views * 100 if total_views > 0 else 0,
-            "collection_time": self.collection_timestamp.isoformat() if self.collection_timestamp else None,
-            "posts_with_comments": sum(1 for item in self.collected_data if item.get("comments_count", 0) > 0)
+            **totals,
+            "avg_engagement": (
+                totals["total_likes"] / totals["total_views"] * 100
+                if totals["total_views"] > 0 else 0
+            ),
+            "collection_time": collected_at.isoformat() if collected_at else None,
         }
 
-    def export_to_csv_string(self) -> str:
+    def export_to_csv_string(self, data: Sequence[dict] | None = None) -> str:
         """Экспорт данных в CSV строку"""
-        if not self.collected_data:
+        data = self.collected_data if data is None else data
+        if not data:
             return ""
+        return "".join(self.iter_csv_chunks(data))
 
-        # Создаем строковый буфер для CSV
+    def iter_csv_chunks(
+        self, data: Iterable[dict] | None = None, rows_per_chunk: int = 500
+    ) -> Iterator[str]:
+        """Построчный экспорт в CSV кусками по ``rows_per_chunk`` строк
+
+        Буфер переиспользуется между кусками, поэтому память не зависит от
+        количества записей, а ``data`` может быть ленивым итератором.
+        """
+        data = self.collected_data if data is None else data
         output = StringIO()
         writer = csv.writer(output)
+        writer.writerow(CSV_HEADERS)
 
-        # Заголовки CSV
-        headers = [
-            "Title", "URL", "Content Type", "Platform", "Published At",
-            "Likes", "Shares", "Comments Count", "Views", "Tags",
-            "Comments Retrieved", "Comment Texts"
-        ]
-        writer.writerow(headers)
-
-        # Данные
-        for item in self.collected_data:
-            # Обрабатываем тексты комментариев
-            published_at = item.get("published_at")
-            if isinstance(published_at, datetime):
-                published_at = published_at.strftime("%Y-%m-%d %H:%M:%S")
-            comment_texts = item.get("comment_texts", [])
-            comments_str = " | ".join([f'"{text}"' for text in comment_texts])
-
-            row = [
-                item.get("title", ""),
-                item.get("url", ""),
-                item.get("content_type", ""),
-                item.get("platform", ""),
-                published_at,
-                item.get("likes", 0),
-                item.get("shares", 0),
-                item.get("comments_count", 0),
-                item.get("views", 0),
-                item.get("tags_str", ""),
-                item.get("texts_retrieved", 0),
-                comments_str
-            ]
-            writer.writerow(row)
+        for i, item in enumerate(data, 1):
+            writer.writerow(self._csv_row(item))
+            if i % rows_per_chunk == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
 
-        csv_string = output.getvalue()
+        if output.tell():
+            yield output.getvalue()
         output.close()
 
-        return csv_string
+    def _csv_row(self, item: dict) -> list:
+        # Обрабатываем тексты комментариев
+        published_at = item.get("published_at")
+        if isinstance(published_at, datetime):
+            published_at = published_at.strftime("%Y-%m-%d %H:%M:%S")
+        comment_texts = item.get("comment_texts", [])
+        comments_str = " | ".join([f'"{text}"' for text in comment_texts])
+
+        return [
+            item.get("title", ""),
+            item.get("url", ""),
+            item.get("content_type", ""),
+            item.get("platform", ""),
+            published_at,
+            item.get("likes", 0),
+            item.get("shares", 0),
+            item.get("comments", 0),
+            item.get("views", 0),
+            item.get("tags_str", ""),
+            item.get("texts_retrieved", 0),
+            comments_str
+        ]
 
     def export_to_csv_file(self, filename: str = None):
         """Экспорт данных в CSV файл"""
@@ -338,22 +593,19 @@ class TelegramStatsCollector:
             timestamp = self.collection_timestamp.strftime("%Y%m%d_%H%M%S") if self.collection_timestamp else datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"telegram_stats_{timestamp}.csv"
 
-        csv_string = self.export_to_csv_string()
-
         with open(filename, "w", encoding="utf-8") as f:
-            f.write(csv_string)
+            f.writelines(self.iter_csv_chunks())
 
         print(f"Данные экспортированы в {filename}")
         return filename
 
-    def get_raw_data(self) -> list[dict]:
+    def get_raw_data(self) -> Sequence[dict]:
         """Получение сырых данных"""
         return self.collected_data
 
     def clear_data(self):
         """Очистка собранных данных"""
-        self.collected_data.clear()
-        self.collection_timestamp = None
+        self.store.clear()
         print("Данные очищены")
 
     def get_comments_analysis(self) -> dict:
@@ -364,78 +616,15 @@ class TelegramStatsCollector:
         all_comments = []
         posts_with_comments = 0
 
-        for item in self.collected_data:
-            comments = item.get("comment_texts", [])
-            if comments:
-                all_comments.extend(comments)
-                posts_with_comments += 1
+        for comments in self.store.comment_texts():
+            all_comments.extend(comments)
+            posts_with_comments += 1
 
+        sentiments = self.sentiment_engine.score_batch(all_comments)
         return {
             "total_comments_texts": len(all_comments),
             "posts_with_comments": posts_with_comments,
             "avg_comments_per_post": len(all_comments) / posts_with_comments if posts_with_comments > 0 else 0,
+            "avg_comment_sentiment": sum(sentiments) / len(sentiments) if sentiments else 0,
             "sample_comments": all_comments[:10]
         }
-
-    async def get_comments_texts(self, message: Message, channel, limit: int = 10) -> list[str]:
-        """Получение списка текстов первых N комментариев"""
-        try:
-            # Для большинства каналов комментарии недоступны через API
-            # Возвращаем пустой список
-            return []
-
-        except Exception as e:
-            print(f"Ошибка получения текстов комментариев: {e}")
-            return []
-
-    async def get_comments_count(self, message: Message, channel) -> int:
-        """Получение общего количества комментариев"""
-        try:
-            # Для большинства каналов комментарии недоступны через API
-            # Возвращаем 0
-            return 0
-
-        except Exception as e:
-            print(f"Ошибка получения количества комментариев: {e}")
-            return 0
-
-    async def get_comments_data(self, message: Message, channel):
-        """Получение полных данных о комментариях: список текстов + количество"""
-        try:
-            # Упрощенная реализация - комментарии недоступны в большинстве случаев
-            return {
-                "comments_count": 0,
-                "comment_texts": [],
-                "has_comments": False,
-                "texts_retrieved": 0
-            }
-
-        except Exception as e:
-            print(f"Общая ошибка получения данных комментариев: {e}")
-            return {
-                "comments_count": 0,
-                "comment_texts": [],
-                "has_comments": False,
-                "texts_retrieved": 0
-            }
-
-    async def get_comments_texts(self, message: Message, channel, limit: int = 10) -> list[str]:
-        """Получение списка текстов первых N комментариев"""
-        try:
-            result = await self.client(GetDiscussionMessageRequest(
-                peer=channel,
-                msg_id=message.id
-            ))
-
-            if hasattr(result, "messages") and result.messages:
-                comment_texts = []
-                for comment in result.messages[:limit]:
-                    if comment.message and comment.message.strip():
-                        comment_texts.append(comment.message.strip())
-                return comment_texts
-
-            return []
-
-        except Exception as e:
-            print(f"Ошибка получения текстов комментариев: {e}")
-            return []
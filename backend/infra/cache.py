@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from time import monotonic
+from typing import TYPE_CHECKING
+
+import attrs
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+_logger = logging.getLogger(__name__)
+
+
+@attrs.define(slots=True)
+class _Entry[V]:
+    value: V
+    stored_at: float
+
+
+@attrs.define(slots=True)
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    evictions: int = 0
+
+
+class TTLCache[K: Hashable, V]:
+    """Асинхронный LRU-кэш с TTL и stale-while-revalidate
+
+    Свежие записи (моложе ``ttl``) отдаются сразу. Устаревшие, но не старше
+    ``ttl + stale_ttl``, тоже отдаются сразу, а в фоне запускается одно
+    обновление на ключ. Более старые записи и промахи загружаются синхронно,
+    при этом параллельные запросы одного ключа ждут одну загрузку.
+    """
+
+    def __init__(self, *, ttl: float, stale_ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[K, _Entry[V]] = OrderedDict()
+        self._inflight: dict[K, asyncio.Future[V]] = {}
+        self._background: set[asyncio.Task[None]] = set()
+
+    async def get_or_load(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = monotonic() - entry.stored_at
+            if age < self.ttl:
+                self.stats.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stats.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    # Загрузка регистрируется сразу, а не при старте задачи,
+                    # иначе каждый запрос до ее старта запускал бы свою
+                    task = asyncio.create_task(
+                        self._refresh(key, loader, self._start_load(key))
+                    )
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                return entry.value
+
+        self.stats.misses += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        return await self._load(key, loader, self._start_load(key))
+
+    def put(self, key: K, value: V) -> None:
+        self._entries[key] = _Entry(value=value, stored_at=monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, key: K | None = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def snapshot(self) -> dict[str, int | float]:
+        lookups = self.stats.hits + self.stats.stale_hits + self.stats.misses
+        return {
+            **attrs.asdict(self.stats),
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_ratio": (
+                (self.stats.hits + self.stats.stale_hits) / lookups
+                if lookups else 0.0
+            ),
+        }
+
+    def _start_load(self, key: K) -> asyncio.Future[V]:
+        future: asyncio.Future[V] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    async def _load(
+        self, key: K, loader: Callable[[], Awaitable[V]], future: asyncio.Future[V]
+    ) -> V:
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение уже получит вызывающий, ожидающих может не быть
+            future.exception()
+            raise
+        else:
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _refresh(
+        self, key: K, loader: Callable[[], Awaitable[V]], future: asyncio.Future[V]
+    ) -> None:
+        self.stats.refreshes += 1
+        try:
+            await self._load(key, loader, future)
+        except Exception:
+            self.stats.refresh_errors += 1
+            _logger.exception("Background refresh failed for %r", key)
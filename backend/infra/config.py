@@ -8,6 +8,10 @@ from pydantic_settings import BaseSettings
 type _NonBlankStr = Annotated[str, Field(min_length=1)]
 type _NonBlankSecretStr = Annotated[SecretStr, Field(min_length=1)]
 type _Port = Annotated[int, Field(ge=0, le=65535)]
+type _PositiveInt = Annotated[int, Field(ge=1)]
+type _PositiveFloat = Annotated[float, Field(gt=0)]
+type _NonNegativeInt = Annotated[int, Field(ge=0)]
+type _NonNegativeFloat = Annotated[float, Field(ge=0)]
 
 
 class _Settings(BaseSettings):
@@ -26,6 +30,45 @@ class _Settings(BaseSettings):
     tg_api_hash: _NonBlankStr
     tg_channel_username: _NonBlankStr
     tg_session_string: _NonBlankStr
+    tg_collect_concurrency: _PositiveInt = 8
+    tg_state_path: _NonBlankStr = ".tg_state.json"
+    tg_refresh_window: _PositiveInt = 50
+    tg_healthcheck_interval_sec: _PositiveInt = 60
+    tg_comments_limit: _PositiveInt = 10
+    tg_comments_concurrency: _PositiveInt = 4
+    tg_rate_per_sec: _PositiveFloat = 3.0
+    tg_rate_burst: _PositiveInt = 10
+    tg_max_flood_wait_sec: _PositiveInt = 60
+    tg_batch_concurrency: _PositiveInt = 4
+    tg_refresh_enabled: bool = True
+    tg_refresh_channels: list[str] = []
+    tg_refresh_limit: _PositiveInt = 100
+    tg_refresh_interval_sec: _PositiveInt = 300
+    tg_refresh_jitter_sec: _NonNegativeFloat = 30.0
+    tg_refresh_max_backoff_sec: _PositiveInt = 3600
+
+    database_url: _NonBlankStr = "sqlite+aiosqlite:///content.db"
+    db_upsert_batch_size: _PositiveInt = 1000
+    # Сколько новейших совпадений ранжирует поиск; 0 — все совпадения
+    search_max_ranked: _NonNegativeInt = 5000
+
+    channel_stats_cache_ttl_sec: _PositiveInt = 300
+    channel_stats_cache_stale_sec: _PositiveInt = 3600
+    channel_stats_cache_max_entries: _PositiveInt = 128
+
+    # gzip включен только для путей из http_cache_control
+    http_gzip_min_size: _PositiveInt = 1024
+    response_cache_max_bytes: _PositiveInt = 64 * 1024 * 1024
+    # Шаблон пути роутера -> Cache-Control; для этих путей включены ETag и 304
+    http_cache_control: dict[str, str] = {
+        "/api/stats/summary": "private, no-cache",
+        "/api/content": "private, no-cache",
+        "/api/content/{item_id:int}": "private, no-cache",
+    }
+
+    live_max_subscribers: _PositiveInt = 500
+    live_queue_size: _PositiveInt = 1000
+    live_heartbeat_sec: _PositiveInt = 15
 
 
 config = _Settings()
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import base64
+import json
+import math
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import intersect, literal, select, tuple_, union
+from sqlalchemy.orm import defer
+
+from backend.domain.exceptions import InvalidFilterException
+from backend.domain.models import (
+    Content,
+    ContentTag,
+    ContentType,
+    Platform,
+    normalize_tags,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Any
+
+    from sqlalchemy import Select
+    from sqlalchemy.orm import InstrumentedAttribute
+
+    from backend.domain.schemas import AnalyticsFilters
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SORT_COLUMNS: dict[str, InstrumentedAttribute] = {
+    "published_at": Content.published_at,
+    "likes": Content.likes,
+    "shares": Content.shares,
+    "comments": Content.comments,
+    "views": Content.views,
+    "engagement_rate": Content.engagement_rate_percent,
+    "engagement_rate_percent": Content.engagement_rate_percent,
+    "sentiment": Content.sentiment,
+}
+# Короткие коды соцсетей из фильтров фронтенда
+_PLATFORM_ALIASES = {"tg": Platform.TELEGRAM, "yt": Platform.YOUTUBE}
+_DATE_RANGE_DAYS = {"7d": 7, "30d": 30}
+_MIN_INTEGER, _MAX_INTEGER = -(2**63), 2**63 - 1
+
+
+def build_content_query(
+    filters: AnalyticsFilters,
+    cursor: str | None = None,
+    now: datetime | None = None,
+    tagged_ids: Sequence[int] | None = None,
+) -> Select[tuple[Content]]:
+    """Запрос к ``content`` по фильтрам с keyset-пагинацией
+
+    Сортировка всегда дополняется ``id``, а курсор хранит пару
+    (значение сортировки, id) последней строки страницы, поэтому следующая
+    страница читается из индекса ``(sort_key, id)`` без OFFSET. Запрос
+    выбирает на одну строку больше ``limit``, чтобы понять, есть ли
+    следующая страница. ``tagged_ids`` — уже найденные по ``TagIndex``
+    посты с тегами фильтра; без них теги ищутся в ``content_tag``.
+    """
+    sort_column = _sort_column(filters.sort_by)
+    descending = _is_descending(filters.sort_order)
+    # Текст поста в ContentPage не входит
+    query = select(Content).options(defer(Content.text))
+
+    start_date, end_date = resolve_date_range(filters, now)
+    if start_date is not None:
+        query = query.where(Content.published_at >= start_date)
+    if end_date is not None:
+        query = query.where(Content.published_at <= end_date)
+
+    platforms = _resolve_platforms(filters.platforms)
+    if platforms:
+        query = query.where(Content.platform.in_(platforms))
+    if filters.content_types:
+        query = query.where(
+            Content.content_type.in_(_resolve_content_types(filters.content_types))
+        )
+
+    for column, minimum in (
+        (Content.likes, filters.min_likes),
+        (Content.shares, filters.min_shares),
+        (Content.views, filters.min_views),
+        (Content.engagement_rate_percent, filters.min_engagement_rate),
+    ):
+        if minimum is not None:
+            query = query.where(column >= minimum)
+
+    tags = normalize_tags(",".join(filters.tags or ()))
+    if tags and tagged_ids is not None:
+        query = query.where(Content.id.in_(tagged_ids))
+    elif tags:
+        # Каждый тег — поиск по индексу (tag, content_id) в content_tag,
+        # AND/OR сводятся к INTERSECT/UNION множеств id
+        tagged = [
+            select(ContentTag.content_id).where(ContentTag.tag == tag)
+            for tag in tags
+        ]
+        combine = intersect if filters.require_all_tags else union
+        query = query.where(
+            Content.id.in_(combine(*tagged) if len(tagged) > 1 else tagged[0])
+        )
+
+    if cursor is not None:
+        value, last_id = decode_cursor(cursor, filters.sort_by)
+        key = tuple_(sort_column, Content.id)
+        bound = tuple_(literal(value, sort_column.type), literal(last_id))
+        query = query.where(key < bound if descending else key > bound)
+
+    order = (
+        (sort_column.desc(), Content.id.desc()) if descending
+        else (sort_column.asc(), Content.id.asc())
+    )
+    return query.order_by(*order).limit(page_size(filters) + 1)
+
+
+def page_size(filters: AnalyticsFilters) -> int:
+    if filters.limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(filters.limit, MAX_PAGE_SIZE))
+
+
+def resolve_date_range(
+    filters: AnalyticsFilters, now: datetime | None = None
+) -> tuple[datetime | None, datetime | None]:
+    """Границы периода; ``date_range`` — значения из FilterBar на фронтенде"""
+    if filters.date_range in {None, "custom"}:
+        return filters.start_date, filters.end_date
+    now = now or datetime.now(UTC)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if filters.date_range in _DATE_RANGE_DAYS:
+        return today - timedelta(days=_DATE_RANGE_DAYS[filters.date_range] - 1), None
+    if filters.date_range == "month":
+        return today.replace(day=1), None
+    msg = f"Unknown date_range: {filters.date_range}"
+    raise InvalidFilterException(msg)
+
+
+def encode_cursor(content: Content, sort_by: str) -> str:
+    value: Any = getattr(content, _sort_column(sort_by).key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([value, content.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> tuple[Any, int]:
+    """Значение сортировки и id из курсора
+
+    Курсор приходит от клиента, поэтому значение проверяется по типу
+    столбца ``sort_by``: подделанный курсор дает 400, а не ошибку запроса.
+    """
+    python_type = _sort_column(sort_by).type.python_type
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        return _sort_value(value, python_type), _int_value(last_id)
+    except (TypeError, ValueError) as e:
+        msg = "Invalid cursor"
+        raise InvalidFilterException(msg) from e
+
+
+def _sort_value(value: object, python_type: type) -> Any:
+    if python_type is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if python_type is int:
+        return _int_value(value)
+    if (
+        python_type is float
+        and isinstance(value, int | float)
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    ):
+        return float(value)
+    msg = f"Expected {python_type.__name__}, got {type(value).__name__}"
+    raise TypeError(msg)
+
+
+def _int_value(value: object) -> int:
+    # bool — подкласс int; значения вне INTEGER SQLite не пропускаются
+    if isinstance(value, int) and not isinstance(value, bool) and (
+        _MIN_INTEGER <= value <= _MAX_INTEGER
+    ):
+        return value
+    msg = f"Expected integer, got {value!r}"
+    raise TypeError(msg)
+
+
+def _sort_column(sort_by: str) -> InstrumentedAttribute:
+    try:
+        return SORT_COLUMNS[sort_by]
+    except KeyError:
+        msg = f"Unsupported sort_by: {sort_by}"
+        raise InvalidFilterException(msg) from None
+
+
+def _is_descending(sort_order: str) -> bool:
+    if sort_order not in {"asc", "desc"}:
+        msg = f"Unsupported sort_order: {sort_order}"
+        raise InvalidFilterException(msg)
+    return sort_order == "desc"
+
+
+def _resolve_platforms(values: list[str] | None) -> list[Platform]:
+    if not values or "all" in values:
+        return []
+    try:
+        return [_PLATFORM_ALIASES.get(value) or Platform(value) for value in values]
+    except ValueError as e:
+        raise InvalidFilterException(str(e)) from None
+
+
+def _resolve_content_types(values: list[str]) -> list[ContentType]:
+    try:
+        return [ContentType(value) for value in values]
+    except ValueError as e:
+        raise InvalidFilterException(str(e)) from None
@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import defer
+
+from backend.domain.models import (
+    Content,
+    ContentTag,
+    ContentType,
+    Platform,
+    normalize_tags,
+)
+from backend.domain.schemas import ContentItem, ContentPage, SearchResult
+from backend.infra import content_search
+from backend.infra.content_query import (
+    build_content_query,
+    encode_cursor,
+    page_size,
+)
+from backend.infra.rollup_cube import ROLLUP_METRICS, RollupCube
+from backend.infra.stats_breakdown import (
+    BREAKDOWN_METRICS,
+    ContentColumns,
+    breakdown,
+)
+from backend.infra.tag_index import TagIndex
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from typing import Any
+
+    from sqlalchemy.ext.asyncio import AsyncConnection
+    from sqlalchemy.sql.dml import Insert
+
+    from backend.domain.schemas import AnalyticsFilters
+    from backend.infra.di import DbSessionFactory
+
+# Если теги фильтра отбирают больше постов, условие по id из TagIndex
+# раздувает запрос (и упирается в лимит параметров SQLite), а
+# пересечение по индексу content_tag уже выгоднее
+TAG_INDEX_MAX_IDS = 1000
+# Колонки, которые заполняются из собранных записей; id и created_at
+# назначает база, url — ключ upsert
+_UPDATABLE_COLUMNS = tuple(
+    column.name for column in Content.__table__.columns
+    if column.name not in {"id", "url", "created_at"}
+)
+_INSERT_COLUMNS = ("url", *_UPDATABLE_COLUMNS)
+# Executemany не применяет Python-умолчания модели к пропущенным ключам
+_DEFAULTS = {
+    column.name: column.default.arg
+    for column in Content.__table__.columns
+    if column.default is not None and not callable(column.default.arg)
+}
+
+
+class ContentRepository:
+    """Хранение собранного контента в таблице ``content``
+
+    Записи коллекторов сохраняются пакетным ``INSERT ... ON CONFLICT (url)
+    DO UPDATE`` по ``batch_size`` строк, все пакеты — в одной транзакции.
+    Теги постов раскладываются в ``content_tag``, а заголовки и тексты —
+    в полнотекстовый индекс ``content_fts`` в той же транзакции; после
+    коммита обновляются ``tag_index`` и ``rollups``. После
+    ``load_tag_index`` фильтр по тегам в ``query`` сначала решается по
+    ``tag_index``: пустой результат не доходит до БД, а небольшой
+    передается в запрос списком id.
+    """
+
+    def __init__(
+        self,
+        session_factory: DbSessionFactory,
+        batch_size: int = 1000,
+        search_max_ranked: int = content_search.MAX_RANKED,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.search_max_ranked = search_max_ranked
+        self.tag_index = TagIndex()
+        # Индекс полон только после load_tag_index, до этого в нем лишь
+        # посты, сохраненные этим процессом
+        self.tag_index_loaded = False
+        self.rollups = RollupCube()
+        # Вызываются после сохранения со списком изменившихся постов
+        self.listeners: list[Callable[[list[dict[str, Any]]], None]] = []
+        # Растет после каждого сохранения; по ней сбрасываются кэши ответов
+        self.version = 0
+        self._columns: tuple[int, ContentColumns] | None = None
+
+    async def upsert_many(self, records: Iterable[dict]) -> int:
+        # При повторе url в одной выгрузке побеждает последняя запись
+        rows = list({row["url"]: row for row in map(_to_row, records)}.values())
+        if not rows:
+            return 0
+        indexed: list[tuple[int, list[str], float]] = []
+        saved: list[tuple[int, dict[str, Any]]] = []
+        async with self.session_factory() as session, session.begin():
+            connection = await session.connection()
+            statement = _upsert_statement(connection.dialect.name)
+            searchable = content_search.is_supported(connection.dialect.name)
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                await connection.execute(statement, batch)
+                ids = await _content_ids(connection, batch)
+                indexed.extend(await _replace_tags(connection, batch, ids))
+                saved.extend((ids[row["url"]], row) for row in batch)
+                if searchable:
+                    await content_search.index_rows(connection, (
+                        (ids[row["url"]], row["title"], row["text"]) for row in batch
+                    ))
+        for content_id, tags, engagement in indexed:
+            self.tag_index.update(content_id, tags, engagement)
+        changes = []
+        for content_id, row in saved:
+            previous = self.rollups.metrics(content_id)
+            if self.rollups.update(
+                content_id, row["platform"], row["content_type"], row["published_at"], row
+            ):
+                changes.append(_metric_change(content_id, row, previous))
+        self.version += 1
+        if changes:
+            for listener in self.listeners:
+                listener(changes)
+        return len(rows)
+
+    async def load_tag_index(self) -> None:
+        """Построение ``tag_index`` из БД; пустая ``content_tag`` заполняется по ``tags_str``"""
+        async with self.session_factory() as session, session.begin():
+            connection = await session.connection()
+            if await connection.scalar(select(ContentTag.id).limit(1)) is None:
+                await _backfill_tags(connection, self.batch_size)
+            result = await connection.execute(
+                select(ContentTag.content_id, ContentTag.tag, Content.engagement_rate_percent)
+                .join(Content, Content.id == ContentTag.content_id)
+            )
+            post_tags: defaultdict[int, list[str]] = defaultdict(list)
+            engagement: dict[int, float] = {}
+            for content_id, tag, engagement_rate in result:
+                post_tags[content_id].append(tag)
+                engagement[content_id] = engagement_rate
+        index = TagIndex()
+        for content_id, tags in post_tags.items():
+            index.update(content_id, tags, engagement[content_id])
+        self.tag_index = index
+        self.tag_index_loaded = True
+
+    async def load_rollups(self) -> None:
+        """Построение ``rollups`` по сохраненному контенту"""
+        rollups = RollupCube()
+        async with self.session_factory() as session:
+            result = await session.stream(select(
+                Content.id,
+                Content.platform,
+                Content.content_type,
+                Content.published_at,
+                *(getattr(Content, name) for name in ROLLUP_METRICS),
+            ))
+            async for content_id, platform, content_type, published_at, *values in result:
+                rollups.update(
+                    content_id,
+                    platform,
+                    content_type,
+                    published_at,
+                    dict(zip(ROLLUP_METRICS, values, strict=True)),
+                )
+        self.rollups = rollups
+
+    async def load_search_index(self) -> None:
+        """Заполнение пустого ``content_fts`` по уже сохраненному контенту"""
+        async with self.session_factory() as session, session.begin():
+            connection = await session.connection()
+            if not content_search.is_supported(connection.dialect.name):
+                return
+            if not await content_search.is_empty(connection):
+                return
+            result = await connection.stream(
+                select(Content.id, Content.title, Content.text)
+            )
+            async for rows in result.partitions(self.batch_size):
+                await content_search.index_rows(connection, rows)
+
+    async def columns(self) -> ContentColumns:
+        """Столбцы контента для группировок; перечитываются при смене ``version``"""
+        version = self.version
+        if self._columns is not None and self._columns[0] == version:
+            return self._columns[1]
+        async with self.session_factory() as session:
+            rows = (await session.execute(select(
+                Content.id,
+                Content.platform,
+                Content.content_type,
+                Content.published_at,
+                *(getattr(Content, name) for name in BREAKDOWN_METRICS),
+            ))).all()
+            post_tags = (await session.execute(
+                select(ContentTag.content_id, ContentTag.tag)
+            )).all()
+        columns = ContentColumns.build(rows, post_tags)
+        self._columns = (version, columns)
+        return columns
+
+    async def breakdown(self, by: list[str], **options: Any) -> dict:
+        return breakdown(await self.columns(), by, **options)
+
+    async def search(self, query: str, limit: int = 20) -> list[SearchResult]:
+        """Полнотекстовый поиск по заголовкам и текстам, лучшие совпадения первыми
+
+        На SQLite используется FTS5 с ранжированием BM25 среди
+        ``search_max_ranked`` новейших совпадений (0 — среди всех), на
+        остальных СУБД — поиск подстроки без ранжирования.
+        """
+        async with self.session_factory() as session:
+            connection = await session.connection()
+            if not content_search.is_supported(connection.dialect.name):
+                pattern = f"%{query}%"
+                rows = await session.scalars(
+                    select(Content)
+                    .where(Content.title.ilike(pattern) | Content.text.ilike(pattern))
+                    .order_by(Content.published_at.desc())
+                    .limit(limit)
+                )
+                return [_to_search_result(content) for content in rows]
+            ids = await content_search.search(
+                connection, query, limit, self.search_max_ranked
+            )
+            if not ids:
+                return []
+            contents = {
+                content.id: content
+                for content in await session.scalars(
+                    select(Content).where(Content.id.in_(ids))
+                )
+            }
+        return [
+            _to_search_result(contents[content_id])
+            for content_id in ids
+            if content_id in contents
+        ]
+
+    async def list_all(self, platform: Platform | None = None) -> list[Content]:
+        query = select(Content).order_by(Content.published_at.desc())
+        if platform is not None:
+            query = query.where(Content.platform == platform)
+        async with self.session_factory() as session:
+            return list(await session.scalars(query))
+
+    async def list_items(self) -> list[ContentItem]:
+        # Текст постов в ContentItem не входит и из базы не читается
+        query = (
+            select(Content)
+            .options(defer(Content.text))
+            .order_by(Content.published_at.desc())
+        )
+        async with self.session_factory() as session:
+            return [_to_item(content) for content in await session.scalars(query)]
+
+    async def query(
+        self, filters: AnalyticsFilters, cursor: str | None = None
+    ) -> ContentPage:
+        size = page_size(filters)
+        tagged_ids = self._tagged_ids(filters)
+        if tagged_ids is not None and not tagged_ids:
+            return ContentPage(items=[], next_cursor=None)
+        async with self.session_factory() as session:
+            rows = list(await session.scalars(
+                build_content_query(filters, cursor, tagged_ids=tagged_ids)
+            ))
+        next_cursor = (
+            encode_cursor(rows[size - 1], filters.sort_by) if len(rows) > size else None
+        )
+        return ContentPage(
+            items=[_to_item(content) for content in rows[:size]],
+            next_cursor=next_cursor,
+        )
+
+    def _tagged_ids(self, filters: AnalyticsFilters) -> list[int] | None:
+        """id постов с тегами фильтра из ``tag_index``; ``None`` — искать в БД"""
+        tags = normalize_tags(",".join(filters.tags or ()))
+        if not tags or not self.tag_index_loaded:
+            return None
+        # Верхняя оценка результата по размерам списков, без их слияния
+        counts = [self.tag_index.post_count(tag) for tag in tags]
+        if (min(counts) if filters.require_all_tags else sum(counts)) > TAG_INDEX_MAX_IDS:
+            return None
+        return self.tag_index.match(tags, require_all=filters.require_all_tags).tolist()
+
+    async def count(self) -> int:
+        async with self.session_factory() as session:
+            return await session.scalar(select(func.count()).select_from(Content)) or 0
+
+
+async def _content_ids(
+    connection: AsyncConnection, rows: list[dict[str, Any]]
+) -> dict[str, int]:
+    return dict((await connection.execute(
+        select(Content.url, Content.id).where(Content.url.in_([row["url"] for row in rows]))
+    )).all())
+
+
+async def _replace_tags(
+    connection: AsyncConnection, rows: list[dict[str, Any]], ids: dict[str, int]
+) -> list[tuple[int, list[str], float]]:
+    await connection.execute(
+        delete(ContentTag).where(ContentTag.content_id.in_(list(ids.values())))
+    )
+    indexed = [
+        (ids[row["url"]], normalize_tags(row["tags_str"]), row["engagement_rate_percent"])
+        for row in rows
+    ]
+    tag_rows = [
+        {"content_id": content_id, "tag": tag}
+        for content_id, tags, _ in indexed
+        for tag in tags
+    ]
+    if tag_rows:
+        await connection.execute(insert(ContentTag), tag_rows)
+    return indexed
+
+
+async def _backfill_tags(connection: AsyncConnection, batch_size: int) -> None:
+    result = await connection.execute(
+        select(Content.id, Content.tags_str).where(Content.tags_str.is_not(None))
+    )
+    tag_rows = [
+        {"content_id": content_id, "tag": tag}
+        for content_id, tags_str in result
+        for tag in normalize_tags(tags_str)
+    ]
+    for start in range(0, len(tag_rows), batch_size):
+        await connection.execute(insert(ContentTag), tag_rows[start:start + batch_size])
+
+
+def _upsert_statement(dialect_name: str) -> Insert:
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(Content.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=[Content.url],
+        set_={name: statement.excluded[name] for name in _UPDATABLE_COLUMNS},
+    )
+
+
+def _to_row(record: dict) -> dict[str, Any]:
+    row = {name: record.get(name) for name in _INSERT_COLUMNS}
+    row["content_type"] = ContentType(row["content_type"] or ContentType.POST)
+    row["platform"] = Platform(row["platform"])
+    if isinstance(row["published_at"], str):
+        row["published_at"] = datetime.fromisoformat(row["published_at"])
+    if row["tags_str"] is None and "tags" in record:
+        row["tags_str"] = ",".join(record["tags"])
+    for name, default in _DEFAULTS.items():
+        if row[name] is None:
+            row[name] = default
+    return row
+
+
+def _metric_change(
+    content_id: int, row: dict[str, Any], previous: dict[str, float] | None
+) -> dict[str, Any]:
+    metrics = {name: row[name] for name in ROLLUP_METRICS}
+    return {
+        "id": content_id,
+        "platform": row["platform"],
+        "url": row["url"],
+        "metrics": metrics,
+        # Для нового поста разница считается от нуля
+        "delta": {
+            name: value - (previous[name] if previous else 0)
+            for name, value in metrics.items()
+        },
+    }
+
+
+def _to_item(content: Content) -> ContentItem:
+    return ContentItem(
+        id=content.id,
+        platform=content.platform,
+        title=content.title,
+        url=content.url,
+        published_at=content.published_at,
+        views=content.views,
+        likes=content.likes,
+        comments=content.comments,
+        engagement_rate_percent=content.engagement_rate_percent,
+        sentiment=content.sentiment,
+        tags=content.tags,
+    )
+
+
+def _to_search_result(content: Content) -> SearchResult:
+    return SearchResult(
+        **_to_item(content).model_dump(), text=content.text or ""
+    )
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+from sqlalchemy import bindparam, text
+
+from backend.domain.stemmer import stem
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Connection
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+# FTS5 не умеет русскую морфологию, поэтому в индекс пишутся основы слов,
+# а rowid совпадает с content.id. Префиксный поиск нужен только для
+# последнего, недописанного слова запроса.
+_CREATE_TABLE = text(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5("
+    "title, body, tokenize='unicode61 remove_diacritics 2')"
+)
+_DELETE_ROWS = text("DELETE FROM content_fts WHERE rowid IN :ids").bindparams(
+    bindparam("ids", expanding=True)
+)
+_INSERT_ROW = text(
+    "INSERT INTO content_fts (rowid, title, body) VALUES (:id, :title, :body)"
+)
+_IS_EMPTY = text("SELECT NOT EXISTS (SELECT 1 FROM content_fts)")
+# BM25 считается для каждого совпадения, а у слов из большинства постов
+# его IDF близок к нулю. Поэтому по умолчанию ранжируются только
+# MAX_RANKED самых новых совпадений (SEARCH_MAX_RANKED в настройках, 0 —
+# все совпадения): границу по rowid дает обратный проход по списку
+# документов. Более старые посты с общими словами при этом не находятся.
+MAX_RANKED = 5000
+_RANKING_FLOOR = text(
+    "SELECT rowid FROM content_fts WHERE content_fts MATCH :expression "
+    "ORDER BY rowid DESC LIMIT 1 OFFSET :offset"
+)
+# Совпадение в заголовке весит втрое больше, чем в тексте поста
+_SEARCH = text(
+    "SELECT rowid FROM content_fts WHERE content_fts MATCH :expression "
+    "AND rowid >= :floor ORDER BY bm25(content_fts, 3.0, 1.0) LIMIT :limit"
+)
+_WORD_RE = re.compile(r"\w+")
+# Служебные слова есть почти в каждом посте: в индексе они только
+# раздувают списки документов и удорожают BM25
+_STOPWORDS = frozenset((
+    "а", "без", "бы", "был", "была", "были", "было", "быть", "в", "вам", "вас",
+    "во", "вот", "все", "всех", "вы", "где", "да", "для", "до", "его", "ее",
+    "если", "есть", "еще", "же", "за", "и", "из", "или", "им", "их", "к",
+    "как", "когда", "кто", "ли", "мы", "на", "над", "нас", "не", "него", "нет",
+    "ни", "но", "ну", "о", "об", "он", "она", "они", "от", "по", "под", "при",
+    "про", "с", "со", "так", "там", "то", "тоже", "только", "тут", "у", "уже",
+    "чем", "что", "чтобы", "это", "этот", "я",
+))
+
+
+def is_supported(dialect_name: str) -> bool:
+    return dialect_name == "sqlite"
+
+
+def create_search_table(connection: Connection) -> None:
+    if is_supported(connection.dialect.name):
+        connection.execute(_CREATE_TABLE)
+
+
+def stems(value: str | None) -> str:
+    """Основы значимых слов текста через пробел — содержимое колонок ``content_fts``"""
+    if not value:
+        return ""
+    return " ".join(
+        stem(word) for word in _WORD_RE.findall(value.lower())
+        if word not in _STOPWORDS
+    )
+
+
+def search_expression(query: str) -> str | None:
+    """Выражение MATCH: все значимые слова запроса через AND
+
+    Snowball обрезает разные формы по-разному («альбома» -> «альбом», но
+    «альбом» -> «альб»), поэтому основа основы тоже ищется. Последнее слово
+    может быть недописано и ищется как префикс основы.
+    """
+    words = [
+        word for word in _WORD_RE.findall(query.lower()) if word not in _STOPWORDS
+    ]
+    terms = []
+    for position, word in enumerate(words, 1):
+        base = stem(word)
+        variants = [f'"{base}"*' if position == len(words) else f'"{base}"']
+        if (shorter := stem(base)) != base:
+            variants.append(f'"{shorter}"')
+        terms.append(variants[0] if len(variants) == 1 else f"({' OR '.join(variants)})")
+    return " AND ".join(terms) or None
+
+
+async def index_rows(
+    connection: AsyncConnection, rows: Iterable[tuple[int, str | None, str | None]]
+) -> None:
+    """Замена документов (id, заголовок, текст) в индексе"""
+    documents = [
+        {"id": content_id, "title": stems(title), "body": stems(body)}
+        for content_id, title, body in rows
+    ]
+    if not documents:
+        return
+    await connection.execute(
+        _DELETE_ROWS, {"ids": [document["id"] for document in documents]}
+    )
+    await connection.execute(_INSERT_ROW, documents)
+
+
+async def is_empty(connection: AsyncConnection) -> bool:
+    return bool(await connection.scalar(_IS_EMPTY))
+
+
+async def search(
+    connection: AsyncConnection,
+    query: str,
+    limit: int,
+    max_ranked: int = MAX_RANKED,
+) -> list[int]:
+    """id постов по убыванию релевантности BM25
+
+    Ранжируются ``max_ranked`` новейших совпадений, при ``max_ranked=0`` —
+    все совпадения.
+    """
+    expression = search_expression(query)
+    if expression is None:
+        return []
+    floor = None
+    if max_ranked:
+        floor = await connection.scalar(
+            _RANKING_FLOOR, {"expression": expression, "offset": max_ranked - 1}
+        )
+    result = await connection.execute(
+        _SEARCH, {"expression": expression, "floor": floor or 0, "limit": limit}
+    )
+    return list(result.scalars())
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+def create_db_engine(url: str) -> AsyncEngine:
+    """Async-движок; для SQLite включаются WAL и ослабленный fsync"""
+    engine = create_async_engine(url)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def _set_sqlite_pragmas(dbapi_connection: Connection, _connection_record: object) -> None:
+    # WAL позволяет читать во время записи, а synchronous=NORMAL в режиме WAL
+    # не теряет целостность, только последние транзакции при сбое питания
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
@@ -1,26 +1,214 @@
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import TYPE_CHECKING
 
 import aiohttp
 from aiohttp import ClientSession
+from sqlalchemy import (
+    Column,
+    MetaData,
+    Table,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from backend.application.tg_refresher import ChannelRefresher
+from backend.domain.models import Base, Content, ContentTag
 from backend.infra.api_wrappers.model_wrapper import ModelWrapper
+from backend.infra.api_wrappers.tg_wrapper import TelegramStatsCollector
 from backend.infra.config import config
+from backend.infra.content_repository import ContentRepository
+from backend.infra.content_search import create_search_table
+from backend.infra.db import create_db_engine
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from sqlalchemy import Connection, Inspector
 
 type DbSessionFactory = async_sessionmaker[AsyncSession]
 
+_DELETE_ORPHAN_SEARCH_ROWS = text(
+    "DELETE FROM content_fts WHERE rowid NOT IN (SELECT id FROM content)"
+)
+_logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
-async def create_model_wrapper() -> AsyncIterator[ModelWrapper]:
+async def create_model_wrapper() -> AsyncGenerator[ModelWrapper]:
     session = ClientSession(connector=aiohttp.TCPConnector(ssl=False))
     try:
-        wrapper = ModelWrapper(
+        yield ModelWrapper(
             api_base=config.model_api_url,
             http_session=session
         )
-        yield wrapper
     finally:
         await session.close()
+
+
+@asynccontextmanager
+async def create_db_session_factory() -> AsyncGenerator[DbSessionFactory]:
+    engine = create_db_engine(config.database_url)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(_create_schema)
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+def _create_schema(connection: Connection) -> None:
+    _migrate_content_unique_url(connection)
+    Base.metadata.create_all(connection)
+    # create_all не добавляет колонки и индексы в уже существующие таблицы
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN "
+                    f"{preparer.format_column(column)} "
+                    f"{column.type.compile(connection.dialect)}"
+                ))
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+    create_search_table(connection)
+
+
+def _migrate_content_unique_url(connection: Connection) -> None:
+    """Перенос уникальности ``content`` с title на url в старых базах
+
+    Upsert идет по ``ON CONFLICT (url)``, а в базах, созданных до этого,
+    уникален title. Ограничение в SQLite не снять без пересоздания таблицы,
+    поэтому ``content`` и ``content_tag`` копируются во временные таблицы,
+    создаются заново и заполняются обратно; из постов с одинаковым url
+    остается последний.
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table(Content.__tablename__):
+        return
+    unique = [
+        *inspector.get_unique_constraints(Content.__tablename__),
+        *(index for index in inspector.get_indexes(Content.__tablename__) if index["unique"]),
+    ]
+    if any(item["column_names"] == ["url"] for item in unique):
+        return
+    _logger.warning("Миграция: уникальность content переносится с title на url")
+    # pysqlite выполняет DDL вне транзакции; точка сохранения открывает ее
+    # явно, чтобы прерванная миграция не оставила базу без данных
+    with connection.begin_nested():
+        _rebuild_content_tables(connection, inspector)
+
+
+def _rebuild_content_tables(connection: Connection, inspector: Inspector) -> None:
+    tables = [Content.__table__]
+    if inspector.has_table(ContentTag.__tablename__):
+        tables.append(ContentTag.__table__)
+    # Копии без ограничений: в старой content url может повторяться
+    copies = MetaData()
+    pairs = []
+    for table in tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        columns = [column for column in table.columns if column.name in existing]
+        copy = Table(
+            f"_migrate_{table.name}",
+            copies,
+            *(Column(column.name, column.type) for column in columns),
+            prefixes=["TEMPORARY"],
+        )
+        copy.create(connection)
+        connection.execute(insert(copy).from_select(
+            [column.name for column in columns], select(*columns)
+        ))
+        pairs.append((table, copy))
+    # Сначала таблица с внешним ключом, иначе удаление content каскадно
+    # очистит теги
+    for table in reversed(tables):
+        table.drop(connection)
+    for table in tables:
+        table.create(connection)
+
+    (content, content_copy), *tag_pairs = pairs
+    latest = select(func.max(content_copy.c.id)).group_by(content_copy.c.url)
+    connection.execute(insert(content).from_select(
+        content_copy.c.keys(),
+        select(*content_copy.c).where(content_copy.c.id.in_(latest)),
+    ))
+    for table, copy in tag_pairs:
+        connection.execute(insert(table).from_select(
+            copy.c.keys(),
+            select(*copy.c).where(copy.c.content_id.in_(select(content.c.id))),
+        ))
+    for _, copy in pairs:
+        copy.drop(connection)
+    if inspector.has_table("content_fts"):
+        connection.execute(_DELETE_ORPHAN_SEARCH_ROWS)
+
+
+def create_content_repository(session_factory: DbSessionFactory) -> ContentRepository:
+    return ContentRepository(
+        session_factory,
+        batch_size=config.db_upsert_batch_size,
+        search_max_ranked=config.search_max_ranked,
+    )
+
+
+@asynccontextmanager
+async def create_tg_collector() -> AsyncGenerator[TelegramStatsCollector]:
+    collector = TelegramStatsCollector()
+    try:
+        await collector.ensure_connected()
+    except Exception as e:
+        _logger.warning("Не удалось подключиться к Telegram при старте: %s", e)
+    health_task = asyncio.create_task(_watch_tg_connection(collector))
+    try:
+        yield collector
+    finally:
+        health_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await health_task
+        await collector.client.disconnect()
+
+
+@asynccontextmanager
+async def create_channel_refresher(
+    collector: TelegramStatsCollector,
+    repository: ContentRepository | None = None,
+    *,
+    start: bool = config.tg_refresh_enabled,
+) -> AsyncGenerator[ChannelRefresher]:
+    refresher = ChannelRefresher(
+        collector,
+        [config.tg_channel_username, *config.tg_refresh_channels],
+        limit=config.tg_refresh_limit,
+        interval=config.tg_refresh_interval_sec,
+        jitter=config.tg_refresh_jitter_sec,
+        max_backoff=config.tg_refresh_max_backoff_sec,
+        repository=repository,
+    )
+    if start:
+        refresher.start()
+    try:
+        yield refresher
+    finally:
+        await refresher.stop()
+
+
+async def _watch_tg_connection(collector: TelegramStatsCollector) -> None:
+    while True:
+        await asyncio.sleep(config.tg_healthcheck_interval_sec)
+        if await collector.is_healthy():
+            continue
+        try:
+            await collector.reconnect()
+        except Exception as e:
+            _logger.warning("Не удалось переподключиться к Telegram: %s", e)
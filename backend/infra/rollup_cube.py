@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import calendar
+import math
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from backend.domain.exceptions import InvalidFilterException
+from backend.domain.models import ContentType, Platform
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Mapping
+    from datetime import datetime
+
+ROLLUP_METRICS = ("views", "likes", "comments", "engagement_rate_percent", "sentiment")
+# Метрики с квантильным скетчем: неотрицательные, с длинным хвостом
+SKETCH_METRICS = ("views", "engagement_rate_percent")
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Ключ ячейки: платформа, тип контента, день от эпохи (UTC), час недели
+# (0 — понедельник 00:00)
+type CellKey = tuple[Platform, ContentType, int, int]
+# Вклад поста: значения ROLLUP_METRICS и корзины скетчей SKETCH_METRICS
+type Contribution = tuple[tuple[float, ...], tuple[int | None, ...]]
+
+_SKETCH_POSITIONS = tuple(ROLLUP_METRICS.index(name) for name in SKETCH_METRICS)
+
+
+class QuantileSketch:
+    """Логарифмическая гистограмма с относительной точностью ``accuracy``
+
+    Значение попадает в корзину ``ceil(log_gamma(x))``, поэтому оценка
+    любого квантиля отличается от точной не больше чем на ``accuracy``
+    от значения. Корзины — счетчики, значит значение можно не только
+    добавить, но и снять, а скетчи ячеек складываются. Значения не больше
+    ``min_value`` (в том числе отрицательные) учитываются в нулевой корзине.
+    """
+
+    __slots__ = ("_buckets", "zero_count")
+
+    accuracy = 0.01
+    min_value = 1e-9
+    _gamma = (1 + accuracy) / (1 - accuracy)
+    _gamma_log = math.log(_gamma)
+
+    def __init__(self) -> None:
+        self._buckets: Counter[int] = Counter()
+        self.zero_count = 0
+
+    def __len__(self) -> int:
+        return self.zero_count + self._buckets.total()
+
+    @classmethod
+    def bucket(cls, value: float) -> int | None:
+        """Корзина значения; ``None`` — нулевая корзина"""
+        if value <= cls.min_value:
+            return None
+        return math.ceil(math.log(value) / cls._gamma_log)
+
+    def add(self, bucket: int | None, weight: int = 1) -> None:
+        """Учет значения из ``bucket`` (``weight=-1`` — снятие ранее учтенного)"""
+        if bucket is None:
+            self.zero_count += weight
+            return
+        count = self._buckets[bucket] + weight
+        if count:
+            self._buckets[bucket] = count
+        else:
+            del self._buckets[bucket]
+
+    def merge(self, other: QuantileSketch) -> None:
+        self._buckets.update(other._buckets)
+        self.zero_count += other.zero_count
+
+    def quantile(self, q: float) -> float:
+        count = len(self)
+        rank = q * (count - 1)
+        seen = self.zero_count
+        if not count or rank < seen:
+            return 0.0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if rank < seen:
+                break
+        # Середина корзины (gamma^(i-1), gamma^i] по относительной ошибке
+        return 2 * self._gamma ** bucket / (1 + self._gamma)
+
+
+class RollupCell:
+    __slots__ = ("count", "sketches", "sums")
+
+    def __init__(self, *, with_sketches: bool) -> None:
+        self.count = 0
+        self.sums = [0.0] * len(ROLLUP_METRICS)
+        self.sketches = (
+            tuple(QuantileSketch() for _ in SKETCH_METRICS) if with_sketches else ()
+        )
+
+    def add(self, contribution: Contribution, weight: int) -> None:
+        values, buckets = contribution
+        self.count += weight
+        sums = self.sums
+        for position, value in enumerate(values):
+            sums[position] += weight * value
+        for sketch, bucket in zip(self.sketches, buckets, strict=False):
+            sketch.add(bucket, weight)
+
+
+class RollupCube:
+    """Материализованные агрегаты по (платформа, тип, день, час недели)
+
+    В ячейке — число постов, суммы метрик и квантильные скетчи. Для каждого
+    поста запоминаются его ячейка и учтенный вклад: при обновлении метрик
+    (или даты) старый вклад снимается и добавляется новый, как в
+    ``TagIndex``. Рядом ведутся свертки без дня: итоги по (платформа, тип)
+    со скетчами и суммы по (платформа, тип, час недели). Запросы без
+    границ дат читают свертки и не зависят от длины истории, с границами —
+    только ячейки дней из диапазона.
+    """
+
+    def __init__(self) -> None:
+        self._days: dict[int, dict[CellKey, RollupCell]] = {}
+        self._totals: dict[tuple[Platform, ContentType], RollupCell] = {}
+        self._hours: dict[tuple[Platform, ContentType, int], RollupCell] = {}
+        self._posts: dict[int, tuple[CellKey, Contribution]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(cells) for cells in self._days.values())
+
+    def update(
+        self,
+        post_id: int,
+        platform: Platform,
+        content_type: ContentType,
+        published_at: datetime,
+        values: Mapping[str, float],
+    ) -> bool:
+        """Учет поста; ``False``, если ячейка и значения не изменились"""
+        key = (Platform(platform), ContentType(content_type), *_day_and_hour(published_at))
+        metrics = tuple(float(values[name] or 0.0) for name in ROLLUP_METRICS)
+        previous = self._posts.get(post_id)
+        if previous is not None and previous[0] == key and previous[1][0] == metrics:
+            return False
+        contribution = (
+            metrics,
+            tuple(QuantileSketch.bucket(metrics[position]) for position in _SKETCH_POSITIONS),
+        )
+        self.remove(post_id)
+        self._posts[post_id] = (key, contribution)
+        self._apply(key, contribution, 1)
+        return True
+
+    def metrics(self, post_id: int) -> dict[str, float] | None:
+        """Учтенные значения метрик поста"""
+        previous = self._posts.get(post_id)
+        if previous is None:
+            return None
+        return dict(zip(ROLLUP_METRICS, previous[1][0], strict=True))
+
+    def remove(self, post_id: int) -> None:
+        previous = self._posts.pop(post_id, None)
+        if previous is not None:
+            self._apply(*previous, -1)
+
+    def summary(
+        self,
+        *,
+        platform: Platform | None = None,
+        content_type: ContentType | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> dict:
+        count = 0
+        sums = [0.0] * len(ROLLUP_METRICS)
+        sketches = [QuantileSketch() for _ in SKETCH_METRICS]
+        cells = (
+            self._totals.items() if start_date is None and end_date is None
+            else self._day_cells(start_date, end_date)
+        )
+        for _, cell in _matching(cells, platform, content_type):
+            count += cell.count
+            sums = [total + value for total, value in zip(sums, cell.sums, strict=True)]
+            for sketch, cell_sketch in zip(sketches, cell.sketches, strict=True):
+                sketch.merge(cell_sketch)
+        totals = dict(zip(ROLLUP_METRICS, sums, strict=True))
+        return {
+            "total_items": count,
+            "total_views": round(totals["views"]),
+            "total_likes": round(totals["likes"]),
+            "total_comments": round(totals["comments"]),
+            "avg_engagement": totals["engagement_rate_percent"] / count if count else 0.0,
+            "avg_sentiment": totals["sentiment"] / count if count else 0.0,
+            "quantiles": {
+                name: {f"p{round(q * 100)}": sketch.quantile(q) for q in QUANTILES}
+                for name, sketch in zip(SKETCH_METRICS, sketches, strict=True)
+            },
+        }
+
+    def heatmap(
+        self,
+        metric: str = "engagement_rate_percent",
+        *,
+        platform: Platform | None = None,
+        content_type: ContentType | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> dict:
+        """Число постов и среднее ``metric`` по дням недели (строки) и часам"""
+        if metric not in ROLLUP_METRICS:
+            msg = f"Unknown metric: {metric}"
+            raise InvalidFilterException(msg)
+        position = ROLLUP_METRICS.index(metric)
+        posts = [[0] * 24 for _ in range(7)]
+        sums = [[0.0] * 24 for _ in range(7)]
+        cells = (
+            self._hours.items() if start_date is None and end_date is None
+            else self._day_cells(start_date, end_date)
+        )
+        for key, cell in _matching(cells, platform, content_type):
+            # Час недели — последний элемент ключа и у ячеек, и у свертки
+            weekday, hour = divmod(key[-1], 24)
+            posts[weekday][hour] += cell.count
+            sums[weekday][hour] += cell.sums[position]
+        return {
+            "metric": metric,
+            "posts": posts,
+            "mean": [
+                [total / count if count else 0.0 for total, count in zip(*row, strict=True)]
+                for row in zip(sums, posts, strict=True)
+            ],
+        }
+
+    def _apply(self, key: CellKey, contribution: Contribution, weight: int) -> None:
+        platform, content_type, day, hour_of_week = key
+        for cells, cell_key, with_sketches in (
+            (self._days.setdefault(day, {}), key, True),
+            (self._totals, (platform, content_type), True),
+            (self._hours, (platform, content_type, hour_of_week), False),
+        ):
+            cell = cells.get(cell_key)
+            if cell is None:
+                cell = cells[cell_key] = RollupCell(with_sketches=with_sketches)
+            cell.add(contribution, weight)
+            if not cell.count:
+                del cells[cell_key]
+        if not self._days[day]:
+            del self._days[day]
+
+    def _day_cells(
+        self, start_date: datetime | None, end_date: datetime | None
+    ) -> Iterable[tuple[CellKey, RollupCell]]:
+        first = -math.inf if start_date is None else _day_and_hour(start_date)[0]
+        last = math.inf if end_date is None else _day_and_hour(end_date)[0]
+        if last - first < len(self._days):
+            days = (self._days.get(day) for day in range(int(first), int(last) + 1))
+        else:
+            days = (cells for day, cells in self._days.items() if first <= day <= last)
+        return (item for cells in days if cells for item in cells.items())
+
+
+def _matching[K: Hashable](
+    cells: Iterable[tuple[K, RollupCell]],
+    platform: Platform | None,
+    content_type: ContentType | None,
+) -> Iterable[tuple[K, RollupCell]]:
+    # Платформа и тип — первые элементы ключа на всех уровнях
+    return (
+        (key, cell) for key, cell in cells
+        if (platform is None or key[0] == platform)
+        and (content_type is None or key[1] == content_type)
+    )
+
+
+def _day_and_hour(value: datetime) -> tuple[int, int]:
+    # timegm считает наивное время UTC (так его возвращает SQLite)
+    seconds = calendar.timegm(value.utctimetuple())
+    day, second_of_day = divmod(seconds, 86400)
+    # 1970-01-01 — четверг (третий день недели от понедельника)
+    return day, (day + 3) % 7 * 24 + second_of_day // 3600
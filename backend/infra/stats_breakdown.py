@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+import attrs
+import numpy as np
+
+from backend.domain.exceptions import InvalidFilterException
+from backend.domain.models import ContentType, Platform
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+    from datetime import datetime
+
+GROUP_KEYS = ("platform", "content_type", "tag", "day", "week")
+BREAKDOWN_METRICS = (
+    "views", "likes", "comments", "shares", "saves",
+    "engagement_rate_percent", "sentiment",
+)
+
+_PLATFORMS = tuple(Platform)
+_CONTENT_TYPES = tuple(ContentType)
+_EPOCH = date(1970, 1, 1)
+# 1970-01-01 — четверг: сдвиг на 3 дня начинает недели с понедельника
+_WEEK_SHIFT = 3
+
+
+@attrs.frozen
+class ContentColumns:
+    """Столбцы таблицы ``content`` в массивах NumPy для группировок
+
+    Платформа и тип контента хранятся кодами (номер в перечислении), дата
+    публикации — номером дня от эпохи в UTC. Теги разложены парами
+    (строка поста, код тега), поэтому группировка по тегу — та же
+    группировка, только по строкам пар.
+    """
+
+    ids: np.ndarray
+    platform: np.ndarray
+    content_type: np.ndarray
+    day: np.ndarray
+    metrics: Mapping[str, np.ndarray]
+    tag_rows: np.ndarray
+    tag_codes: np.ndarray
+    tags: tuple[str, ...]
+
+    @classmethod
+    def build(
+        cls, rows: Sequence[Sequence], post_tags: Iterable[tuple[int, str]]
+    ) -> ContentColumns:
+        """``rows`` — (id, platform, content_type, published_at, *BREAKDOWN_METRICS)"""
+        count = len(rows)
+        columns = list(zip(*rows, strict=True)) or [()] * (4 + len(BREAKDOWN_METRICS))
+        ids = np.fromiter(columns[0], dtype=np.int64, count=count)
+        platform_codes = {platform: code for code, platform in enumerate(_PLATFORMS)}
+        type_codes = {content_type: code for code, content_type in enumerate(_CONTENT_TYPES)}
+
+        # Пары (пост, тег) переводятся в номера строк через отсортированные id
+        order = np.argsort(ids, kind="stable")
+        tag_ids: list[int] = []
+        tag_codes: list[int] = []
+        tags: dict[str, int] = {}
+        for content_id, tag in post_tags:
+            tag_ids.append(content_id)
+            tag_codes.append(tags.setdefault(tag, len(tags)))
+        positions = np.searchsorted(ids[order], np.asarray(tag_ids, dtype=np.int64))
+        known = positions < count
+        known[known] = ids[order][positions[known]] == np.asarray(tag_ids)[known]
+
+        return cls(
+            ids=ids,
+            platform=np.fromiter(
+                (platform_codes[Platform(value)] for value in columns[1]),
+                dtype=np.int8, count=count,
+            ),
+            content_type=np.fromiter(
+                (type_codes[ContentType(value)] for value in columns[2]),
+                dtype=np.int8, count=count,
+            ),
+            day=np.fromiter(
+                (_epoch_day(value) for value in columns[3]), dtype=np.int64, count=count
+            ),
+            metrics={
+                name: np.fromiter(values, dtype=np.float64, count=count)
+                for name, values in zip(BREAKDOWN_METRICS, columns[4:], strict=True)
+            },
+            tag_rows=order[positions[known]],
+            tag_codes=np.asarray(tag_codes, dtype=np.int64)[known],
+            tags=tuple(tags),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def breakdown(
+    columns: ContentColumns,
+    by: Sequence[str],
+    *,
+    metric: str = "views",
+    limit: int = 100,
+    top: int = 3,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> dict:
+    """Группировка постов по ``by`` со статистиками ``metric``
+
+    Ключи групп складываются в один код группы, count и sum считаются
+    ``bincount``, а медиана, p90 и лучшие посты — частичной сортировкой
+    (``partition``) и только у возвращаемых групп. Группы упорядочены по
+    сумме метрики, возвращаются первые ``limit``; ``top`` — id постов с
+    наибольшим значением метрики в каждой группе.
+    """
+    by = tuple(dict.fromkeys(by))
+    unknown = [key for key in by if key not in GROUP_KEYS]
+    if unknown or not by:
+        msg = (
+            f"Unknown group keys: {', '.join(unknown)}" if unknown else "No group keys"
+        )
+        raise InvalidFilterException(msg)
+    if metric not in BREAKDOWN_METRICS:
+        msg = f"Unknown metric: {metric}"
+        raise InvalidFilterException(msg)
+
+    rows = columns.tag_rows if "tag" in by else np.arange(len(columns))
+    mask = np.ones(len(rows), dtype=bool)
+    if start_date is not None:
+        mask &= columns.day[rows] >= _epoch_day(start_date)
+    if end_date is not None:
+        mask &= columns.day[rows] <= _epoch_day(end_date)
+    rows = rows[mask]
+
+    # Коды ключей небольшие целые, поэтому код группы — смешанная система
+    # счисления без сортировок; если он перерастает число строк (например,
+    # тег x день), он уплотняется через np.unique
+    group = np.zeros(len(rows), dtype=np.int64)
+    size = 1
+    keys: list[tuple[np.ndarray, Callable[[int], str]]] = []
+    for key in by:
+        codes, label = _group_codes(columns, key, rows, mask)
+        low = int(codes.min(initial=0))
+        base = int(codes.max(initial=0)) - low + 1
+        group = group * base + (codes - low)
+        size *= base
+        if size > 4 * len(rows) + 1024:
+            uniques, group = np.unique(group, return_inverse=True)
+            size = len(uniques)
+        keys.append((codes, label))
+
+    values = columns.metrics[metric][rows]
+    counts = np.bincount(group, minlength=size)
+    sums = np.bincount(group, weights=values, minlength=size)
+    starts = np.cumsum(counts) - counts
+    present = np.flatnonzero(counts)
+    # Строки группы идут подряд после одной сортировки по коду группы;
+    # до 2^16 групп NumPy сортирует устойчиво поразрядно, за O(n)
+    order = (
+        np.argsort(group.astype(np.uint16), kind="stable") if size <= 1 << 16
+        else np.argsort(group)
+    )
+
+    result = []
+    for index in present[np.argsort(-sums[present], kind="stable")[:limit]].tolist():
+        start, count = int(starts[index]), int(counts[index])
+        group_rows = order[start:start + count]
+        group_values = values[group_rows]
+        median, p90 = np.quantile(group_values, (0.5, 0.9))
+        best = group_rows[_top_positions(group_values, top)]
+        result.append({
+            "keys": {
+                key: label(int(codes[group_rows[0]]))
+                for key, (codes, label) in zip(by, keys, strict=True)
+            },
+            "count": count,
+            "sum": float(sums[index]),
+            "mean": float(sums[index]) / count,
+            "median": float(median),
+            "p90": float(p90),
+            "top_ids": columns.ids[rows[best]].tolist(),
+        })
+    return {
+        "by": list(by),
+        "metric": metric,
+        "total_groups": len(present),
+        "groups": result,
+    }
+
+
+def _group_codes(
+    columns: ContentColumns, key: str, rows: np.ndarray, mask: np.ndarray
+) -> tuple[np.ndarray, Callable[[int], str]]:
+    match key:
+        case "platform":
+            return columns.platform[rows], lambda code: _PLATFORMS[code].value
+        case "content_type":
+            return columns.content_type[rows], lambda code: _CONTENT_TYPES[code].value
+        case "tag":
+            return columns.tag_codes[mask], lambda code: columns.tags[code]
+        case "day":
+            return columns.day[rows], _day_label
+        case _:
+            return (
+                (columns.day[rows] + _WEEK_SHIFT) // 7,
+                lambda week: _day_label(week * 7 - _WEEK_SHIFT),
+            )
+
+
+def _top_positions(values: np.ndarray, top: int) -> np.ndarray:
+    """Позиции ``top`` наибольших значений по убыванию"""
+    if top >= len(values):
+        return np.argsort(-values, kind="stable")
+    if top <= 0:
+        return np.empty(0, dtype=np.intp)
+    positions = np.argpartition(-values, top - 1)[:top]
+    return positions[np.argsort(-values[positions], kind="stable")]
+
+
+def _epoch_day(value: datetime) -> int:
+    # timegm считает наивное время UTC (так его возвращает SQLite)
+    return calendar.timegm(value.utctimetuple()) // 86400
+
+
+def _day_label(day: int) -> str:
+    return (_EPOCH + timedelta(days=day)).isoformat()
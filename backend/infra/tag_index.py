@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+class TagIndex:
+    """Инвертированный индекс тегов в памяти: тег -> отсортированные id постов
+
+    Изменяемое состояние — множества id по тегам и обратный индекс
+    пост -> теги, через который старые теги поста снимаются при обновлении.
+    Отсортированные массивы ``int64`` строятся лениво и сбрасываются только
+    у изменившихся тегов; на них выполняются пересечения (AND) и
+    объединения (OR). Для каждого тега поддерживается сумма engagement его
+    постов, поэтому рейтинг тегов не требует прохода по постам.
+    """
+
+    def __init__(self) -> None:
+        self._posts: defaultdict[str, set[int]] = defaultdict(set)
+        self._post_tags: dict[int, tuple[str, ...]] = {}
+        self._engagement: dict[int, float] = {}
+        self._engagement_sums: defaultdict[str, float] = defaultdict(float)
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def update(self, post_id: int, tags: Iterable[str], engagement: float = 0.0) -> None:
+        """Замена тегов и engagement поста (со снятием старых значений)"""
+        self.remove(post_id)
+        tags = tuple(dict.fromkeys(tags))
+        if not tags:
+            return
+        self._post_tags[post_id] = tags
+        self._engagement[post_id] = engagement
+        for tag in tags:
+            self._posts[tag].add(post_id)
+            self._engagement_sums[tag] += engagement
+            self._arrays.pop(tag, None)
+
+    def remove(self, post_id: int) -> None:
+        tags = self._post_tags.pop(post_id, ())
+        engagement = self._engagement.pop(post_id, 0.0)
+        for tag in tags:
+            posts = self._posts[tag]
+            posts.discard(post_id)
+            self._arrays.pop(tag, None)
+            if posts:
+                self._engagement_sums[tag] -= engagement
+            else:
+                del self._posts[tag]
+                del self._engagement_sums[tag]
+
+    def post_count(self, tag: str) -> int:
+        posts = self._posts.get(tag)
+        return len(posts) if posts is not None else 0
+
+    def post_ids(self, tag: str) -> np.ndarray:
+        array = self._arrays.get(tag)
+        if array is None:
+            array = np.fromiter(sorted(self._posts.get(tag, ())), dtype=np.int64)
+            self._arrays[tag] = array
+        return array
+
+    def match(
+        self, tags: Iterable[str], *, require_all: bool = False
+    ) -> np.ndarray:
+        """Отсортированные id постов со всеми (AND) или любым (OR) из тегов"""
+        arrays = [self.post_ids(tag) for tag in dict.fromkeys(tags)]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        if require_all:
+            # Пересечение от самого короткого массива быстрее всего сужается
+            arrays.sort(key=len)
+            result = arrays[0]
+            for array in arrays[1:]:
+                if not len(result):
+                    break
+                result = np.intersect1d(result, array, assume_unique=True)
+            return result
+        return np.unique(np.concatenate(arrays))
+
+    def top_tags(self, limit: int = 20, by: str = "engagement") -> list[dict]:
+        """Теги по средней вовлеченности постов (``engagement``) или по числу постов"""
+        def count(tag: str) -> int:
+            return len(self._posts[tag])
+
+        def avg_engagement(tag: str) -> float:
+            return self._engagement_sums[tag] / len(self._posts[tag])
+
+        key = avg_engagement if by == "engagement" else count
+        return [
+            {"tag": tag, "posts": count(tag), "avg_engagement": avg_engagement(tag)}
+            for tag in sorted(self._posts, key=key, reverse=True)[:limit]
+        ]
+
+    def co_occurrence(self, tag: str, limit: int = 20) -> list[dict]:
+        """Теги, чаще всего встречающиеся в одних постах с ``tag``"""
+        counts: Counter[str] = Counter()
+        for post_id in self._posts.get(tag, ()):
+            counts.update(self._post_tags[post_id])
+        counts.pop(tag, None)
+        return [
+            {"tag": other, "posts": posts} for other, posts in counts.most_common(limit)
+        ]
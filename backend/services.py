@@ -158,15 +158,20 @@ def save_user_avatar(email: str, filename: str) -> Optional[UserProfile]:
 # ---------- КОНТЕНТ / СТАТИСТИКА ----------
 
 
+# CONTENT_ITEMS не меняется во время работы, поэтому модели строятся
+# один раз при импорте, а поиск по id идет через словарь
+_CONTENT = [ContentItem(**item) for item in CONTENT_ITEMS]
+_CONTENT_BY_ID = {}
+for _item in _CONTENT:
+    _CONTENT_BY_ID.setdefault(_item.id, _item)
+
+
 def get_all_content() -> List[ContentItem]:
-    return [ContentItem(**item) for item in CONTENT_ITEMS]
+    return list(_CONTENT)
 
 
 def get_content_by_id(item_id: int) -> Optional[ContentItem]:
-    for item in CONTENT_ITEMS:
-        if item["id"] == item_id:
-            return ContentItem(**item)
-    return None
+    return _CONTENT_BY_ID.get(item_id)
 
 
 def get_summary_stats() -> SummaryStats:
@@ -192,7 +197,8 @@ def get_summary_stats() -> SummaryStats:
 
 
 def compare_items(ids: List[int]) -> List[ContentItem]:
-    return [item for item in get_all_content() if item.id in ids]
+    found = (_CONTENT_BY_ID.get(item_id) for item_id in dict.fromkeys(ids))
+    return [item for item in found if item is not None]
 
 
 async def ask_llm(query: str) -> ChatResponse:
@@ -15,12 +15,46 @@ const api = axios.create({
 //        SUMMARY STATS      
 // ---------------------------
 export const getSummary = () => api.get("/stats/summary");
+// Группировка на сервере: by — массив ключей (platform, content_type, tag,
+// day, week), metric — views, likes, engagement_rate_percent и т.п.
+export const getStatsBreakdown = ({ by = ["platform"], metric = "views", ...params } = {}) =>
+  api.get("/stats/breakdown", { params: { by: by.join(","), metric, ...params } });
+// Сводка и тепловая карта (день недели x час) из предрасчитанных агрегатов;
+// params — platform, content_type, start_date, end_date
+export const getRollupSummary = (params = {}) => api.get("/stats/rollup", { params });
+export const getHeatmap = ({ metric = "engagement_rate_percent", ...params } = {}) =>
+  api.get("/stats/heatmap", { params: { metric, ...params } });
+
+// ---------------------------
+//        LIVE (SSE)
+// ---------------------------
+// Вместо опроса: summary — сводка (приходит сразу при подключении), posts —
+// изменившиеся посты с метриками и дельтами, resync — часть событий
+// пропущена, данные нужно перечитать. Возвращает функцию отписки.
+export const subscribeLive = ({ onSummary, onPosts, onResync } = {}) => {
+  const source = new EventSource(`${API_BASE_URL}/live`);
+  const listen = (event, handler) =>
+    handler &&
+    source.addEventListener(event, (e) => handler(JSON.parse(e.data)));
+  listen("summary", onSummary);
+  listen("posts", onPosts);
+  listen("resync", onResync);
+  return () => source.close();
+};
 
 // ---------------------------
 //        CONTENT
 // ---------------------------
 export const getContent = () => api.get("/content");
+// Страница реестра: курсор следующей страницы — в заголовке x-next-cursor,
+// fields — массив нужных полей
+export const getContentPage = ({ cursor, limit = 100, fields } = {}) =>
+  api.get("/content", {
+    params: { cursor, limit, fields: fields && fields.join(",") },
+  });
 export const getContentById = (id) => api.get(`/content/${id}`);
+export const searchContent = (q, limit = 20) =>
+  api.get("/content/search", { params: { q, limit } });
 
 // ---------------------------
 //        COMPARE
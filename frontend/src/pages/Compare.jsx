@@ -11,7 +11,7 @@ export default function Compare() {
       .map((x) => parseInt(x.trim(), 10))
       .filter(Boolean);
     if (!ids.length) return;
-    postCompare(ids).then((res) => setItems(res.data));
+    postCompare(ids).then((res) => setItems(res.data.items));
   };
 
   return (
@@ -73,10 +73,13 @@ export default function Compare() {
                 <th style={{ padding: 8, textAlign: "right" }}>Просмотры</th>
                 <th style={{ padding: 8, textAlign: "right" }}>ER</th>
                 <th style={{ padding: 8, textAlign: "right" }}>Sentiment</th>
+                <th style={{ padding: 8, textAlign: "right" }}>
+                  Перцентиль просмотров
+                </th>
               </tr>
             </thead>
             <tbody>
-              {items.map((i) => (
+              {items.map(({ item: i, metrics }) => (
                 <tr key={i.id}>
                   <td style={{ padding: 8 }}>{i.id}</td>
                   <td style={{ padding: 8 }}>{i.title}</td>
@@ -84,11 +87,14 @@ export default function Compare() {
                     {i.views.toLocaleString("ru-RU")}
                   </td>
                   <td style={{ padding: 8, textAlign: "right" }}>
-                    {(i.engagement_rate * 100).toFixed(1)}%
+                    {i.engagement_rate_percent.toFixed(1)}%
                   </td>
                   <td style={{ padding: 8, textAlign: "right" }}>
                     {i.sentiment.toFixed(2)}
                   </td>
+                  <td style={{ padding: 8, textAlign: "right" }}>
+                    {metrics.views.percentile.toFixed(0)}
+                  </td>
                 </tr>
               ))}
             </tbody>
@@ -1,6 +1,6 @@
 // frontend/src/pages/Dashboard.jsx
 import React, { useEffect, useState } from "react";
-import { getSummary } from "../api";
+import { getSummary, subscribeLive } from "../api";
 import EngagementPanel from "../components/EngagementPanel";
 import StatsCharts from "../components/StatsCharts";
 import OverviewHero from "../components/OverviewHero";
@@ -21,6 +21,18 @@ export default function Dashboard() {
       .finally(() => setLoading(false));
   }, []);
 
+  useEffect(
+    () =>
+      // Сводка приходит по push-каналу после каждого изменения данных;
+      // поля, которых нет в событии, остаются от первого запроса
+      subscribeLive({
+        onSummary: (summary) =>
+          setStats((prev) => (prev ? { ...prev, ...summary } : summary)),
+        onResync: () => getSummary().then((res) => setStats(res.data)),
+      }),
+    []
+  );
+
   if (loading) return <div>Загружаю сводку…</div>;
   if (!stats) return <div>Нет данных</div>;
 
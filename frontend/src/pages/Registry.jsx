@@ -1,12 +1,28 @@
 import React, { useEffect, useState } from "react";
-import { getContent } from "../api";
+import { getContentPage } from "../api";
+
+const PAGE_SIZE = 100;
 
 export default function Registry() {
   const [items, setItems] = useState([]);
   const [selected, setSelected] = useState(null);
+  const [cursor, setCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
+
+  // Реестр грузится страницами: курсор следующей — в заголовке x-next-cursor,
+  // на последней странице его нет
+  const loadPage = (pageCursor) => {
+    setLoading(true);
+    return getContentPage({ cursor: pageCursor, limit: PAGE_SIZE })
+      .then((res) => {
+        setItems((prev) => (pageCursor ? [...prev, ...res.data] : res.data));
+        setCursor(res.headers["x-next-cursor"] || null);
+      })
+      .finally(() => setLoading(false));
+  };
 
   useEffect(() => {
-    getContent().then((res) => setItems(res.data));
+    loadPage();
   }, []);
 
   return (
@@ -60,6 +76,24 @@ export default function Registry() {
             </tbody>
           </table>
         </div>
+        {cursor && (
+          <button
+            onClick={() => loadPage(cursor)}
+            disabled={loading}
+            style={{
+              marginTop: 12,
+              padding: "6px 12px",
+              borderRadius: 8,
+              border: "1px solid #2b3040",
+              backgroundColor: "#0a0f18",
+              color: "#c5e479",
+              fontSize: 12,
+              cursor: loading ? "default" : "pointer",
+            }}
+          >
+            {loading ? "Загружаю…" : "Показать ещё"}
+          </button>
+        )}
       </div>
 
       <div>
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+from collections.abc import AsyncIterator, Iterator
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+# Настройки читаются при импорте backend.infra.config
+os.environ.update({
+    "MODEL_API_URL": "http://model.test",
+    "MODEL_API_KEY": "test",
+    "YOUTUBE_API_KEY": "test",
+    "YOUTUBE_CHANNEL_ID": "test",
+    "VK_API_URL": "http://vk.test",
+    "VK_API_KEY": "test",
+    "TG_API_ID": "1",
+    "TG_API_HASH": "test",
+    "TG_CHANNEL_USERNAME": "channel",
+    # Пустая StringSession: TelegramClient создается, но не подключается
+    "TG_SESSION_STRING": "1" + "A" * 351 + "=",
+    "DATABASE_URL": "sqlite+aiosqlite://",
+})
+
+from backend.api import router  # noqa: E402
+from backend.infra.api_wrappers.tg_limiter import TelegramRateLimiter  # noqa: E402
+from backend.infra.api_wrappers.tg_state import TelegramStateStore  # noqa: E402
+from backend.infra.api_wrappers.tg_wrapper import TelegramStatsCollector  # noqa: E402
+from backend.infra.content_repository import ContentRepository  # noqa: E402
+from backend.infra.db import create_db_engine  # noqa: E402
+from backend.infra.di import _create_schema  # noqa: E402
+from tests.fakes import FakeTelegramClient  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def tg_client() -> FakeTelegramClient:
+    return FakeTelegramClient(20)
+
+
+@pytest.fixture
+def collector(tmp_path, tg_client: FakeTelegramClient) -> TelegramStatsCollector:
+    collector = TelegramStatsCollector(
+        state_store=TelegramStateStore(str(tmp_path / "tg_state.json")),
+        limiter=TelegramRateLimiter(rate=1000, burst=100, max_flood_wait=1),
+    )
+    collector.client = tg_client
+    return collector
+
+
+@pytest.fixture
+def api(collector: TelegramStatsCollector) -> Iterator[TestClient]:
+    """Клиент роутера без lifespan: зависимости кладутся в ``app.state``"""
+    app = FastAPI()
+    app.include_router(router.router)
+    app.state.tg_collector = collector
+    router.channel_stats_cache.invalidate()
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+async def repository(tmp_path, anyio_backend: str) -> AsyncIterator[ContentRepository]:
+    """Репозиторий на пустой SQLite в файле; пакеты по 2 строки"""
+    engine = create_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'content.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(_create_schema)
+    yield ContentRepository(async_sessionmaker(engine, expire_on_commit=False), batch_size=2)
+    await engine.dispose()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+
+
+def make_message(
+    message_id: int,
+    text: str | None = "Пост #tag",
+    *,
+    views: int = 100,
+    forwards: int = 1,
+    replies: int = 0,
+    reactions: int = 0,
+) -> SimpleNamespace:
+    """Сообщение Telegram с полями, которые читает коллектор"""
+    return SimpleNamespace(
+        id=message_id,
+        message=text,
+        media=None,
+        entities=None,
+        date=datetime(2025, 1, 1, tzinfo=UTC),
+        views=views,
+        forwards=forwards,
+        replies=SimpleNamespace(replies=replies),
+        reactions=(
+            SimpleNamespace(results=[SimpleNamespace(count=reactions)])
+            if reactions else None
+        ),
+    )
+
+
+class _MessageIterator:
+    def __init__(self, messages: list) -> None:
+        self._messages = iter(messages)
+
+    def __aiter__(self) -> _MessageIterator:
+        return self
+
+    async def __anext__(self) -> SimpleNamespace:
+        try:
+            return next(self._messages)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class FakeTelegramClient:
+    """Канал из ``messages`` (id -> сообщение) вместо TelegramClient"""
+
+    def __init__(self, count: int = 0) -> None:
+        self.messages = {i: make_message(i) for i in range(1, count + 1)}
+        self.calls: list[tuple] = []
+
+    def is_connected(self) -> bool:
+        return True
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def get_entity(self, username: str) -> SimpleNamespace:
+        self.calls.append(("get_entity", username))
+        if username.startswith("missing"):
+            msg = f'No user has "{username}" as username'
+            raise ValueError(msg)
+        return SimpleNamespace(username=username)
+
+    async def get_messages(
+        self, entity: object, limit: int | None = None, min_id: int = 0, ids: list | None = None
+    ) -> list:
+        self.calls.append(("get_messages", limit, min_id, ids))
+        if ids is not None:
+            return [self.messages.get(i) for i in ids]
+        newest = [
+            message for i, message in sorted(self.messages.items(), reverse=True)
+            if i > min_id
+        ]
+        return newest[:limit]
+
+    def iter_messages(
+        self, entity: object, limit: int | None = None, reply_to: int | None = None, **kwargs: object
+    ) -> _MessageIterator:
+        self.calls.append(("iter_messages", limit, reply_to))
+        if reply_to is not None:
+            return _MessageIterator([
+                make_message(10_000 + i, f"Комментарий {i}") for i in range(2)
+            ][:limit])
+        newest = [message for _, message in sorted(self.messages.items(), reverse=True)]
+        return _MessageIterator(newest[:limit])
+
+
+def content_record(index: int, **values: Any) -> dict[str, Any]:
+    """Запись коллектора для ``ContentRepository.upsert_many``"""
+    return {
+        "title": f"Пост {index}",
+        "text": f"Текст поста {index}",
+        "url": f"https://t.me/channel/{index}",
+        "content_type": "post",
+        "platform": "telegram",
+        "published_at": datetime(2025, 1, 1, index % 24, tzinfo=UTC),
+        "likes": index,
+        "comments": 0,
+        "views": 100 * index,
+        "engagement_rate_percent": float(index % 10),
+        "sentiment": 0.5,
+        "tags_str": "#news",
+        **values,
+    }
+
+
+def item_record(item_id: int, platform: str = "telegram", **values: Any) -> dict[str, Any]:
+    """Запись ``ContentItem`` для ``ContentGetter``"""
+    return {
+        "id": item_id,
+        "platform": platform,
+        "title": f"Пост {item_id}",
+        "url": f"https://example.com/{item_id}",
+        "published_at": datetime(2025, 1, 1 + item_id % 28, tzinfo=UTC),
+        "views": 100 * item_id,
+        "likes": item_id,
+        "comments": item_id % 5,
+        "engagement_rate_percent": float(item_id % 10),
+        "sentiment": 0.5,
+        "tags": ["#news"],
+        **values,
+    }
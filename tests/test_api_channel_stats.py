@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+
+from backend.api.schemas import MAX_BATCH_CHANNELS
+
+
+def test_ndjson_stream_yields_one_record_per_line(api):
+    response = api.get("/api/channel-stats-stream/channel", params={"limit": 3})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["tg_id"] for record in records] == [20, 19, 18]
+
+
+def test_ndjson_stream_ends_with_error_record(api):
+    response = api.get("/api/channel-stats-stream/missing")
+
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"error": 'No user has "missing" as username'}
+    ]
+
+
+def test_sse_stream_reports_done_and_error(api):
+    done = api.get("/api/channel-stats-stream/channel?limit=2&format=sse").text
+    failed = api.get("/api/channel-stats-stream/missing?format=sse").text
+
+    assert done.count("event: record\n") == 2
+    assert done.endswith("event: done\ndata: {}\n\n")
+    assert failed.startswith("event: error\n")
+
+
+def test_batch_collects_channels_and_reports_failures(api):
+    response = api.post("/api/channel-stats/batch", json={
+        "channels": ["first", "missing", "first"], "limit": 2,
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["failed"] == 1
+    first, missing = body["results"]
+    assert (first["channel"], first["ok"], len(first["records"])) == ("first", True, 2)
+    assert (missing["channel"], missing["ok"]) == ("missing", False)
+    assert "missing" in missing["error"]
+
+
+def test_batch_rejects_too_many_channels(api):
+    channels = [f"channel{i}" for i in range(MAX_BATCH_CHANNELS + 1)]
+
+    response = api.post("/api/channel-stats/batch", json={"channels": channels})
+
+    assert response.status_code == 422
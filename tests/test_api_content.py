@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.api import router
+from backend.application.content_getter import ContentGetter
+from tests.fakes import item_record
+
+
+@pytest.fixture
+def content_api(api, monkeypatch):
+    monkeypatch.setattr(router, "service", ContentGetter([item_record(i) for i in range(1, 8)]))
+    router.response_cache.invalidate()
+    return api
+
+
+def read_pages(client, **params) -> list[list[dict]]:
+    pages = []
+    while True:
+        response = client.get("/api/content", params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        if "X-Next-Cursor" not in response.headers:
+            return pages
+        params = {**params, "cursor": response.headers["X-Next-Cursor"]}
+
+
+def test_without_params_returns_full_list(content_api):
+    response = content_api.get("/api/content")
+
+    assert [item["id"] for item in response.json()] == list(range(1, 8))
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_cursor_pages_cover_the_list(content_api):
+    pages = read_pages(content_api, limit=3)
+
+    assert [[item["id"] for item in page] for page in pages] == [[1, 2, 3], [4, 5, 6], [7]]
+
+
+def test_cursor_survives_snapshot_rebuild(content_api):
+    first = content_api.get("/api/content", params={"limit": 3})
+    router.service.update([item_record(i) for i in (9, 1, 2, 3, 4, 5, 6, 7)])
+
+    response = content_api.get(
+        "/api/content", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]}
+    )
+
+    assert [item["id"] for item in response.json()] == [4, 5, 6]
+
+
+def test_fields_projection(content_api):
+    response = content_api.get("/api/content", params={"limit": 2, "fields": "id, views,id"})
+
+    assert response.json() == [{"id": 1, "views": 100}, {"id": 2, "views": 200}]
+
+
+@pytest.mark.parametrize("params", [
+    {"fields": "id,password"},
+    {"fields": ","},
+    {"cursor": "broken"},
+])
+def test_invalid_params_are_rejected(content_api, params):
+    assert content_api.get("/api/content", params=params).status_code == 400
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from backend.infra import cache
+from backend.infra.cache import TTLCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache, "monotonic", lambda: now[0])
+    return now
+
+
+def counting_loader(calls: list[int]):
+    async def load() -> int:
+        calls.append(len(calls))
+        await asyncio.sleep(0)
+        return len(calls)
+
+    return load
+
+
+async def test_fresh_entry_is_served_from_cache(clock):
+    ttl_cache = TTLCache(ttl=10, stale_ttl=10, max_entries=4)
+    calls: list[int] = []
+
+    assert await ttl_cache.get_or_load("key", counting_loader(calls)) == 1
+    clock[0] += 5
+    assert await ttl_cache.get_or_load("key", counting_loader(calls)) == 1
+    assert ttl_cache.stats.hits == 1
+    assert len(calls) == 1
+
+
+async def test_stale_entry_is_served_and_refreshed_once(clock):
+    ttl_cache = TTLCache(ttl=10, stale_ttl=10, max_entries=4)
+    calls: list[int] = []
+    await ttl_cache.get_or_load("key", counting_loader(calls))
+    clock[0] += 15
+
+    stale = await asyncio.gather(*(
+        ttl_cache.get_or_load("key", counting_loader(calls)) for _ in range(3)
+    ))
+    await asyncio.gather(*ttl_cache._background)
+
+    assert stale == [1, 1, 1]
+    assert ttl_cache.stats.refreshes == 1
+    assert await ttl_cache.get_or_load("key", counting_loader(calls)) == 2
+
+
+async def test_expired_entry_is_loaded_once_for_concurrent_callers(clock):
+    ttl_cache = TTLCache(ttl=10, stale_ttl=10, max_entries=4)
+    calls: list[int] = []
+    await ttl_cache.get_or_load("key", counting_loader(calls))
+    clock[0] += 25
+
+    values = await asyncio.gather(*(
+        ttl_cache.get_or_load("key", counting_loader(calls)) for _ in range(3)
+    ))
+
+    assert values == [2, 2, 2]
+    assert len(calls) == 2
+
+
+async def test_failed_load_is_not_cached(clock):
+    ttl_cache = TTLCache(ttl=10, stale_ttl=10, max_entries=4)
+
+    async def fail() -> int:
+        raise RuntimeError("telegram")
+
+    with pytest.raises(RuntimeError):
+        await ttl_cache.get_or_load("key", fail)
+    assert await ttl_cache.get_or_load("key", counting_loader([])) == 1
+
+
+async def test_least_recently_used_entry_is_evicted(clock):
+    ttl_cache = TTLCache(ttl=10, stale_ttl=10, max_entries=2)
+    for key in ("a", "b"):
+        ttl_cache.put(key, key)
+    await ttl_cache.get_or_load("a", counting_loader([]))
+    ttl_cache.put("c", "c")
+
+    assert ttl_cache.snapshot()["evictions"] == 1
+    assert await ttl_cache.get_or_load("a", counting_loader([])) == "a"
+    assert await ttl_cache.get_or_load("b", counting_loader([])) == 1
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from statistics import mean, median
+
+import numpy as np
+import pytest
+
+from backend.application.compare_engine import CompareEngine
+from backend.application.content_getter import ContentGetter
+from tests.fakes import item_record
+
+pytestmark = pytest.mark.anyio
+
+VIEWS = {1: 10, 2: 40, 3: 20, 4: 40, 5: 90}
+
+
+def make_engine(views=VIEWS) -> CompareEngine:
+    return CompareEngine(
+        np.array(list(views)), {"views": np.array(list(views.values())), "zero": np.zeros(len(views))}
+    )
+
+
+def test_metrics_match_naive_computation():
+    result = make_engine().compare([2, 3, 5])
+
+    registry_mean = mean(VIEWS.values())
+    by_id = {item["id"]: item["metrics"]["views"] for item in result["items"]}
+    for item_id, metric in by_id.items():
+        value = VIEWS[item_id]
+        assert metric["value"] == value
+        assert metric["delta"] == pytest.approx(value - registry_mean)
+        assert metric["ratio"] == pytest.approx(value / registry_mean)
+        assert metric["percentile"] == pytest.approx(
+            100 * sum(other <= value for other in VIEWS.values()) / len(VIEWS)
+        )
+    assert [by_id[i]["rank"] for i in (2, 3, 5)] == [2, 3, 1]
+    assert result["baseline"]["views"] == {"mean": registry_mean, "median": median(VIEWS.values())}
+
+
+def test_missing_and_repeated_ids():
+    result = make_engine().compare([7, 1, 1, 5])
+
+    assert [item["id"] for item in result["items"]] == [1, 5]
+    assert result["missing_ids"] == [7]
+    assert result["registry_size"] == 5
+
+
+def test_zero_mean_gives_no_ratio():
+    metric = make_engine().compare([1])["items"][0]["metrics"]["zero"]
+
+    assert metric["ratio"] is None
+    assert metric["percentile"] == 100.0
+
+
+def test_empty_registry():
+    result = make_engine({}).compare([1])
+
+    assert result["items"] == []
+    assert result["missing_ids"] == [1]
+
+
+async def test_getter_compare_uses_first_item_for_repeated_id():
+    getter = ContentGetter([item_record(1), item_record(2), item_record(1, views=5)])
+
+    response = await getter.compare([1, 2])
+
+    first = response.items[0]
+    assert (first.item.title, first.metrics["views"].value) == ("Пост 1", 100)
+    assert response.registry_size == 3
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from backend.application.content_getter import ContentGetter
+from backend.domain.models import Platform
+from tests.fakes import item_record
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_lookup_by_id_and_platform():
+    getter = ContentGetter([
+        item_record(1), item_record(2, platform="vk"), item_record(1, title="Повтор"),
+    ])
+
+    assert (await getter.get_content_by_id(1)).title == "Пост 1"
+    assert await getter.get_one_vk_mock(1) is None
+    assert (await getter.get_one_vk_mock(2)).id == 2
+    assert [item.id for item in await getter.get_vk_mock()] == [2]
+    assert (await getter.get_summary_stats()).total_items == 3
+
+
+async def test_update_swaps_the_whole_snapshot():
+    getter = ContentGetter([item_record(1)])
+    old = getter.snapshot
+
+    getter.update([item_record(2), item_record(3)])
+
+    assert [item.id for item in old.items] == [1]
+    assert getter.snapshot.version == old.version + 1
+    assert getter.snapshot.revision != old.revision
+    assert (await getter.get_summary_stats()).total_views == 500
+
+
+async def test_empty_reload_keeps_the_current_snapshot():
+    getter = ContentGetter([item_record(1)])
+
+    async def load_nothing():
+        return []
+
+    assert not await getter.reload(load_nothing)
+    assert getter.snapshot.version == 1
+
+
+async def test_scheduled_reloads_coalesce():
+    getter = ContentGetter([item_record(1)])
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return [item_record(calls)]
+
+    for _ in range(5):
+        getter.schedule_reload(load)
+    await getter._reload_task
+
+    assert calls == 1
+    assert getter.snapshot.by_platform[Platform.TELEGRAM][0].id == 1
+    assert getter.snapshot.version == 2
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import base64
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import text
+
+from backend.domain.exceptions import InvalidFilterException
+from backend.domain.schemas import AnalyticsFilters
+from backend.domain.models import Content
+from backend.infra.content_query import SORT_COLUMNS, decode_cursor, resolve_date_range
+from tests.fakes import content_record
+
+pytestmark = pytest.mark.anyio
+
+
+async def read_all_pages(repository, filters: AnalyticsFilters) -> list[int]:
+    ids: list[int] = []
+    cursor = None
+    while True:
+        page = await repository.query(filters, cursor)
+        ids.extend(item.id for item in page.items)
+        if page.next_cursor is None:
+            return ids
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize(("sort_by", "sort_order"), [
+    ("published_at", "desc"),
+    ("likes", "desc"),
+    ("likes", "asc"),
+    ("engagement_rate", "desc"),
+])
+async def test_pages_cover_every_row_once(repository, sort_by, sort_order):
+    # Много одинаковых значений сортировки: порядок задает id
+    await repository.upsert_many(
+        content_record(i, likes=i % 3, published_at=datetime(2025, 1, 1 + i % 4, tzinfo=UTC))
+        for i in range(1, 24)
+    )
+    filters = AnalyticsFilters(sort_by=sort_by, sort_order=sort_order, limit=5)
+
+    ids = await read_all_pages(repository, filters)
+
+    contents = {content.id: content for content in await repository.list_all()}
+    key = {
+        "published_at": lambda c: c.published_at,
+        "likes": lambda c: c.likes,
+        "engagement_rate": lambda c: c.engagement_rate_percent,
+    }[sort_by]
+    expected = sorted(
+        contents.values(), key=lambda c: (key(c), c.id), reverse=sort_order == "desc"
+    )
+    assert ids == [content.id for content in expected]
+
+
+async def test_filters_narrow_the_query(repository):
+    await repository.upsert_many([
+        content_record(1, views=50),
+        content_record(2, views=500),
+        content_record(3, views=500, platform="vk"),
+    ])
+
+    page = await repository.query(AnalyticsFilters(platforms=["tg"], min_views=100))
+
+    assert [item.url for item in page.items] == ["https://t.me/channel/2"]
+
+
+def cursor_of(payload: str) -> str:
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def test_invalid_cursor_and_date_range_are_rejected():
+    with pytest.raises(InvalidFilterException):
+        decode_cursor("not-a-cursor", "published_at")
+    with pytest.raises(InvalidFilterException):
+        resolve_date_range(AnalyticsFilters(date_range="year"))
+
+
+@pytest.mark.parametrize(("sort_by", "payload"), [
+    ("published_at", "[5,1]"),
+    ("published_at", '["yesterday",1]'),
+    ("likes", '["5",1]'),
+    ("likes", "[true,1]"),
+    ("likes", "[1e30,1]"),
+    ("views", "[99999999999999999999,1]"),
+    ("sentiment", "[NaN,1]"),
+    ("sentiment", '[0.5,"1"]'),
+    ("sentiment", '{"a":1,"b":2}'),
+    ("sentiment", "[0.5]"),
+])
+def test_cursor_values_are_checked_against_the_sort_column(sort_by, payload):
+    with pytest.raises(InvalidFilterException):
+        decode_cursor(cursor_of(payload), sort_by)
+
+
+def test_valid_cursor_values_are_parsed():
+    assert decode_cursor(cursor_of('["2025-01-01T00:00:00+00:00",3]'), "published_at") == (
+        datetime(2025, 1, 1, tzinfo=UTC), 3
+    )
+    assert decode_cursor(cursor_of("[1,3]"), "sentiment") == (1.0, 3)
+
+
+async def test_forged_cursor_is_a_client_error(api, monkeypatch, repository):
+    monkeypatch.setattr(api.app.state, "content_repository", repository, raising=False)
+
+    response = api.post(
+        "/api/content/query", params={"cursor": cursor_of('[{"x":1},1]')}, json={}
+    )
+
+    assert response.status_code == 400
+
+
+def test_date_range_presets():
+    now = datetime(2025, 3, 15, 18, 30, tzinfo=UTC)
+
+    assert resolve_date_range(AnalyticsFilters(date_range="7d"), now) == (
+        datetime(2025, 3, 9, tzinfo=UTC), None
+    )
+    assert resolve_date_range(AnalyticsFilters(date_range="month"), now) == (
+        datetime(2025, 3, 1, tzinfo=UTC), None
+    )
+
+
+def test_every_sort_column_has_a_keyset_index():
+    indexed = {
+        tuple(column.name for column in index.columns)
+        for index in Content.__table__.indexes
+    }
+
+    for column in SORT_COLUMNS.values():
+        assert (column.key, "id") in indexed
+
+
+async def test_keyset_sort_reads_from_the_index(repository):
+    await repository.upsert_many([content_record(1), content_record(2)])
+
+    async with repository.session_factory() as session:
+        plan = await session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM content "
+            "WHERE (shares, id) < (5, 9) ORDER BY shares DESC, id DESC LIMIT 3"
+        ))
+        details = " ".join(row[-1] for row in plan)
+
+    assert "ix_content_shares_id" in details
+    assert "TEMP B-TREE" not in details
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+from sqlalchemy import select, text
+
+from backend.domain.models import Content, ContentTag
+from backend.infra.db import create_db_engine
+from backend.infra.di import _create_schema
+from tests.fakes import content_record
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_upsert_inserts_then_updates_by_url(repository):
+    assert await repository.upsert_many(content_record(i) for i in range(1, 6)) == 5
+    await repository.upsert_many([
+        content_record(1, title="Пост 1", views=999, tags_str="#news,#update"),
+    ])
+
+    contents = {content.url: content for content in await repository.list_all()}
+    assert len(contents) == 5
+    updated = contents["https://t.me/channel/1"]
+    assert updated.views == 999
+    assert updated.tags == ["#news", "#update"]
+    assert repository.version == 2
+
+
+async def test_repeated_url_in_one_batch_keeps_last_record(repository):
+    saved = await repository.upsert_many([
+        content_record(1, views=1), content_record(1, views=2), content_record(2),
+    ])
+
+    assert saved == 2
+    assert [content.views for content in await repository.list_all()] == [200, 2]
+
+
+async def test_missing_metrics_get_model_defaults(repository):
+    record = content_record(1)
+    del record["likes"], record["sentiment"]
+
+    await repository.upsert_many([record])
+
+    (content,) = await repository.list_all()
+    assert (content.likes, content.sentiment, content.shares) == (0, 0.0, 0)
+
+
+async def test_tags_are_normalized_into_content_tag(repository):
+    await repository.upsert_many([content_record(1, tags_str="#News, #AI")])
+    await repository.upsert_many([content_record(1, tags_str="#ai")])
+
+    async with repository.session_factory() as session:
+        tags = list(await session.scalars(select(ContentTag.tag)))
+    assert tags == ["#ai"]
+
+
+async def test_old_database_moves_unique_constraint_to_url(tmp_path):
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            CREATE TABLE content (
+                id INTEGER PRIMARY KEY, title VARCHAR NOT NULL UNIQUE,
+                url VARCHAR NOT NULL, content_type VARCHAR(7) NOT NULL,
+                platform VARCHAR(8) NOT NULL, published_at DATETIME NOT NULL,
+                likes INTEGER NOT NULL, shares INTEGER NOT NULL,
+                comments INTEGER NOT NULL, saves INTEGER NOT NULL,
+                views INTEGER NOT NULL, unique_views INTEGER NOT NULL,
+                avg_watch_time_sec FLOAT NOT NULL,
+                completion_rate_percent FLOAT NOT NULL, sentiment FLOAT NOT NULL,
+                click_through_rate_percent FLOAT NOT NULL,
+                engagement_rate_percent FLOAT NOT NULL,
+                created_at DATETIME NOT NULL, tags_str VARCHAR
+            );
+        """)
+        connection.executemany(
+            "INSERT INTO content VALUES (?, ?, ?, 'POST', 'TELEGRAM', "
+            "'2025-01-01 00:00:00', 0, 0, 0, 0, ?, 0, 0, 0, 0, 0, 0, "
+            "'2025-01-01 00:00:00', '#news')",
+            [(1, "a", "u1", 10), (2, "b", "u1", 20), (3, "c", "u3", 30)],
+        )
+
+    engine = create_db_engine(f"sqlite+aiosqlite:///{path}")
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(_create_schema)
+            # Повторный запуск миграцию не повторяет
+            await connection.run_sync(_create_schema)
+        async with engine.connect() as connection:
+            rows = (await connection.execute(
+                select(Content.id, Content.url, Content.views).order_by(Content.id)
+            )).all()
+            schema = await connection.scalar(
+                text("SELECT sql FROM sqlite_master WHERE name = 'content'")
+            )
+    finally:
+        await engine.dispose()
+
+    assert rows == [(2, "u1", 20), (3, "u3", 30)]
+    assert "UNIQUE (url)" in schema
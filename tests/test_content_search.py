@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.infra import content_search
+from tests.fakes import content_record
+
+pytestmark = pytest.mark.anyio
+
+
+def test_expression_skips_stopwords_and_prefixes_last_word():
+    assert content_search.search_expression("и в") is None
+    expression = content_search.search_expression("новые альбомы и релиз")
+
+    assert " AND " in expression
+    assert expression.endswith('"релиз"*')
+    assert '"и"' not in expression
+
+
+async def test_title_match_ranks_above_text_match(repository):
+    await repository.upsert_many([
+        content_record(1, title="Обзор недели", text="Вышел новый альбом группы"),
+        content_record(2, title="Новый альбом", text="Подробности позже"),
+        content_record(3, title="Погода", text="Без осадков"),
+    ])
+
+    items = await repository.search("альбомы")
+
+    assert [item.url for item in items] == [
+        "https://t.me/channel/2", "https://t.me/channel/1",
+    ]
+
+
+async def test_word_forms_and_unfinished_last_word_are_found(repository):
+    await repository.upsert_many([
+        content_record(1, title="Релизы альбома", text=None),
+    ])
+
+    assert len(await repository.search("альбом")) == 1
+    assert len(await repository.search("рели")) == 1
+    assert await repository.search("концерт") == []
+
+
+async def test_updated_text_replaces_indexed_document(repository):
+    await repository.upsert_many([content_record(1, title="Концерт", text=None)])
+    await repository.upsert_many([content_record(1, title="Выставка", text=None)])
+
+    assert await repository.search("концерт") == []
+    assert len(await repository.search("выставка")) == 1
+
+
+@pytest.mark.parametrize(("max_ranked", "expected"), [(2, 2), (0, 5)])
+async def test_ranking_window_keeps_newest_matches(repository, max_ranked, expected):
+    await repository.upsert_many(
+        content_record(i, title=f"Новости {i}", text=None) for i in range(1, 6)
+    )
+    repository.search_max_ranked = max_ranked
+
+    items = await repository.search("новости", limit=10)
+
+    assert len(items) == expected
+    newest = {item.url for item in items}
+    assert "https://t.me/channel/5" in newest
+
+
+async def test_text_is_returned_by_search_only(repository):
+    await repository.upsert_many([
+        content_record(1, title="Новый альбом", text="Полный текст поста"),
+    ])
+
+    [found] = await repository.search("альбом")
+    [listed] = await repository.list_items()
+
+    assert found.text == "Полный текст поста"
+    assert "text" not in listed.model_dump()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.api.http_cache import HttpCacheMiddleware
+from backend.application.content_getter import ContentGetter
+from tests.fakes import item_record
+
+
+@pytest.fixture
+def state() -> dict:
+    return {"version": "1.abc", "calls": 0}
+
+
+@pytest.fixture
+def client(state) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        state["calls"] += 1
+        return {"id": item_id, "payload": "x" * 2000}
+
+    @app.get("/other")
+    def other():
+        return {}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            iter([b"x" * 2000 + b"\n"]), media_type="application/x-ndjson"
+        )
+
+    app.add_middleware(
+        HttpCacheMiddleware,
+        routes={"/items/{item_id}": "no-cache"},
+        version=lambda: state["version"],
+        modified_at=lambda: datetime(2025, 1, 1, 12, tzinfo=UTC),
+        gzip_min_size=1000,
+    )
+    return TestClient(app)
+
+
+def test_matching_etag_skips_the_endpoint(client, state):
+    response = client.get("/items/1", headers={"Accept-Encoding": "identity"})
+    etag = response.headers["ETag"]
+
+    repeated = client.get(
+        "/items/1", headers={"If-None-Match": f"W/{etag}", "Accept-Encoding": "identity"}
+    )
+
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert repeated.status_code == 304
+    assert state["calls"] == 1
+    assert client.get("/items/2", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_gzip_response_gets_its_own_etag(client, state):
+    plain = client.get("/items/1", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/items/1", headers={"Accept-Encoding": "gzip"})
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    repeated = client.get("/items/1", headers={"If-None-Match": compressed.headers["ETag"]})
+    assert repeated.status_code == 304
+    assert repeated.headers["ETag"] == compressed.headers["ETag"]
+
+
+def test_new_version_invalidates_etag(client, state):
+    etag = client.get("/items/1").headers["ETag"]
+    state["version"] = "2.def"
+
+    assert client.get("/items/1", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_modified_since(client):
+    not_modified = client.get(
+        "/items/1", headers={"If-Modified-Since": "Wed, 01 Jan 2025 12:00:00 GMT"}
+    )
+    stale = client.get(
+        "/items/1", headers={"If-Modified-Since": "Wed, 01 Jan 2025 11:59:59 GMT"}
+    )
+
+    assert not_modified.status_code == 304
+    assert stale.status_code == 200
+
+
+def test_other_routes_are_untouched(client):
+    assert "ETag" not in client.get("/other").headers
+
+
+def test_streams_outside_cached_routes_are_not_compressed(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.content == b"x" * 2000 + b"\n"
+
+
+def test_snapshot_revision_differs_between_builds_of_same_data():
+    records = [item_record(1)]
+
+    first = ContentGetter(records).snapshot
+    second = ContentGetter(records).snapshot
+
+    assert first.version == second.version
+    assert first.revision != second.revision
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from backend.api import router
+from backend.api.live_hub import RESYNC, LiveHub, LiveMessage, TooManySubscribersError
+
+
+def change(post_id: int, views: int, delta: int) -> dict:
+    return {"id": post_id, "metrics": {"views": views}, "delta": {"views": delta}}
+
+
+@pytest.fixture
+def hub() -> LiveHub:
+    return LiveHub(max_subscribers=2, queue_size=2)
+
+
+@pytest.mark.anyio
+async def test_pending_messages_coalesce_by_key(hub):
+    subscription = hub.open()
+    for views in (1, 2, 3):
+        hub.publish("summary", "summary", {"views": views})
+    hub.publish("posts", "posts", [])
+
+    batch = await subscription.next_batch()
+
+    assert [(message.event, message.data) for message in batch] == [
+        ("summary", {"views": 3}), ("posts", []),
+    ]
+    assert hub.stats.coalesced == 2
+    assert await subscription.next_batch(0.01) == []
+
+
+@pytest.mark.anyio
+async def test_overflow_replaces_queue_with_resync(hub):
+    subscription = hub.open()
+    for key in ("a", "b", "c"):
+        hub.publish("event", key, {})
+
+    assert await subscription.next_batch() == [RESYNC]
+    assert hub.stats.overflows == 1
+
+
+@pytest.mark.anyio
+async def test_retained_messages_reach_new_subscribers(hub):
+    hub.publish("summary", "summary", {"views": 1}, retain=True)
+    hub.publish("posts", "posts", [])
+
+    batch = await hub.open().next_batch()
+
+    assert [message.event for message in batch] == ["summary"]
+
+
+def test_closed_subscription_frees_its_slot(hub):
+    first = hub.open()
+    hub.open()
+    with pytest.raises(TooManySubscribersError):
+        hub.open()
+
+    first.close()
+    first.close()
+
+    assert len(hub) == 1
+    assert hub.open() is not None
+    assert hub.stats.rejected == 1
+
+
+def test_message_is_serialized_once_for_both_transports():
+    message = LiveMessage("summary", "summary", {"views": 1})
+
+    assert message.sse() == b'event: summary\ndata: {"views":1}\n\n'
+    assert message.ws() == b'{"event":"summary","data":{"views":1}}'
+    assert message.data_json is message.data_json
+
+
+def test_post_changes_merge_deltas_and_keep_latest_metrics():
+    previous = LiveMessage("posts", "posts", [change(1, 10, 10), change(2, 5, 5)])
+    message = LiveMessage("posts", "posts", [change(1, 15, 5)])
+
+    merged = router._merge_post_changes(previous, message, limit=2)
+
+    assert merged.data == [change(1, 15, 15), change(2, 5, 5)]
+    assert router._merge_post_changes(
+        previous, LiveMessage("posts", "posts", [change(3, 1, 1)]), limit=2
+    ) is RESYNC
+
+
+def test_websocket_gets_retained_summary_and_respects_limit(api, monkeypatch):
+    hub = LiveHub(max_subscribers=1, queue_size=4)
+    monkeypatch.setattr(router, "live_hub", hub)
+    monkeypatch.setattr(
+        router, "config", router.config.model_copy(update={"live_heartbeat_sec": 0.05})
+    )
+    hub.publish("summary", "summary", {"total_items": 3}, retain=True)
+
+    with api.websocket_connect("/api/live/ws") as websocket:
+        assert websocket.receive_json() == {"event": "summary", "data": {"total_items": 3}}
+        assert websocket.receive_json()["event"] == "ping"
+        with api.websocket_connect("/api/live/ws") as rejected, pytest.raises(
+            WebSocketDisconnect
+        ) as error:
+            rejected.receive_json()
+
+    assert error.value.code == 1013
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from functools import partial
+
+import pytest
+
+from backend.api import router
+from backend.api.response_cache import ResponseCache
+from backend.application.content_getter import ContentGetter
+from tests.fakes import content_record
+
+pytestmark = pytest.mark.anyio
+
+
+class Builder:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self, body: bytes = b"[1]"):
+        self.calls += 1
+        return body, {"X-Build": str(self.calls)}
+
+
+async def test_hits_reuse_the_serialized_body():
+    cache = ResponseCache(max_bytes=1024)
+    build = Builder()
+
+    first = await cache.respond("content", 1, ("a",), build)
+    second = await cache.respond("content", 1, ("a",), build)
+
+    assert build.calls == 1
+    assert second.body == first.body == b"[1]"
+    assert second.headers["X-Build"] == "1"
+    assert cache.snapshot()["hit_ratio"] == 0.5
+
+
+async def test_new_version_drops_only_its_namespace():
+    cache = ResponseCache(max_bytes=1024)
+    build = Builder()
+    await cache.respond("content", 1, (), build)
+    await cache.respond("summary", 1, (), build)
+
+    await cache.respond("content", 2, (), build)
+    await cache.respond("summary", 1, (), build)
+
+    assert build.calls == 3
+    assert cache.stats.invalidations == 1
+
+
+async def test_size_limit_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=8)
+    build = Builder()
+    for params in ("a", "b", "a", "c"):
+        await cache.respond("content", 1, params, partial(build, b"1234"))
+
+    await cache.respond("content", 1, "a", partial(build, b"1234"))
+    await cache.respond("content", 1, "huge", partial(build, b"x" * 9))
+
+    assert build.calls == 4
+    assert cache.stats.evictions == 1
+    assert cache.snapshot()["bytes"] == 8
+
+
+async def test_version_change_during_build_is_not_cached():
+    cache = ResponseCache(max_bytes=1024)
+
+    async def build_while_data_changes():
+        await cache.respond("content", 2, (), Builder())
+        return b"[old]", None
+
+    await cache.respond("content", 1, "stale", build_while_data_changes)
+
+    assert ("content", "stale") not in cache._entries
+
+
+async def test_snapshot_is_rebuilt_after_ingest(repository, monkeypatch):
+    getter = ContentGetter([])
+    monkeypatch.setattr(router, "service", getter)
+    repository.listeners.append(partial(router.reload_content_snapshot, repository))
+
+    await repository.upsert_many([content_record(1), content_record(2)])
+    await getter._reload_task
+
+    assert getter.snapshot.version == 2
+    assert [item.url for item in await getter.get_all_content()] == [
+        "https://t.me/channel/2", "https://t.me/channel/1",
+    ]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.domain.exceptions import InvalidFilterException
+from backend.domain.models import ContentType, Platform
+from backend.infra.rollup_cube import QuantileSketch, RollupCube
+from tests.fakes import content_record
+
+# 2025-01-06 — понедельник
+MONDAY = datetime(2025, 1, 6, tzinfo=UTC)
+
+
+def values(views: float, engagement: float = 1.0) -> dict[str, float]:
+    return {
+        "views": views, "likes": 1, "comments": 0,
+        "engagement_rate_percent": engagement, "sentiment": 0.5,
+    }
+
+
+def assert_same_summary(actual: dict, expected: dict) -> None:
+    # Скетчи — целые счетчики и совпадают точно, суммы — с погрешностью float
+    assert actual.pop("quantiles") == expected.pop("quantiles")
+    assert actual == pytest.approx(expected)
+
+
+def test_updates_retract_previous_contribution():
+    generator = random.Random(3)
+    incremental = RollupCube()
+    final = {}
+    for _ in range(300):
+        post_id = generator.randrange(40)
+        post = (
+            generator.choice(list(Platform)),
+            generator.choice(list(ContentType)),
+            MONDAY + timedelta(hours=generator.randrange(24 * 14)),
+            values(generator.randrange(1, 10_000), generator.random() * 10),
+        )
+        incremental.update(post_id, *post)
+        final[post_id] = post
+    for post_id in range(0, 40, 7):
+        incremental.remove(post_id)
+        final.pop(post_id, None)
+
+    rebuilt = RollupCube()
+    for post_id, post in final.items():
+        rebuilt.update(post_id, *post)
+
+    assert_same_summary(incremental.summary(), rebuilt.summary())
+    assert incremental.heatmap() == pytest.approx(rebuilt.heatmap())
+    assert len(incremental) == len(rebuilt)
+    assert incremental.summary()["total_items"] == len(final)
+
+
+def test_unchanged_post_is_not_reported():
+    cube = RollupCube()
+
+    assert cube.update(1, Platform.VK, ContentType.POST, MONDAY, values(10))
+    assert not cube.update(1, Platform.VK, ContentType.POST, MONDAY, values(10))
+    assert cube.update(1, Platform.VK, ContentType.POST, MONDAY, values(11))
+    assert cube.metrics(1)["views"] == 11
+
+
+def test_quantiles_are_within_relative_accuracy():
+    generator = np.random.default_rng(5)
+    samples = generator.lognormal(8, 2, size=5000)
+    sketch = QuantileSketch()
+    for value in samples:
+        sketch.add(QuantileSketch.bucket(value))
+    sketch.add(QuantileSketch.bucket(0.0))
+
+    for q in (0.5, 0.9, 0.99):
+        exact = np.quantile(np.append(samples, 0.0), q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=QuantileSketch.accuracy)
+
+
+def test_filters_date_range_and_heatmap():
+    cube = RollupCube()
+    cube.update(1, Platform.VK, ContentType.POST, MONDAY + timedelta(hours=9), values(100, 2))
+    cube.update(2, Platform.VK, ContentType.POST, MONDAY + timedelta(hours=9, days=7), values(300, 4))
+    cube.update(3, Platform.YOUTUBE, ContentType.VIDEO, MONDAY + timedelta(days=1), values(50))
+
+    week = cube.summary(start_date=MONDAY, end_date=MONDAY + timedelta(days=6))
+    vk = cube.summary(platform=Platform.VK)
+    heatmap = cube.heatmap(platform=Platform.VK)
+
+    assert (week["total_items"], week["total_views"]) == (2, 150)
+    assert (vk["total_items"], vk["avg_engagement"]) == (2, 3.0)
+    assert heatmap["posts"][0][9] == 2
+    assert heatmap["mean"][0][9] == 3.0
+    assert cube.heatmap("views")["posts"][1][0] == 1
+    with pytest.raises(InvalidFilterException):
+        cube.heatmap("title")
+
+
+@pytest.mark.anyio
+async def test_repository_reports_changes_and_reloads_same_cube(repository):
+    changes = []
+    repository.listeners.append(changes.extend)
+
+    await repository.upsert_many([content_record(1), content_record(2)])
+    await repository.upsert_many([content_record(1, views=555), content_record(2)])
+    incremental = repository.rollups.summary()
+    await repository.load_rollups()
+
+    assert [change["id"] for change in changes] == [1, 2, 1]
+    assert incremental["total_views"] == 755
+    assert_same_summary(repository.rollups.summary(), incremental)
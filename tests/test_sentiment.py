@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from backend.domain.sentiment import (
+    NEGATIVE_WORDS,
+    POSITIVE_WORDS,
+    LexiconSentimentEngine,
+    default_engine,
+)
+
+TEXTS = (
+    "",
+    "Обычный пост без оценок",
+    "Спасибо, всё отлично!",
+    "Кошмарный релиз, полное разочарование",
+    "Суперкомпьютер работает хорошо, но интерфейс плохо продуман",
+    "ОТЛИЧНО ПРЕКРАСНО СУПЕР СПАСИБО ХОРОШО отличный",
+    "ужасно ужасно ужасно",
+    "плохо ужасно кошмар разочарован",
+)
+
+
+def legacy_score(text, positive=POSITIVE_WORDS, negative=NEGATIVE_WORDS) -> float:
+    # Прежняя TelegramStatsCollector.analyze_sentiment
+    score = 0.5
+    for word in positive:
+        if word in text.lower():
+            score += 0.1
+    for word in negative:
+        if word in text.lower():
+            score -= 0.1
+    return max(0.0, min(1.0, score))
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_scores_match_legacy_matcher(text):
+    assert default_engine.score(text) == pytest.approx(legacy_score(text))
+
+
+def test_batch_matches_single_scores():
+    assert default_engine.score_batch(TEXTS) == [default_engine.score(t) for t in TEXTS]
+
+
+def test_custom_lexicon_and_clamping():
+    engine = LexiconSentimentEngine(positive=["Рост"], negative=[], step=0.6)
+
+    assert engine.score("рост продаж") == pytest.approx(1.0)
+    assert engine.score("падение") == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("text", [
+    "суперский", "супер", "рсупер", "абв", "бвг", "абвг", "xабвгx", "ааа",
+])
+def test_nested_and_overlapping_words_count_like_substring_search(text):
+    positive, negative = ("супер", "суперский", "бвг", "аа"), ("абв", "рсу")
+    engine = LexiconSentimentEngine(positive=positive, negative=negative)
+
+    assert engine.score(text) == pytest.approx(legacy_score(text, positive, negative))
+    assert engine.score_batch([text]) == [engine.score(text)]
+
+
+def test_batch_keeps_text_boundaries():
+    # «İ» при lower() превращается в два символа и сдвигает смещения
+    texts = ["İİ кош", "мар", "", "İ кошмар", "хоро", "шо"]
+
+    assert default_engine.score_batch(texts) == [legacy_score(text) for text in texts]
+    assert LexiconSentimentEngine(positive=[], negative=[]).score_batch(texts) == [0.5] * 6
+
+
+def test_random_lexicon_matches_substring_search():
+    generator = random.Random(11)
+    words = list(dict.fromkeys(
+        "".join(generator.choices("абв", k=generator.randint(1, 4))) for _ in range(20)
+    ))
+    positive, negative = words[::2], words[1::2]
+    engine = LexiconSentimentEngine(positive=positive, negative=negative)
+    texts = ["".join(generator.choices("абв ", k=30)) for _ in range(300)]
+
+    assert engine.score_batch(texts) == pytest.approx(
+        [legacy_score(text, positive, negative) for text in texts]
+    )
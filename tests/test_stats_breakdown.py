@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import random
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from statistics import quantiles
+
+import numpy as np
+import pytest
+
+from backend.api import router
+from backend.domain.exceptions import InvalidFilterException
+from backend.infra.stats_breakdown import BREAKDOWN_METRICS, ContentColumns, breakdown
+from tests.fakes import content_record
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def dataset():
+    generator = random.Random(7)
+    rows = []
+    post_tags = []
+    for content_id in range(1, 201):
+        published_at = START + timedelta(hours=generator.randrange(24 * 20))
+        rows.append((
+            content_id,
+            generator.choice(["vk", "telegram", "youtube"]),
+            generator.choice(["post", "video"]),
+            published_at,
+            *(float(generator.randrange(1000)) for _ in BREAKDOWN_METRICS),
+        ))
+        post_tags.extend(
+            (content_id, tag) for tag in generator.sample(["#a", "#b", "#c"], 2)
+        )
+    # Тег поста, которого нет в выборке, пропускается
+    post_tags.append((999, "#a"))
+    return rows, post_tags
+
+
+def naive(rows, post_tags, key):
+    tags = defaultdict(list)
+    for content_id, tag in post_tags:
+        tags[content_id].append(tag)
+    groups = defaultdict(list)
+    for row in rows:
+        labels = {
+            "platform": [row[1]],
+            "day": [row[3].date().isoformat()],
+            "tag": tags[row[0]],
+        }[key]
+        for label in labels:
+            groups[label].append((row[4], row[0]))
+    return groups
+
+
+@pytest.mark.parametrize("key", ["platform", "day", "tag"])
+def test_groups_match_naive_grouping(dataset, key):
+    rows, post_tags = dataset
+
+    result = breakdown(ContentColumns.build(rows, post_tags), [key], top=2, limit=1000)
+
+    expected = naive(rows, post_tags, key)
+    assert result["total_groups"] == len(expected)
+    sums = [group["sum"] for group in result["groups"]]
+    assert sums == sorted(sums, reverse=True)
+    for group in result["groups"]:
+        values = expected[group["keys"][key]]
+        views = [view for view, _ in values]
+        assert group["count"] == len(values)
+        assert group["sum"] == sum(views)
+        assert group["median"] == pytest.approx(float(np.median(views)))
+        assert group["p90"] == pytest.approx(quantiles(views, n=10, method="inclusive")[-1])
+        view_by_id = {content_id: view for view, content_id in values}
+        assert [view_by_id[content_id] for content_id in group["top_ids"]] == (
+            sorted(views, reverse=True)[:2]
+        )
+
+
+def test_compound_keys_and_date_range(dataset):
+    rows, post_tags = dataset
+    columns = ContentColumns.build(rows, post_tags)
+    start, end = START + timedelta(days=3), START + timedelta(days=5)
+
+    result = breakdown(
+        columns, ["platform", "week"], metric="likes", start_date=start, end_date=end
+    )
+
+    in_range = [row for row in rows if start.date() <= row[3].date() <= end.date()]
+    assert sum(group["count"] for group in result["groups"]) == len(in_range)
+    assert {group["keys"]["week"] for group in result["groups"]} <= {
+        "2024-12-30", "2025-01-06",
+    }
+    assert result["metric"] == "likes"
+
+
+@pytest.mark.parametrize("options", [
+    {"by": []}, {"by": ["author"]}, {"by": ["day"], "metric": "title"},
+])
+def test_invalid_keys_and_metrics(options):
+    columns = ContentColumns.build([], [])
+
+    with pytest.raises(InvalidFilterException):
+        breakdown(columns, **options)
+
+
+def test_empty_columns():
+    assert breakdown(ContentColumns.build([], []), ["tag"])["groups"] == []
+
+
+@pytest.mark.anyio
+async def test_repository_columns_follow_data_version(repository):
+    await repository.upsert_many([content_record(1, platform="vk"), content_record(2)])
+    first = await repository.breakdown(["platform"])
+
+    await repository.upsert_many([content_record(3)])
+    second = await repository.breakdown(["platform"])
+
+    assert {group["keys"]["platform"]: group["count"] for group in first["groups"]} == {
+        "vk": 1, "telegram": 1,
+    }
+    assert second["groups"][0] == {
+        "keys": {"platform": "telegram"}, "count": 2, "sum": 500.0, "mean": 250.0,
+        "median": 250.0, "p90": 290.0, "top_ids": [3, 2],
+    }
+
+
+async def test_endpoint_strips_group_keys(api, repository, monkeypatch):
+    await repository.upsert_many([content_record(1, platform="vk"), content_record(2)])
+    monkeypatch.setattr(api.app.state, "content_repository", repository, raising=False)
+    router.response_cache.invalidate()
+
+    response = api.get("/api/stats/breakdown", params={"by": "platform, week,"})
+
+    assert response.status_code == 200
+    assert set(response.json()["groups"][0]["keys"]) == {"platform", "week"}
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.domain.schemas import AnalyticsFilters
+from backend.infra import content_repository
+from backend.infra.tag_index import TagIndex
+from tests.fakes import content_record
+
+
+@pytest.fixture
+def index() -> TagIndex:
+    index = TagIndex()
+    index.update(1, ["#a", "#b"], engagement=2.0)
+    index.update(2, ["#a"], engagement=4.0)
+    index.update(3, ["#b", "#c"], engagement=6.0)
+    return index
+
+
+def test_match_and_or(index):
+    assert index.match(["#a", "#b"], require_all=True).tolist() == [1]
+    assert index.match(["#a", "#c"]).tolist() == [1, 2, 3]
+    assert index.match(["#a", "#unknown"], require_all=True).tolist() == []
+    assert index.match([]).tolist() == []
+
+
+def test_update_retracts_old_tags_and_engagement(index):
+    index.update(1, ["#c"], engagement=10.0)
+    index.remove(2)
+
+    assert index.post_ids("#a").tolist() == []
+    assert index.post_count("#c") == 2
+    assert index.top_tags(by="engagement") == [
+        {"tag": "#c", "posts": 2, "avg_engagement": 8.0},
+        {"tag": "#b", "posts": 1, "avg_engagement": 6.0},
+    ]
+    assert len(index) == 2
+
+
+def test_co_occurrence(index):
+    assert index.co_occurrence("#b") == [
+        {"tag": "#a", "posts": 1}, {"tag": "#c", "posts": 1},
+    ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("require_all", [False, True])
+async def test_index_and_sql_tag_filters_agree(repository, monkeypatch, require_all):
+    await repository.upsert_many(
+        content_record(i, tags_str=",".join(
+            tag for tag, step in (("#a", 2), ("#b", 3)) if i % step == 0
+        ))
+        for i in range(1, 31)
+    )
+    await repository.load_tag_index()
+    filters = AnalyticsFilters(tags=["#a", "#b"], require_all_tags=require_all, limit=100)
+
+    from_index = [item.id for item in (await repository.query(filters)).items]
+    monkeypatch.setattr(content_repository, "TAG_INDEX_MAX_IDS", 1)
+    from_sql = [item.id for item in (await repository.query(filters)).items]
+
+    assert from_index == from_sql
+    assert len(from_index) == (5 if require_all else 20)
+
+
+@pytest.mark.anyio
+async def test_unknown_tag_returns_empty_page(repository):
+    await repository.upsert_many([content_record(1)])
+    await repository.load_tag_index()
+
+    page = await repository.query(AnalyticsFilters(tags=["#missing"]))
+
+    assert page.items == []
+    assert page.next_cursor is None
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from telethon.errors import FloodWaitError
+
+from backend.infra.api_wrappers.tg_limiter import Priority, TelegramRateLimiter, priority
+
+pytestmark = pytest.mark.anyio
+
+
+def flood_wait(seconds: int) -> FloodWaitError:
+    return FloodWaitError(request=None, capture=seconds)
+
+
+async def test_interactive_requests_go_before_background():
+    limiter = TelegramRateLimiter(rate=200, burst=1, max_flood_wait=1)
+    await limiter.acquire()
+    order: list[str] = []
+
+    async def request(name: str, value: Priority) -> None:
+        await limiter.acquire(priority=value)
+        order.append(name)
+
+    await asyncio.gather(
+        request("background", Priority.BACKGROUND),
+        request("interactive", Priority.INTERACTIVE),
+    )
+
+    assert order == ["interactive", "background"]
+
+
+async def test_priority_context_applies_to_calls():
+    limiter = TelegramRateLimiter(rate=1000, burst=10, max_flood_wait=1)
+
+    async def rpc() -> str:
+        return "ok"
+
+    with priority(Priority.BACKGROUND):
+        assert await limiter.call(rpc) == "ok"
+
+    granted = limiter.metrics()["priorities"]
+    assert granted["background"]["granted"] == 1
+    assert granted["interactive"]["granted"] == 0
+
+
+async def test_call_retries_after_allowed_flood_wait():
+    limiter = TelegramRateLimiter(rate=1000, burst=10, max_flood_wait=1)
+    attempts = 0
+
+    async def rpc() -> int:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise flood_wait(0)
+        return attempts
+
+    assert await limiter.call(rpc) == 2
+    assert limiter.metrics()["flood_waits"] == 1
+    # После FloodWait скорость снижается вдвое и растет на успешных запросах
+    assert limiter.rate == pytest.approx(1000 / 2 + 1000 * 0.05)
+
+
+async def test_call_raises_flood_wait_above_limit():
+    limiter = TelegramRateLimiter(rate=1000, burst=10, max_flood_wait=1)
+
+    async def rpc() -> None:
+        raise flood_wait(30)
+
+    with pytest.raises(FloodWaitError):
+        await limiter.call(rpc)
+    assert limiter.metrics()["flood_wait_remaining"] > 25
+
+
+async def test_cost_is_capped_by_burst():
+    limiter = TelegramRateLimiter(rate=1, burst=2, max_flood_wait=1)
+
+    await asyncio.wait_for(limiter.acquire(cost=50), timeout=1)
+
+    assert limiter.metrics()["tokens"] < 1
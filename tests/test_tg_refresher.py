@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from backend.application.tg_refresher import ChannelRefresher
+
+pytestmark = pytest.mark.anyio
+
+
+def make_refresher(collector, **kwargs) -> ChannelRefresher:
+    return ChannelRefresher(
+        collector,
+        ["channel", "missing"],
+        limit=5,
+        interval=60,
+        jitter=0,
+        max_backoff=600,
+        **kwargs,
+    )
+
+
+async def test_refreshed_records_are_served_until_max_age(collector):
+    refresher = make_refresher(collector, max_age=120)
+    assert refresher.get("channel") is None
+
+    assert await refresher.refresh("channel")
+    assert [record["tg_id"] for record in refresher.get("channel")] == [20, 19, 18, 17, 16]
+
+    saved_at, records = refresher._snapshots["channel"]
+    refresher._snapshots["channel"] = (saved_at - timedelta(seconds=121), records)
+    assert refresher.get("channel") is None
+
+
+async def test_snapshot_is_restored_from_state_with_its_age(collector):
+    await make_refresher(collector).refresh("channel")
+
+    assert len(make_refresher(collector, max_age=120).get("channel")) == 5
+
+    state = collector.state_store._load_all()
+    state["channel"]["saved_at"] = (datetime.now(UTC) - timedelta(hours=1)).isoformat()
+    assert make_refresher(collector, max_age=120).get("channel") is None
+
+
+async def test_failures_back_off_exponentially(collector, monkeypatch):
+    refresher = make_refresher(collector)
+    monkeypatch.setattr("backend.application.tg_refresher.monotonic", lambda: 0.0)
+
+    for expected in (60, 120, 240, 480, 600):
+        assert not await refresher.refresh("missing")
+        assert refresher.status["missing"].next_run_at == expected
+
+    status = refresher.status["missing"]
+    assert (status.failures, status.consecutive_failures) == (5, 5)
+    assert "missing" in status.last_error
+
+
+async def test_overlapping_refresh_is_skipped(collector):
+    refresher = make_refresher(collector)
+
+    results = await asyncio.gather(refresher.refresh("channel"), refresher.refresh("channel"))
+
+    assert sorted(results) == [False, True]
+    assert refresher.status["channel"].skipped_overlaps == 1
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from backend.domain.models import ContentType, Platform
+from backend.infra.api_wrappers.tg_state import TelegramStateStore
+
+pytestmark = pytest.mark.anyio
+
+
+def record(tg_id: int) -> dict:
+    return {
+        "tg_id": tg_id,
+        "published_at": datetime(2025, 1, 1, tzinfo=UTC),
+        "content_type": ContentType.POST,
+        "platform": Platform.TELEGRAM,
+    }
+
+
+async def test_saved_state_is_read_back_by_a_new_store(tmp_path):
+    path = tmp_path / "state.json"
+    await TelegramStateStore(path).save("channel", [record(3), record(7)])
+
+    store = TelegramStateStore(path)
+
+    assert store.get_max_id("channel") == 7
+    assert store.get_records("channel") == [record(3), record(7)]
+    assert not path.with_suffix(".json.tmp").exists()
+
+
+async def test_concurrent_saves_keep_every_channel(tmp_path):
+    path = tmp_path / "state.json"
+    store = TelegramStateStore(path)
+
+    await asyncio.gather(*(store.save(f"c{i}", [record(i)]) for i in range(1, 6)))
+
+    assert {
+        channel: TelegramStateStore(path).get_max_id(channel)
+        for channel in ("c1", "c2", "c3", "c4", "c5")
+    } == {"c1": 1, "c2": 2, "c3": 3, "c4": 4, "c5": 5}
+
+
+async def test_file_is_written_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    write_text = Path.write_text
+
+    def tracking_write_text(self, *args, **kwargs):
+        threads.append(threading.current_thread())
+        return write_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "write_text", tracking_write_text)
+    store = TelegramStateStore(tmp_path / "state.json")
+    await store.save("channel", [record(1)])
+    await store.reset("channel")
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+async def test_failed_reset_leaves_the_previous_file(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    store = TelegramStateStore(path)
+    await store.save("channel", [record(1)])
+    saved = path.read_text(encoding="utf-8")
+
+    def crash(self, target):
+        raise OSError
+
+    monkeypatch.setattr(Path, "replace", crash)
+    with pytest.raises(OSError):
+        await store.reset("channel")
+
+    assert path.read_text(encoding="utf-8") == saved
+    assert TelegramStateStore(path).get_max_id("channel") == 1
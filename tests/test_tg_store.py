@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+
+from backend.domain.models import ContentType, Platform
+from backend.infra.api_wrappers.tg_store import FIELD_ORDER, TelegramRecordStore
+
+
+def make_record(index: int, **values: object) -> dict:
+    record = dict.fromkeys(FIELD_ORDER, 0)
+    record.update({
+        "id": index,
+        "tg_id": 100 + index,
+        "title": f"Пост {index}",
+        "text": "текст",
+        "url": f"https://t.me/channel/{100 + index}",
+        "content_type": ContentType.ARTICLE,
+        "platform": Platform.TELEGRAM,
+        "published_at": datetime(2025, 1, index, tzinfo=UTC),
+        "likes": index,
+        "comments": index % 2,
+        "views": 10 * index,
+        "tags_str": "#tag",
+        "sentiment": 0.5,
+        **values,
+    })
+    return record
+
+
+def test_rows_round_trip_with_extra_keys():
+    records = [make_record(1), make_record(2, comment_texts=["первый"])]
+
+    view = TelegramRecordStore(records).view
+
+    assert list(view) == records
+    assert list(view[0]) == list(FIELD_ORDER)
+    assert view[-1]["comment_texts"] == ["первый"]
+    assert view[1:] == records[1:]
+    with pytest.raises(IndexError):
+        view[2]
+
+
+def test_summary_matches_records():
+    store = TelegramRecordStore(make_record(i) for i in range(1, 6))
+
+    assert store.summary() == {
+        "total_posts": 5,
+        "total_comments": 3,
+        "total_views": 150,
+        "total_likes": 15,
+        "posts_with_comments": 3,
+    }
+
+
+def test_counter_column_widens_past_uint32():
+    store = TelegramRecordStore([make_record(1)])
+    assert store.column("views").typecode == "I"
+
+    store.append(make_record(2, views=5_000_000_000))
+
+    assert store.column("views").typecode == "q"
+    assert store.view[1]["views"] == 5_000_000_000
+    assert store.summary()["total_views"] == 5_000_000_010
+
+
+def test_missing_values_and_clear():
+    store = TelegramRecordStore([make_record(1, published_at=None, title=None)])
+
+    assert store.view[0]["published_at"] is None
+    assert store.view[0]["title"] == ""
+
+    store.clear()
+    assert len(store) == 0
+    assert store.summary()["total_posts"] == 0
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from telethon.tl.types import (
+    Document,
+    MessageEntityHashtag,
+    MessageEntityMention,
+    MessageEntityTextUrl,
+    MessageEntityUrl,
+    MessageMediaDocument,
+)
+
+from backend.domain.models import ContentType
+from backend.infra.api_wrappers import tg_text
+
+
+def message(text: str | None, entities: list | None = None, media: object = None):
+    return SimpleNamespace(id=7, message=text, entities=entities, media=media)
+
+
+def test_tags_use_utf16_entity_offsets():
+    # Эмодзи вне BMP занимает две единицы UTF-16: смещения str и UTF-16 расходятся
+    text = "🔥 Новости #релиз и #итоги @team https://example.com"
+    entities = [
+        MessageEntityHashtag(offset=11, length=6),
+        MessageEntityHashtag(offset=20, length=6),
+        MessageEntityMention(offset=27, length=5),
+        MessageEntityUrl(offset=33, length=19),
+        MessageEntityTextUrl(offset=0, length=2, url="https://example.com"),
+    ]
+
+    features = tg_text.extract_text_features(message(text, entities))
+
+    assert features.tags == ("#релиз", "#итоги")
+    assert features.tags_str == "#релиз,#итоги"
+    assert (features.links, features.mentions) == (2, 1)
+
+
+def test_regex_fallback_without_entities():
+    features = tg_text.extract_text_features(
+        message("Обзор #a #b от @x и @y: http://a.b/c")
+    )
+
+    assert features.tags == ("#a", "#b")
+    assert (features.links, features.mentions) == (1, 2)
+    assert features.content_type is ContentType.ARTICLE
+
+
+def test_title_is_first_line_truncated():
+    long_line = "x" * (tg_text.TITLE_MAX_LENGTH + 5)
+
+    assert tg_text.extract_title(message("Заголовок\nтекст")) == "Заголовок"
+    assert tg_text.extract_title(message(long_line)).endswith("...")
+    assert tg_text.extract_title(message(None)) == "Message 7"
+
+
+def test_content_type_from_media_and_text():
+    video = MessageMediaDocument(
+        document=Document(
+            id=1, access_hash=0, file_reference=b"", date=None, mime_type="video/mp4",
+            size=1, dc_id=1, attributes=[],
+        )
+    )
+
+    assert tg_text.determine_content_type(message("", media=video)) is ContentType.VIDEO
+    assert tg_text.determine_content_type(message("Опрос недели")) is ContentType.POST
+    assert tg_text.determine_content_type(message("Статья")) is ContentType.ARTICLE
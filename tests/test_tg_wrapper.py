@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from tests.fakes import make_message
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_extraction_keeps_channel_order(collector, tg_client):
+    tg_client.messages[15].message = None
+
+    records = await collector.collect_channel_stats(
+        "channel", limit=10, concurrency=4, raise_errors=True
+    )
+
+    assert [record["tg_id"] for record in records] == [20, 19, 18, 17, 16, 14, 13, 12, 11]
+    assert [record["id"] for record in records] == [1, 2, 3, 4, 5, 7, 8, 9, 10]
+
+
+async def test_concurrent_extraction_is_bounded(collector, monkeypatch):
+    active = peak = 0
+    extract = type(collector).extract_message_data
+
+    async def slow_extract(self, *args, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.001)
+        active -= 1
+        return await extract(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(collector), "extract_message_data", slow_extract)
+    records = await collector.collect_channel_stats("channel", limit=20, concurrency=3)
+
+    assert len(records) == 20
+    assert peak == 3
+
+
+async def test_collection_error_is_raised_on_request(collector):
+    assert await collector.collect_channel_stats("missing") == []
+    with pytest.raises(ValueError, match="missing"):
+        await collector.collect_channel_stats("missing", raise_errors=True)
+
+
+async def test_updates_fetch_only_new_messages_and_window(collector, tg_client):
+    await collector.collect_channel_updates("channel", limit=10, window=3)
+    tg_client.calls.clear()
+    tg_client.messages[21] = make_message(21)
+    tg_client.messages[20].views = 500
+
+    records = await collector.collect_channel_updates("channel", limit=10, window=3)
+
+    fetches = [call for call in tg_client.calls if call[0] == "get_messages"]
+    assert fetches == [
+        ("get_messages", 10, 20, None),
+        ("get_messages", None, 0, [20, 19, 18]),
+    ]
+    assert [record["tg_id"] for record in records] == list(range(21, 11, -1))
+    assert records[1]["views"] == 500
+    assert collector.state_store.get_max_id("channel") == 21
+
+
+async def test_updates_drop_deleted_messages(collector, tg_client):
+    await collector.collect_channel_updates("channel", limit=10, window=5)
+    del tg_client.messages[19]
+    tg_client.messages[18].message = ""
+
+    records = await collector.collect_channel_updates("channel", limit=10, window=5)
+
+    tg_ids = [record["tg_id"] for record in records]
+    assert 19 not in tg_ids
+    assert 18 not in tg_ids
+    assert len(records) == 8
+    assert [r["tg_id"] for r in collector.state_store.get_records("channel")] == tg_ids
+
+
+async def test_shared_collector_keeps_calls_apart(collector):
+    first, second = await asyncio.gather(
+        collector.collect_channel_stats("first", limit=5),
+        collector.collect_channel_stats("second", limit=3),
+    )
+
+    assert {record["url"].split("/")[3] for record in first} == {"first"}
+    assert {record["url"].split("/")[3] for record in second} == {"second"}
+    assert len(collector.collected_data) == 0
+    summary = collector.get_stats_summary(second)
+    assert summary["total_posts"] == 3
+    assert summary["collection_time"] is not None
+
+
+async def test_comment_counts_come_from_replies(collector, tg_client):
+    tg_client.messages[20].replies.replies = 7
+
+    records = await collector.collect_channel_stats(
+        "channel", limit=3, with_comment_texts=True
+    )
+
+    assert [record["comments"] for record in records] == [7, 0, 0]
+    assert records[0]["comment_texts"] == ["Комментарий 0", "Комментарий 1"]
+    assert "comment_texts" not in records[1]
+    # Тексты запрашиваются только у поста с комментариями
+    assert [call for call in tg_client.calls if call[0] == "iter_messages"] == [
+        ("iter_messages", 10, 20)
+    ]
+
+
+async def test_csv_export_is_chunked(collector):
+    records = await collector.collect_channel_stats("channel", limit=5)
+
+    chunks = list(collector.iter_csv_chunks(records, rows_per_chunk=2))
+
+    assert len(chunks) == 3
+    lines = "".join(chunks).splitlines()
+    assert lines[0].startswith("Title,URL,")
+    assert len(lines) == 6
+    assert "".join(chunks) == collector.export_to_csv_string(records)